@@ -6,24 +6,409 @@ Copied from https://github.com/osu-cs340-ecampus/flask-starter-app with minor mo
 """
 
 """ ___________ Imports List ___________ """
-from flask import Flask, render_template, request, redirect
-from flask_mysqldb import MySQL
+from flask import Flask, render_template, request, redirect, jsonify, Response, url_for, g
+# click comes with Flask and is used for the "flask <command>" maintenance commands
+import click
 # IntegrityError is used to check if a query would create an error in the DB
 from MySQLdb import IntegrityError
+# DatabaseError is the parent of every MySQL error, used where any failed write should be reported
+from MySQLdb import DatabaseError
+# SSDictCursor streams rows from the server as they are read instead of loading the whole result first
+from MySQLdb.cursors import SSDictCursor
 import os
+import io
+import re
+import csv
+import json
+import datetime
+import hashlib
+import unicodedata
+import functools
+from decimal import Decimal, ROUND_HALF_UP
+import time
 import database.db_connector as db
+import database.migrate as migrations
+from database.instrumentation import Instrumentation
+from cache import LRUCache, makeCache
+from search_index import NameIndex
+from idempotency import IdempotencyStore, IdempotencyConflict
+from change_feed import ChangeFeed
+from jobs import JobQueue
 # email_validator is used to check if email inputs are valid without needing to
 # manually check using regex or other methods
 from email_validator import validate_email, EmailNotValidError
 
 """ ___________ Database Connection/Configuration ___________ """
 app = Flask(__name__)
-app.config["MYSQL_HOST"] = db.host
-app.config["MYSQL_USER"] = db.user
-app.config["MYSQL_PASSWORD"] = db.passwd
-app.config["MYSQL_DB"] = db.db
-app.config["MYSQL_CURSORCLASS"] = "DictCursor"
-mysql = MySQL(app)
+# Each request borrows a connection from the shared pool in db_connector (configured from the .env file)
+# instead of opening a new one, and gives it back when the request ends.
+# Every query is timed: each response gets X-DB-Query-Count/Server-Timing headers, per-route figures show
+# up at /stats and slow queries are logged (see database/instrumentation.py)
+# Listing, report and API reads go through mysql.read_connection, which uses a read replica when 340DBREPLICAS
+# lists any (and the replica is healthy and the browser hasn't just written); everything else uses the primary
+instrumentation = Instrumentation(app)
+mysql = db.PooledMySQL(app, instrumentation=instrumentation, replicas=db.ReplicaSet())
+
+# Apply any pending schema migrations (database/migrations) when the app starts, if enabled in the .env file.
+# Otherwise run "flask migrate" after pulling schema changes
+if os.environ.get("KILOJULIA_MIGRATE_ON_START") == "1":
+    with db.pool.connection() as connection:
+        migrations.migrate(connection, log=app.logger.info)
+
+""" ___________ Name Lookup Cache ___________ """
+# Users type names into the forms and the pages turn each name back into an ID. Lookups that only lead to a
+# read (like picking a dashboard) are cached here and dropped by the insert/update/delete helpers of the
+# matching table. Each gunicorn worker has its own copy, so another worker's copy can stay stale for up to the
+# TTL; that's why writes never take IDs from it and look names up in their own transaction instead.
+lookupCache = LRUCache(
+    maxsize=int(os.environ.get("KILOJULIA_LOOKUP_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("KILOJULIA_LOOKUP_CACHE_TTL", 60)),
+)
+
+# Helper function to remember a name -> ID answer. Names that weren't found aren't cached, so a
+# record created right after a failed lookup is found straight away
+def rememberLookup(key, value):
+    if value is not None:
+        lookupCache.set(key, value)
+    return value
+
+""" ___________ Name Search Indexes ___________ """
+# The name boxes search as the user types (/search/<kind>) instead of the pages listing every name.
+# Each kind of name has an in-memory index, built on first use from these queries and rebuilt after
+# a write to its table or after the TTL (so other gunicorn workers' changes show up too)
+NAME_INDEX_QUERIES = {
+    "staff": "SELECT staffName AS name FROM Staff;",
+    "client": "SELECT clientName AS name FROM Clients;",
+    "food": "SELECT foodName AS name FROM Foods;",
+}
+NAME_INDEX_TTL = float(os.environ.get("KILOJULIA_SEARCH_INDEX_TTL", 60))
+# namespace -> (NameIndex, time it was built)
+nameIndexes = {}
+
+# Helper function to get the search index for staff, client or food names, building it if needed
+def getNameIndex(namespace):
+    entry = nameIndexes.get(namespace)
+    if entry is None or entry[1] + NAME_INDEX_TTL < time.monotonic():
+        cur = mysql.read_connection.cursor()
+        cur.execute(NAME_INDEX_QUERIES[namespace])
+        entry = (NameIndex(row["name"] for row in cur.fetchall()), time.monotonic())
+        nameIndexes[namespace] = entry
+    return entry[0]
+
+# Helper function called by the write helpers after a commit to forget cached IDs and search indexes
+def invalidateNames(*namespaces):
+    lookupCache.invalidate(*namespaces)
+    for namespace in namespaces:
+        nameIndexes.pop(namespace, None)
+
+""" ___________ Table Change Counters ___________ """
+# TableVersions holds a counter and a last-changed time for each table. Every write bumps the counters of
+# the tables it changed in the same transaction, so the API can tell whether anything changed since a
+# client's last request from one primary key lookup instead of re-running the query. Times are in UTC
+VERSIONED_TABLES = (
+    "Staff", "Clients", "StaffClients", "TrackedDays", "Foods", "FoodEntries", "ExerciseEntries",
+)
+
+# Helper function to commit the current transaction, recording which tables it changed.
+# Deletes list the tables their ON DELETE CASCADE/SET NULL rules reach too.
+# A transaction that logged changes also bumps the ChangeLog counter, then publishes its changes while it holds
+# that row (see publishChanges)
+def commitChanges(*tables):
+    loggedChanges = g.pop("loggedChanges", False)
+    if loggedChanges:
+        tables += ("ChangeLog",)
+    placeholders = ", ".join(["%s"] * len(tables))
+    cur = mysql.connection.cursor()
+    cur.execute(
+        f"""
+        UPDATE TableVersions
+        SET tableVersion = tableVersion + 1, tableModifiedAt = UTC_TIMESTAMP(6)
+        WHERE tableName IN ({placeholders});
+        """,
+        tables,
+    )
+    if loggedChanges:
+        publishChanges(cur)
+    mysql.connection.commit()
+    # Wake this process's change feed waiters now rather than at the watcher's next poll
+    if loggedChanges:
+        changeFeed.notify()
+
+# Helper function to get the (version, last changed time, settled) of each of the given tables. A table is
+# settled once a full second has passed since its last change, by the database's clock
+def getTableVersions(tables):
+    cur = mysql.read_connection.cursor()
+    cur.execute(*buildTableVersionsQuery(tables))
+    return readTableVersions(cur.fetchall())
+
+# Helper function to build the TableVersions lookup as (query, params)
+def buildTableVersionsQuery(tables):
+    placeholders = ", ".join(["%s"] * len(tables))
+    return (
+        f"""
+        SELECT tableName, tableVersion, tableModifiedAt,
+            tableModifiedAt <= UTC_TIMESTAMP(6) - INTERVAL 1 SECOND AS tableSettled
+        FROM TableVersions WHERE tableName IN ({placeholders});
+        """,
+        tuple(tables),
+    )
+
+def readTableVersions(rows):
+    return {
+        row["tableName"]: (row["tableVersion"], row["tableModifiedAt"], bool(row["tableSettled"])) for row in rows
+    }
+
+""" ___________ Change Log ___________ """
+# ChangeLog gets a row for every insert, update and delete of an entry, tracked day or staff-client assignment,
+# written by the write helpers in the same transaction as the change. Each row names the client it belongs to,
+# so a dashboard can ask for the changes to its staff member's clients since the last one it saw (see the
+# Change Feed routes) instead of reloading every listing.
+# That only works if changeIDs are handed out in commit order: a change given a lower ID by a transaction that
+# commits later would land behind a dashboard that has already read past it, and be skipped. So the write
+# helpers log into PendingChanges, and commitChanges moves the transaction's rows into ChangeLog just before
+# it commits, while holding the ChangeLog row of TableVersions. The next transaction to publish waits for
+# that row, so it can only get its IDs after this one has committed
+CHANGE_SOURCES = {
+    "TrackedDays": ("TrackedDays.trackedDayID", "TrackedDays"),
+    "FoodEntries": (
+        "FoodEntries.foodEntryID",
+        "FoodEntries JOIN TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID",
+    ),
+    "ExerciseEntries": (
+        "ExerciseEntries.exerciseEntryID",
+        "ExerciseEntries JOIN TrackedDays ON ExerciseEntries.trackedDayID = TrackedDays.trackedDayID",
+    ),
+}
+CHANGE_POLL_INTERVAL = float(os.environ.get("KILOJULIA_CHANGE_POLL_INTERVAL", 1))
+# Most long-polls and event streams a process keeps waiting at once. Each holds one of the worker's threads,
+# so by default they may take half of KILOJULIA_THREADS (see gunicorn.conf.py) and the rest stay free for
+# ordinary requests. Past the limit, feed requests answer straight away and the browser comes back later
+MAX_CHANGE_WAITERS = int(os.environ.get("KILOJULIA_MAX_CHANGE_WAITERS", max(int(os.environ.get("KILOJULIA_THREADS", 8)) // 2, 1)))
+CHANGE_LOG_KEEP_DAYS = int(os.environ.get("KILOJULIA_CHANGE_LOG_KEEP_DAYS", 7))
+
+# Helper function to log changes to rows of TrackedDays, FoodEntries or ExerciseEntries, looking up each row's
+# tracked day and client. Call after inserts and updates, but BEFORE deletes while the rows still exist.
+# by matches rowIDs against another column instead of the row's ID, e.g. "TrackedDays.clientID" logs every
+# row of those clients
+def logChanges(cur, table, operation, rowIDs, by=None):
+    rowIDs = sorted(set(rowIDs))
+    if not rowIDs:
+        return
+    idColumn, source = CHANGE_SOURCES[table]
+    for ids in chunked(rowIDs):
+        placeholders = ", ".join(["%s"] * len(ids))
+        cur.execute(
+            f"""
+            INSERT INTO PendingChanges (connectionID, changeTable, changeOperation, changeRowID, trackedDayID, clientID, changedAt)
+            SELECT CONNECTION_ID(), %s, %s, {idColumn}, TrackedDays.trackedDayID, TrackedDays.clientID, UTC_TIMESTAMP(6)
+            FROM {source}
+            WHERE {by or idColumn} IN ({placeholders});
+            """,
+            [table, operation, *ids],
+        )
+    g.loggedChanges = True
+
+# Helper function to log changes to tracked days along with their entries, for a delete that cascades to the
+# entries or a move to another client. Takes the same by as logChanges
+def logTrackedDayChanges(cur, operation, rowIDs, by="TrackedDays.trackedDayID"):
+    tables = ["TrackedDays", "FoodEntries", "ExerciseEntries"]
+    # Entries are logged before the day they go away with, and after the day they arrive with
+    for table in tables if operation == "insert" else reversed(tables):
+        logChanges(cur, table, operation, rowIDs, by=by)
+
+# Helper function to find which tracked days a write is moving to another client. Takes {trackedDayID: new clientID}.
+# A move is logged as a delete for the old client and an insert for the new one, so both clients' feeds hear
+# about it, like a moved assignment
+def findMovedTrackedDays(cur, clientIDs):
+    moved = []
+    for ids in chunked(sorted(clientIDs)):
+        placeholders = ", ".join(["%s"] * len(ids))
+        cur.execute(f"SELECT trackedDayID, clientID FROM TrackedDays WHERE trackedDayID IN ({placeholders}) FOR UPDATE;", ids)
+        moved += [row["trackedDayID"] for row in cur.fetchall() if str(row["clientID"]) != str(clientIDs[row["trackedDayID"]])]
+    return moved
+
+# Helper function to log a change to a staff-client assignment. An assignment that moves is logged as a
+# delete of the old pair and an insert of the new one, so both staff members' feeds hear about it
+def logAssignmentChange(cur, operation, staffID, clientID):
+    cur.execute(
+        "INSERT INTO PendingChanges (connectionID, changeTable, changeOperation, clientID, staffID, changedAt) VALUES (CONNECTION_ID(), 'StaffClients', %s, %s, %s, UTC_TIMESTAMP(6));",
+        (operation, clientID, staffID),
+    )
+    g.loggedChanges = True
+
+# Helper function to log the removal of every assignment of some staff members (by="staffID") or clients
+# (by="clientID"), before a delete cascades to them
+def logAssignmentDeletes(cur, by, ids):
+    placeholders = ", ".join(["%s"] * len(ids))
+    cur.execute(
+        f"""
+        INSERT INTO PendingChanges (connectionID, changeTable, changeOperation, clientID, staffID, changedAt)
+        SELECT CONNECTION_ID(), 'StaffClients', 'delete', clientID, staffID, UTC_TIMESTAMP(6)
+        FROM StaffClients
+        WHERE {by} IN ({placeholders});
+        """,
+        ids,
+    )
+    g.loggedChanges = True
+
+# Helper function to move the current transaction's changes from PendingChanges into ChangeLog, in the order
+# they were logged. Called by commitChanges while it holds the ChangeLog row of TableVersions.
+# Plain reads and primary key deletes keep it from locking other transactions' pending rows
+def publishChanges(cur):
+    cur.execute(
+        """
+        SELECT pendingID, changeTable, changeOperation, changeRowID, trackedDayID, clientID, staffID, changedAt
+        FROM PendingChanges
+        WHERE connectionID = CONNECTION_ID()
+        ORDER BY pendingID;
+        """
+    )
+    pending = cur.fetchall()
+    for rows in chunked(pending):
+        cur.executemany(
+            "INSERT INTO ChangeLog (changeTable, changeOperation, changeRowID, trackedDayID, clientID, staffID, changedAt) VALUES (%s, %s, %s, %s, %s, %s, %s);",
+            [
+                (row["changeTable"], row["changeOperation"], row["changeRowID"], row["trackedDayID"], row["clientID"], row["staffID"], row["changedAt"])
+                for row in rows
+            ],
+        )
+        placeholders = ", ".join(["%s"] * len(rows))
+        cur.execute(f"DELETE FROM PendingChanges WHERE pendingID IN ({placeholders});", [row["pendingID"] for row in rows])
+
+# Helper function to get the highest changeID, read on its own pooled connection by the change feed's watcher
+def getLatestChangeID():
+    with db.pool.connection() as connection:
+        cur = connection.cursor()
+        cur.execute("SELECT COALESCE(MAX(changeID), 0) AS latestChangeID FROM ChangeLog;")
+        return cur.fetchone()["latestChangeID"]
+
+changeFeed = ChangeFeed(getLatestChangeID, pollInterval=CHANGE_POLL_INTERVAL, maxWaiters=MAX_CHANGE_WAITERS)
+
+""" ___________ Page Cache ___________ """
+# Listing pages and reports are cached whole, keyed by their URL and the change counters of the tables they
+# show. A write bumps those counters (see commitChanges), which moves the page to a new key, so a stale copy
+# is never served even when several worker processes share the cache. Old copies are left to expire after
+# KILOJULIA_PAGE_CACHE_TTL seconds (or to be pushed out of the memory cache), so writes never wait on the cache.
+# KILOJULIA_PAGE_CACHE picks the backend: memory:// (default, per process), file:///some/dir (shared by the
+# processes on one machine), redis://host:6379/0 (shared by every machine) or none
+pageCache = makeCache(
+    os.environ.get("KILOJULIA_PAGE_CACHE", "memory://"),
+    ttl=float(os.environ.get("KILOJULIA_PAGE_CACHE_TTL", 300)),
+    maxsize=int(os.environ.get("KILOJULIA_PAGE_CACHE_SIZE", 1000)),
+)
+
+# Decorator for a route whose GET responses can be cached until one of the given tables changes.
+# Goes under @app.route. Only 200 responses to GET requests are cached, so POSTs and errors always run
+def cachedPage(*tables):
+    def decorator(view):
+        @functools.wraps(view)
+        def cachedView(*args, **kwargs):
+            if pageCache is None or request.method != "GET":
+                return view(*args, **kwargs)
+            versions = getTableVersions(tables)
+            # Today's date is part of the key because the reports default to a window ending today
+            key = (
+                view.__name__,
+                request.full_path,
+                str(datetime.date.today()),
+            ) + tuple(versions.get(table, (0, None))[0] for table in tables)
+            cached = pageCache.get(key)
+            if cached is not None:
+                mimetype, _, body = cached.partition(b"\n")
+                response = Response(body, mimetype=mimetype.decode())
+                response.headers["X-Page-Cache"] = "HIT"
+                return response
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                pageCache.set(key, response.mimetype.encode() + b"\n" + response.get_data())
+            response.headers["X-Page-Cache"] = "MISS"
+            return response
+
+        return cachedView
+
+    return decorator
+
+""" ___________ Idempotency Keys ___________ """
+# A POST carrying an Idempotency-Key header (or an idempotencyKey form field) runs once. Repeats with the same
+# key get the first response back without touching the database, and a repeat that arrives while the first
+# is still running waits for it instead of running alongside it. The pages' fetch calls add a key
+# automatically (see template.j2), so double clicks no longer create duplicate rows.
+# KILOJULIA_IDEMPOTENCY_STORE takes the same URLs as the page cache; use file:// or redis:// to catch
+# duplicates across worker processes
+idempotencyStore = IdempotencyStore(
+    makeCache(os.environ.get("KILOJULIA_IDEMPOTENCY_STORE", "memory://"), maxsize=10000),
+    ttl=float(os.environ.get("KILOJULIA_IDEMPOTENCY_TTL", 600)),
+    # Longer than any request runs for, so a slow import or batch can't be run again by a duplicate
+    lockTimeout=float(os.environ.get("KILOJULIA_IDEMPOTENCY_LOCK_TTL", 300)),
+)
+# Response headers kept with a stored response
+IDEMPOTENT_HEADERS = ("Content-Type", "Location")
+
+@app.before_request
+def beginIdempotentRequest():
+    key = request.headers.get("Idempotency-Key") or request.form.get("idempotencyKey")
+    if request.method != "POST" or not key:
+        return None
+    fingerprint = getRequestFingerprint()
+    try:
+        stored, token = idempotencyStore.begin(request.path, key, fingerprint)
+    except IdempotencyConflict as e:
+        return str(e), 409
+    if stored is not None:
+        status, headers, body = stored
+        response = Response(body, status=status, headers=headers)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+    g.idempotency = (request.path, key, token, fingerprint)
+    return None
+
+@app.after_request
+def finishIdempotentRequest(response):
+    idempotency = g.pop("idempotency", None)
+    if idempotency:
+        # Server errors aren't kept, so the request can be retried
+        if response.status_code >= 500 or response.is_streamed:
+            idempotencyStore.abandon(*idempotency[:3])
+        else:
+            headers = {name: response.headers[name] for name in IDEMPOTENT_HEADERS if name in response.headers}
+            idempotencyStore.finish(*idempotency, response.status_code, headers, response.get_data())
+    return response
+
+@app.teardown_request
+def abandonIdempotentRequest(exception):
+    idempotency = g.pop("idempotency", None)
+    if idempotency:
+        idempotencyStore.abandon(*idempotency[:3])
+
+# Helper function to sum up what a request sends, so a key reused for different data is caught
+def getRequestFingerprint():
+    if request.form or request.files:
+        content = [(name, value) for name, value in request.form.items(multi=True) if name != "idempotencyKey"]
+        content += [(name, file.filename, getFileDigest(file)) for name, file in request.files.items(multi=True)]
+        data = json.dumps(sorted(content)).encode()
+    else:
+        data = request.get_data()
+    return hashlib.sha256(data).hexdigest()
+
+# Helper function to hash an uploaded file's contents, so a different file sent under the same name is caught.
+# The file is rewound afterwards for the route to read
+def getFileDigest(file):
+    digest = hashlib.sha256()
+    size = 0
+    for block in iter(lambda: file.stream.read(65536), b""):
+        digest.update(block)
+        size += len(block)
+    file.stream.seek(0)
+    return f"{size}:{digest.hexdigest()}"
+
+""" ___________ Pagination Configuration ___________ """
+# Listing pages use keyset (seek) pagination on the table's ID column so that every page costs
+# the same amount of work no matter how many rows the table has grown to
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# The templates read these to build the filter form
+app.config["DEFAULT_PAGE_SIZE"] = DEFAULT_PAGE_SIZE
+app.config["MAX_PAGE_SIZE"] = MAX_PAGE_SIZE
 
 """
 Citation for the following code:
@@ -41,9 +426,117 @@ def index():
     # We use Jinja/Flask templates to build the foundation for our pages
     return render_template("index.j2")
 
+""" ___________ Routes for Server Statistics ___________ """
+# Route to see how the database connection pool, caches and routes are doing.
+# Routes are listed with the most total database time first
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify(
+        pool=mysql.pool.stats(),
+        replicas=mysql.replicas.stats(),
+        lookupCache=lookupCache.stats(),
+        pageCache=pageCache.stats() if pageCache else None,
+        routes=instrumentation.stats(),
+    )
+
+""" ___________ Routes for Name Search ___________ """
+# Which index each search URL uses
+SEARCH_KINDS = {"staff": "staff", "clients": "client", "foods": "food"}
+MAX_SEARCH_RESULTS = 50
+
+# Route for search-as-you-type on the name boxes, e.g. /search/foods?q=ban returns a JSON list of names
+@app.route("/search/<kind>", methods=["GET"])
+def search(kind):
+    if kind not in SEARCH_KINDS:
+        return "Unknown search.", 404
+    limit = max(1, min(request.args.get("limit", 10, type=int), MAX_SEARCH_RESULTS))
+    names = getNameIndex(SEARCH_KINDS[kind]).search(request.args.get("q", ""), limit)
+    response = jsonify(names)
+    # Let the browser reuse results while the user backspaces and retypes
+    response.headers["Cache-Control"] = "private, max-age=30"
+    return response
+
+""" ___________ Helpers for Paginated Listings ___________ """
+# Helper function to read the paging arguments (?after=<last ID seen>&limit=<page size>) from the URL
+def getPageArgs(args=None):
+    args = request.args if args is None else args
+    after = args.get("after", type=int)
+    limit = args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    # Cap the page size so a single request can never pull the whole table into memory
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return after, limit
+
+# Helper function to read the optional listing filters from the URL
+def getListingFilters():
+    return {
+        "clientName": request.args.get("clientName") or None,
+        "startDate": request.args.get("startDate") or None,
+        "endDate": request.args.get("endDate") or None,
+        "foodName": request.args.get("foodName") or None,
+    }
+
+# Helper function to turn the listing filters into SQL conditions so the filtering happens in the DB
+def buildListingConditions(clientName=None, startDate=None, endDate=None, foodName=None, staffID=None):
+    conditions = []
+    params = []
+    if clientName:
+        conditions.append("Clients.clientName = %s")
+        params.append(clientName)
+    if staffID:
+        conditions.append(
+            "TrackedDays.clientID IN (SELECT clientID FROM StaffClients WHERE staffID = %s)"
+        )
+        params.append(staffID)
+    if startDate:
+        conditions.append("TrackedDays.trackedDayDate >= %s")
+        params.append(startDate)
+    if endDate:
+        conditions.append("TrackedDays.trackedDayDate <= %s")
+        params.append(endDate)
+    if foodName:
+        conditions.append("Foods.foodName = %s")
+        params.append(foodName)
+    return conditions, params
+
+# Helper function to build the WHERE, keyset condition, ordering and limit that follow a listing query.
+# Returns (suffix, params). One extra row is asked for so we know whether there is a next page without a COUNT(*)
+def buildPageSuffix(conditions, params, idColumn, after, limit):
+    conditions = list(conditions)
+    params = list(params)
+    if after:
+        conditions.append(f"{idColumn} > %s")
+        params.append(after)
+    suffix = ""
+    if conditions:
+        suffix += " WHERE " + " AND ".join(conditions)
+    suffix += f" ORDER BY {idColumn} LIMIT %s;"
+    params.append(limit + 1)
+    return suffix, params
+
+# Helper function to run one page of a listing query (see buildPageSuffix)
+def fetchPage(query, conditions, params, idColumn, after, limit, archiveQuery=None):
+    suffix, params = buildPageSuffix(conditions, params, idColumn, after, limit)
+    cur = mysql.read_connection.cursor()
+    cur.execute(query + suffix, params)
+    rows = cur.fetchall()
+    # Entry listings also read the archive table with the same conditions (see Helpers for the Entry Archive)
+    if archiveQuery:
+        cur.execute(archiveQuery + suffix, params)
+        rows = mergeArchivedRows(rows, cur.fetchall(), [idColumn.split(".")[-1]], limit)
+    return rows[:limit], len(rows) > limit
+
+# Helper function to build the "next page" link, keeping the filters the user already applied
+def nextPageArgs(rows, hasMore, idField):
+    if not hasMore or not rows:
+        return None
+    args = request.args.to_dict()
+    args["after"] = rows[-1][idField]
+    return args
+
 """ ___________ Routes for Staff Page ___________ """
 # Route for Reading and Updating Staff Records
 @app.route("/staff", methods=["GET", "POST"])
+@cachedPage("Staff")
 def staff():
     if request.method == "POST":
         staffName = request.form["staffName"]
@@ -104,7 +597,7 @@ def validateStaffForm(staffName, staffEmail):
 
 # Helper function to READ the Staff Records
 def fetchStaff():
-    cur = mysql.connection.cursor()
+    cur = mysql.read_connection.cursor()
     cur.execute("SELECT * FROM Staff;")
     return cur.fetchall()
 
@@ -119,7 +612,8 @@ def insertStaff(staffName, staffEmail, staffCapacity, staffNote):
             (staffName, staffEmail, staffCapacity, staffNote),
         )
         # This is how we send the data to the DB
-        mysql.connection.commit()
+        commitChanges("Staff")
+        invalidateNames("staff")
     except EmailNotValidError as e:
         # We use this to roll back the change if there was an error with the query
         mysql.connection.rollback()
@@ -138,7 +632,8 @@ def updateStaffRecord(staffID, staffName, staffEmail, staffCapacity, staffNote):
             "UPDATE Staff SET staffName = %s, staffEmail = %s, staffCapacity = %s, staffNote = %s WHERE staffID = %s;",
             (staffName, staffEmail, staffCapacity, staffNote, staffID),
         )
-        mysql.connection.commit()
+        commitChanges("Staff")
+        invalidateNames("staff")
     except EmailNotValidError as e:
         # We use this to roll back the change if there was an error with the query
         mysql.connection.rollback()
@@ -151,12 +646,15 @@ def updateStaffRecord(staffID, staffName, staffEmail, staffCapacity, staffNote):
 def deleteStaffRecord(staffID):
     cur = mysql.connection.cursor()
     # We don't need to call the validator function here because DELETE is pretty simple
+    logAssignmentDeletes(cur, "staffID", [staffID])
     cur.execute("DELETE FROM Staff WHERE staffID = %s;", (staffID,))
-    mysql.connection.commit()
+    commitChanges("Staff", "StaffClients")
+    invalidateNames("staff")
 
 """ ___________ Routes for Clients Page ___________ """
 # Route for Reading and Updating Client Records
 @app.route("/clients", methods=["GET", "POST"])
+@cachedPage("Clients")
 def clients():
     if request.method == "POST":
         clientName = request.form["clientName"]
@@ -169,6 +667,7 @@ def clients():
         clientCalorieTarget = request.form["clientCalorieTarget"]
         clientNote = request.form["clientNote"]
         # We check for errors by calling the validateClientForm helper function to make sure the data is okay before we pass it to the DB
+        # A blank calorie target is filled in from the client's estimated TDEE
         errors = validateClientForm(
             clientName,
             clientEmail,
@@ -176,6 +675,7 @@ def clients():
             clientHeight,
             clientWeight,
             clientCalorieTarget,
+            allowBlankTarget=True,
         )
         if not errors:
             try:
@@ -252,7 +752,7 @@ def deleteClient(clientID):
 
 # Helper function for validation for the Client Form
 def validateClientForm(
-    clientName, clientEmail, clientAge, clientHeight, clientWeight, clientCalorieTarget
+    clientName, clientEmail, clientAge, clientHeight, clientWeight, clientCalorieTarget, allowBlankTarget=False
 ):
     errors = []
     if not clientName:
@@ -265,13 +765,14 @@ def validateClientForm(
         errors.append("Invalid height. Must be greater than 0.")
     if not clientWeight or float(clientWeight) <= 0:
         errors.append("Invalid weight. Must be greater than 0.")
-    if not clientCalorieTarget or int(clientCalorieTarget) <= 0:
-        errors.append("Invalid calorie target. Must be greater than 0.")
+    if clientCalorieTarget or not allowBlankTarget:
+        if not clientCalorieTarget or int(clientCalorieTarget) <= 0:
+            errors.append("Invalid calorie target. Must be greater than 0.")
     return errors
 
 # Helper function to READ the Client Records
 def fetchClients():
-    cur = mysql.connection.cursor()
+    cur = mysql.read_connection.cursor()
     cur.execute("SELECT * FROM Clients;")
     return cur.fetchall()
 
@@ -300,11 +801,14 @@ def insertClient(
                 clientHeight,
                 clientWeight,
                 clientActivityLevel,
-                clientCalorieTarget,
+                # 0 is replaced with the TDEE estimate below
+                clientCalorieTarget or 0,
                 clientNote,
             ),
         )
-        mysql.connection.commit()
+        refreshClientEnergy(cur, [cur.lastrowid])
+        commitChanges("Clients")
+        invalidateNames("client")
     except EmailNotValidError as e:
         mysql.connection.rollback()
         raise e
@@ -328,6 +832,8 @@ def updateClientRecord(
     cur = mysql.connection.cursor()
     try:
         validate_email(clientEmail)
+        cur.execute(f"SELECT {', '.join(ENERGY_FIELDS)} FROM Clients WHERE clientID = %s;", (clientID,))
+        oldClient = cur.fetchone()
         cur.execute(
             "UPDATE Clients SET clientName = %s, clientEmail = %s, clientSex = %s, clientAge = %s, clientHeight = %s, clientWeight = %s, clientActivityLevel = %s, clientCalorieTarget = %s, clientNote = %s WHERE clientID = %s;",
             (
@@ -343,7 +849,12 @@ def updateClientRecord(
                 clientID,
             ),
         )
-        mysql.connection.commit()
+        # The energy estimates only change with the client's biometrics, so other edits leave them alone
+        newClient = (clientSex, clientAge, clientHeight, clientWeight, clientActivityLevel)
+        if oldClient and energyFieldsChanged(oldClient, dict(zip(ENERGY_FIELDS, newClient))):
+            refreshClientEnergy(cur, [clientID])
+        commitChanges("Clients")
+        invalidateNames("client")
     except EmailNotValidError as e:
         mysql.connection.rollback()
         raise e
@@ -354,19 +865,83 @@ def updateClientRecord(
 # Helper function to DELETE a Client record
 def deleteClientRecord(clientID):
     cur = mysql.connection.cursor()
+    # The client's assignments, tracked days and entries are deleted along with it
+    logAssignmentDeletes(cur, "clientID", [clientID])
+    logTrackedDayChanges(cur, "delete", [clientID], by="TrackedDays.clientID")
     cur.execute("DELETE FROM Clients WHERE clientID = %s;", (clientID,))
-    mysql.connection.commit()
+    commitChanges("Clients", "StaffClients", "TrackedDays", "FoodEntries", "ExerciseEntries")
+    invalidateNames("client")
+
+""" ___________ Helpers for Energy Estimates ___________ """
+# Each client's basal metabolic rate (Mifflin-St Jeor) and total daily energy expenditure (BMR times the
+# activity factor of their activity level) are kept on Clients as clientBMR and clientTDEE. They are worked out
+# in SQL for a set of clients at once, so refreshing every client is a single UPDATE, and a client's are only
+# redone when an edit changes the biometrics they come from. A calorie target left blank on a new client uses
+# the TDEE estimate, and a new tracked day without a target takes its client's target
+ACTIVITY_FACTORS = {"Sedentary": 1.2, "Light": 1.375, "Moderate": 1.55, "High": 1.725, "Athlete": 1.9}
+ENERGY_FIELDS = ("clientSex", "clientAge", "clientHeight", "clientWeight", "clientActivityLevel")
+
+BMR_EXPRESSION = (
+    "(10 * Clients.clientWeight + 6.25 * Clients.clientHeight - 5 * Clients.clientAge"
+    " + IF(Clients.clientSex = 'Male', 5, -161))"
+)
+TDEE_EXPRESSION = "({} * CASE Clients.clientActivityLevel {} END)".format(
+    BMR_EXPRESSION,
+    " ".join(f"WHEN '{level}' THEN {factor}" for level, factor in ACTIVITY_FACTORS.items()),
+)
+
+# Helper function to recompute the energy estimates of all clients or only the given ones, filling in
+# calorie targets that were left blank (0). Does not commit, so callers can include it in a larger transaction
+def refreshClientEnergy(cur, clientIDs=None):
+    if clientIDs is not None and not clientIDs:
+        return 0
+    query = f"""
+        UPDATE Clients
+        SET clientBMR = GREATEST(0, ROUND({BMR_EXPRESSION})),
+            clientTDEE = GREATEST(0, ROUND({TDEE_EXPRESSION})),
+            clientCalorieTarget = IF(Clients.clientCalorieTarget = 0, GREATEST(0, ROUND({TDEE_EXPRESSION})), Clients.clientCalorieTarget)
+    """
+    if clientIDs is None:
+        cur.execute(query + ";")
+        return cur.rowcount
+    refreshed = 0
+    for ids in chunked(sorted(clientIDs)):
+        placeholders = ", ".join(["%s"] * len(ids))
+        cur.execute(query + f" WHERE Clients.clientID IN ({placeholders});", ids)
+        refreshed += cur.rowcount
+    return refreshed
+
+# Helper function to tell whether an edit changed any of the biometrics the energy estimates come from.
+# Height and weight are compared at the one decimal place they are stored with
+def energyFieldsChanged(oldClient, newClient):
+    for field in ENERGY_FIELDS:
+        old, new = oldClient[field], newClient[field]
+        if field in ("clientHeight", "clientWeight"):
+            changed = Decimal(str(old)) != Decimal(str(new)).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+        elif field == "clientAge":
+            changed = int(old) != int(new)
+        else:
+            changed = old != new
+        if changed:
+            return True
+    return False
+
+# Helper function for the target a new tracked day gets when none is given: the client's own target, or their
+# TDEE estimate if they have none
+def getDefaultCalorieTarget(client):
+    return client["clientCalorieTarget"] or client["clientTDEE"]
 
 """ ___________ Routes for Staff-Client Assignments Page ___________ """
 # Route for Reading and Updating Staff-Client Assignments
 @app.route("/staffclients", methods=["GET", "POST"])
+@cachedPage("StaffClients", "Staff", "Clients")
 def staffclients():
     if request.method == "POST":
         staffName = request.form["searchStaff"]
         clientName = request.form["searchClient"]
         # Retrieve staff and client names to make using the form easier
-        staffID = getStaffByName(staffName)
-        clientID = getClientByName(clientName)
+        staffID = getStaffByName(staffName, useCache=False)
+        clientID = getClientByName(clientName, useCache=False)
         if staffID and clientID:
             try:
                 addStaffClientRecord(staffID, clientID)
@@ -375,20 +950,15 @@ def staffclients():
                 return "Assignment already exists.", 400
         else:
             return "Invalid staff or client name.", 400
-    return render_template(
-        "staffclients.j2",
-        staffclients=fetchStaffClients(),
-        staff=fetchStaff(),
-        clients=fetchClientsAssignments(),
-    )
+    return render_template("staffclients.j2", staffclients=fetchStaffClients())
 
 # Route for Updating Staff-Client Assignments
 @app.route("/updatestaffclient/<int:staffID>/<int:clientID>", methods=["POST"])
 def updateStaffClient(staffID, clientID):
     staffName = request.form["staffName"]
     clientName = request.form["clientName"]
-    newStaffID = getStaffByName(staffName)
-    newClientID = getClientByName(clientName)
+    newStaffID = getStaffByName(staffName, useCache=False)
+    newClientID = getClientByName(clientName, useCache=False)
     if newStaffID and newClientID:
         try:
             updateStaffClientRecord(staffID, clientID, newStaffID, newClientID)
@@ -406,7 +976,7 @@ def deleteStaffClient(staffID, clientID):
 
 # Helper function to READ Staff-Client Assignments
 def fetchStaffClients():
-    cur = mysql.connection.cursor()
+    cur = mysql.read_connection.cursor()
     query = """
     SELECT sc.staffID, s.staffName, sc.clientID, c.clientName
     FROM StaffClients sc
@@ -416,31 +986,31 @@ def fetchStaffClients():
     cur.execute(query)
     return cur.fetchall()
 
-# Helper function to READ Staff Records
-def fetchStaff():
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT * FROM Staff;")
-    return cur.fetchall()
-
-# Helper function to READ Client Records
-def fetchClientsAssignments():
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT * FROM Clients;")
-    return cur.fetchall()
-
-# Helper function to get Staff ID by Name since the users will enter names and not IDs
-def getStaffByName(staffName):
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT staffID FROM Staff WHERE staffName = %s;", (staffName,))
-    result = cur.fetchone()
-    return result["staffID"] if result else None
-
-# Helper function to get Client ID by Name since the users will enter names and not IDs
-def getClientByName(clientName):
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT clientID FROM Clients WHERE clientName = %s;", (clientName,))
-    result = cur.fetchone()
-    return result["clientID"] if result else None
+# The name lookups behind getStaffByName and getClientByName
+STAFF_BY_NAME_QUERY = "SELECT staffID FROM Staff WHERE staffName = %s;"
+CLIENT_BY_NAME_QUERY = "SELECT clientID FROM Clients WHERE clientName = %s;"
+
+# Helper function to get Staff ID by Name since the users will enter names and not IDs.
+# Writes pass useCache=False so the ID is read in their transaction (see Name Lookup Cache)
+def getStaffByName(staffName, useCache=True):
+    staffID = lookupCache.get(("staff", staffName)) if useCache else None
+    if staffID is None:
+        cur = mysql.connection.cursor()
+        cur.execute(STAFF_BY_NAME_QUERY, (staffName,))
+        result = cur.fetchone()
+        staffID = rememberLookup(("staff", staffName), result["staffID"] if result else None)
+    return staffID
+
+# Helper function to get Client ID by Name since the users will enter names and not IDs.
+# Writes pass useCache=False so the ID is read in their transaction (see Name Lookup Cache)
+def getClientByName(clientName, useCache=True):
+    clientID = lookupCache.get(("client", clientName)) if useCache else None
+    if clientID is None:
+        cur = mysql.connection.cursor()
+        cur.execute(CLIENT_BY_NAME_QUERY, (clientName,))
+        result = cur.fetchone()
+        clientID = rememberLookup(("client", clientName), result["clientID"] if result else None)
+    return clientID
 
 # Helper function to CREATE a Staff-Client Assignment
 def addStaffClientRecord(staffID, clientID):
@@ -449,7 +1019,8 @@ def addStaffClientRecord(staffID, clientID):
         "INSERT INTO StaffClients (staffID, clientID) VALUES (%s, %s);",
         (staffID, clientID),
     )
-    mysql.connection.commit()
+    logAssignmentChange(cur, "insert", staffID, clientID)
+    commitChanges("StaffClients")
 
 # Helper function to UPDATE a Staff-Client Assignment
 def updateStaffClientRecord(staffID, clientID, newStaffID, newClientID):
@@ -458,7 +1029,9 @@ def updateStaffClientRecord(staffID, clientID, newStaffID, newClientID):
         "UPDATE StaffClients SET staffID = %s, clientID = %s WHERE staffID = %s AND clientID = %s;",
         (newStaffID, newClientID, staffID, clientID),
     )
-    mysql.connection.commit()
+    logAssignmentChange(cur, "delete", staffID, clientID)
+    logAssignmentChange(cur, "insert", newStaffID, newClientID)
+    commitChanges("StaffClients")
 
 # Helper function to DELETE a Staff-Client Assignment
 def deleteStaffClientRecord(staffID, clientID):
@@ -467,11 +1040,13 @@ def deleteStaffClientRecord(staffID, clientID):
         "DELETE FROM StaffClients WHERE staffID = %s AND clientID = %s;",
         (staffID, clientID),
     )
-    mysql.connection.commit()
+    logAssignmentChange(cur, "delete", staffID, clientID)
+    commitChanges("StaffClients")
 
 """ ___________ Routes for Tracked Days Page ___________ """
 # Route for Reading and Creating Tracked Days
 @app.route("/trackeddays", methods=["GET", "POST"])
+@cachedPage("TrackedDays", "Clients")
 def trackeddays():
     if request.method == "POST":
         clientName = request.form.get("clientName")
@@ -482,9 +1057,9 @@ def trackeddays():
         clientID = getClientNameDays(clientName)
         if not clientID:
             return "Client not found.", 400
-        # Validate the form inputs
+        # Validate the form inputs. A blank calorie target is taken from the client
         errors = validateTrackedDayForm(
-            clientID, trackedDayDate, trackedDayCalorieTarget
+            clientID, trackedDayDate, trackedDayCalorieTarget, allowBlankTarget=True
         )
         if not errors:
             try:
@@ -494,24 +1069,32 @@ def trackeddays():
                 return redirect("/trackeddays")
             except IntegrityError:
                 return "Error inserting tracked day.", 400
-        return render_template(
-            "trackeddays.j2",
-            trackeddays=fetchTrackedDays(),
-            clients=fetchClientsDays(),
-            errors=errors,
-        )
+        return renderTrackedDays(errors=errors)
     else:
-        return render_template(
-            "trackeddays.j2", trackeddays=fetchTrackedDays(), clients=fetchClientsDays()
-        )
+        return renderTrackedDays()
+
+# Helper function to render one page of the Tracked Days listing using the paging/filter arguments in the URL
+def renderTrackedDays(errors=None):
+    after, limit = getPageArgs()
+    filters = getListingFilters()
+    trackeddays, hasMore = fetchTrackedDays(
+        clientName=filters["clientName"],
+        startDate=filters["startDate"],
+        endDate=filters["endDate"],
+        after=after,
+        limit=limit,
+    )
+    return render_template(
+        "trackeddays.j2",
+        trackeddays=trackeddays,
+        errors=errors,
+        filters=filters,
+        nextPage=nextPageArgs(trackeddays, hasMore, "trackedDayID"),
+    )
 
 # Tie the entered client name back to the client ID for the search boxes
 def getClientNameDays(clientName):
-    query = "SELECT clientID FROM Clients WHERE clientName = %s;"
-    cur = mysql.connection.cursor()
-    cur.execute(query, (clientName,))
-    result = cur.fetchone()
-    return result["clientID"] if result else None
+    return getClientByName(clientName, useCache=False)
 
 # Route for Updating Tracked Days
 @app.route("/updatetrackedday/<int:trackedDayID>", methods=["POST"])
@@ -543,37 +1126,89 @@ def deleteTrackedDay(trackedDayID):
     return redirect("/trackeddays")
 
 # Helper function for validation for the Tracked Day Form
-def validateTrackedDayForm(clientID, trackedDayDate, trackedDayCalorieTarget):
+def validateTrackedDayForm(clientID, trackedDayDate, trackedDayCalorieTarget, allowBlankTarget=False):
     errors = []
     if not clientID:
         errors.append("Client ID is required.")
     if not trackedDayDate:
         errors.append("Date is required.")
     if not trackedDayCalorieTarget:
-        errors.append("Calorie target is required.")
+        if not allowBlankTarget:
+            errors.append("Calorie target is required.")
     elif int(trackedDayCalorieTarget) < 1:
         errors.append("Calorie target must be at least 1.")
     return errors
 
-# Helper function to CREATE a Tracked Day Record
+# Helper function to CREATE a Tracked Day Record. Without a calorie target, the day takes its client's
+# target, or their TDEE estimate (see getDefaultCalorieTarget)
 def insertTrackedDay(clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote):
     cur = mysql.connection.cursor()
     try:
         cur.execute(
-            "INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote) VALUES (%s, %s, %s, %s);",
-            (clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote),
+            """
+            INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote)
+            SELECT clientID, %s, COALESCE(%s, NULLIF(clientCalorieTarget, 0), clientTDEE), %s
+            FROM Clients WHERE clientID = %s;
+            """,
+            (trackedDayDate, trackedDayCalorieTarget or None, trackedDayNote, clientID),
         )
-        mysql.connection.commit()
+        logChanges(cur, "TrackedDays", "insert", [cur.lastrowid])
+        commitChanges("TrackedDays")
     except IntegrityError as e:
         mysql.connection.rollback()
         raise e
 
+# Helper function to find or create a client's tracked day for a date in the current transaction, without
+# committing. INSERT ... ON DUPLICATE KEY UPDATE against uc_day_client_date makes it one atomic statement, so two
+# clinicians adding the first entry of a day at the same time both get the same day instead of a duplicate or
+# an error. A new day takes the client's calorie target (or TDEE estimate). Returns (trackedDayID, created)
+def upsertTrackedDay(cur, clientID, trackedDayDate):
+    cur.execute(
+        """
+        INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayCalorieTarget)
+        VALUES (%s, %s, (SELECT COALESCE(NULLIF(clientCalorieTarget, 0), clientTDEE) FROM Clients WHERE clientID = %s))
+        ON DUPLICATE KEY UPDATE trackedDayID = LAST_INSERT_ID(trackedDayID);
+        """,
+        (clientID, trackedDayDate, clientID),
+    )
+    # LAST_INSERT_ID() is the day's ID either way. An existing day is left as it was, so 1 row affected means
+    # the day was inserted
+    trackedDayID, created = cur.lastrowid, cur.rowcount == 1
+    if created:
+        logChanges(cur, "TrackedDays", "insert", [trackedDayID])
+    return trackedDayID, created
+
+# Helper function used by the entry forms to get the tracked day for a client name and date, creating it if
+# the client doesn't have one yet. Returns the trackedDayID, or None if there is no such client.
+# Both lookups run in the entry's transaction, never from the lookup cache, so a day another worker just moved
+# or deleted can't be written to. The plain lookup runs first, so the upsert (which uses up an auto-increment
+# value even when the day exists) only runs for days that don't exist yet
+def resolveTrackedDay(cur, trackedDayDate, clientName):
+    trackedDayID = getTrackedDayFoodEntries(cur, trackedDayDate, clientName)
+    if trackedDayID:
+        return trackedDayID
+    clientID = getClientByName(clientName, useCache=False)
+    if not clientID:
+        return None
+    return upsertTrackedDay(cur, clientID, trackedDayDate)[0]
+
+# Helper function to read an entry form's date. Returns (date, error)
+def parseEntryDate(trackedDayDate):
+    if not trackedDayDate:
+        return None, "Date is required."
+    try:
+        return datetime.date.fromisoformat(trackedDayDate), None
+    except ValueError:
+        return None, "Date must be in YYYY-MM-DD format."
+
 # Helper function to UPDATE a Tracked Day Record
 def updateTrackedDayRecord(
     trackedDayID, clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote
 ):
     cur = mysql.connection.cursor()
     try:
+        moved = findMovedTrackedDays(cur, {trackedDayID: clientID})
+        logTrackedDayChanges(cur, "delete", moved)
         query = """
         UPDATE TrackedDays 
         SET clientID = %s, trackedDayDate = %s, trackedDayCalorieTarget = %s, trackedDayNote = %s 
@@ -589,7 +1224,11 @@ def updateTrackedDayRecord(
                 trackedDayID,
             ),
         )
-        mysql.connection.commit()
+        if moved:
+            logTrackedDayChanges(cur, "insert", moved)
+        else:
+            logChanges(cur, "TrackedDays", "update", [trackedDayID])
+        commitChanges("TrackedDays")
     except IntegrityError as e:
         mysql.connection.rollback()
         print(f"IntegrityError: {e}")
@@ -598,45 +1237,319 @@ def updateTrackedDayRecord(
 # Helper function to DELETE a Tracked Day Record
 def deleteTrackedDayRecord(trackedDayID):
     cur = mysql.connection.cursor()
+    logTrackedDayChanges(cur, "delete", [trackedDayID])
     cur.execute("DELETE FROM TrackedDays WHERE trackedDayID = %s;", (trackedDayID,))
-    mysql.connection.commit()
+    commitChanges("TrackedDays", "FoodEntries", "ExerciseEntries")
 
-# Helper function to READ the Tracked Days Records
-def fetchTrackedDays():
-    cur = mysql.connection.cursor()
-    query = """
+# The tracked day listing query, also used by the export
+TRACKED_DAYS_QUERY = """
     SELECT 
-        td.trackedDayID,
-        td.clientID,
-        td.trackedDayDate,
-        (
-            SELECT COALESCE(SUM(fe.foodEntryCalories), 0)
-            FROM FoodEntries fe
-            WHERE fe.trackedDayID = td.trackedDayID
-        ) -
-        (
-            SELECT COALESCE(SUM(ee.exerciseEntryCalories), 0)
-            FROM ExerciseEntries ee
-            WHERE ee.trackedDayID = td.trackedDayID
-        ) AS trackedDayTotalCalories,
-        td.trackedDayCalorieTarget,
-        td.trackedDayNote,
-        c.clientName
-    FROM TrackedDays td
-    JOIN Clients c ON td.clientID = c.clientID;
+        TrackedDays.trackedDayID,
+        TrackedDays.clientID,
+        TrackedDays.trackedDayDate,
+        TrackedDays.trackedDayFoodCalories - TrackedDays.trackedDayExerciseCalories AS trackedDayTotalCalories,
+        TrackedDays.trackedDayFoodCalories,
+        TrackedDays.trackedDayExerciseCalories,
+        TrackedDays.trackedDayFoodEntryCount,
+        TrackedDays.trackedDayExerciseEntryCount,
+        TrackedDays.trackedDayCalorieTarget,
+        TrackedDays.trackedDayNote,
+        Clients.clientName
+    FROM TrackedDays
+    JOIN Clients ON TrackedDays.clientID = Clients.clientID
+    """
+
+# Helper function to READ one page of the Tracked Days Records, optionally filtered by client and date range
+def fetchTrackedDays(
+    clientName=None, startDate=None, endDate=None, after=None, limit=DEFAULT_PAGE_SIZE
+):
+    conditions, params = buildListingConditions(clientName, startDate, endDate)
+    return fetchPage(
+        TRACKED_DAYS_QUERY, conditions, params, "TrackedDays.trackedDayID", after, limit
+    )
+
+""" ___________ Helpers for Tracked Day Totals ___________ """
+# Each tracked day stores running totals of its food and exercise entries, so listing the days doesn't
+# need to add up every entry again. Every entry insert/update/delete adjusts these totals with the same
+# cursor before committing, so the entry and the totals are always saved together. Deleting a client or
+# a tracked day needs no extra work since the ON DELETE CASCADE removes the day and its totals together.
+
+# Which columns to use for each kind of entry: (entry ID, entry calories, day calories total, day entry count)
+ENTRY_TOTAL_COLUMNS = {
+    "FoodEntries": (
+        "foodEntryID",
+        "foodEntryCalories",
+        "trackedDayFoodCalories",
+        "trackedDayFoodEntryCount",
+    ),
+    "ExerciseEntries": (
+        "exerciseEntryID",
+        "exerciseEntryCalories",
+        "trackedDayExerciseCalories",
+        "trackedDayExerciseEntryCount",
+    ),
+}
+
+# Helper function to add a new entry's calories to its tracked day's totals
+def addEntryToTotals(cur, entryTable, trackedDayID, calories):
+    _, _, dayCalories, dayCount = ENTRY_TOTAL_COLUMNS[entryTable]
+    cur.execute(
+        f"UPDATE TrackedDays SET {dayCalories} = {dayCalories} + %s, {dayCount} = {dayCount} + 1 WHERE trackedDayID = %s;",
+        (calories, trackedDayID),
+    )
+
+# Helper function to swap an entry's old calories for its new calories in the totals. Must run BEFORE the entry itself is updated
+def changeEntryInTotals(cur, entryTable, entryID, calories):
+    entryIDColumn, entryCalories, dayCalories, _ = ENTRY_TOTAL_COLUMNS[entryTable]
+    cur.execute(
+        f"""
+        UPDATE TrackedDays
+        JOIN {entryTable} ON {entryTable}.trackedDayID = TrackedDays.trackedDayID
+        SET TrackedDays.{dayCalories} = TrackedDays.{dayCalories} - CAST({entryTable}.{entryCalories} AS SIGNED) + %s
+        WHERE {entryTable}.{entryIDColumn} = %s;
+        """,
+        (calories, entryID),
+    )
+
+# Helper function to take an entry out of its tracked day's totals. Must run BEFORE the entry itself is deleted
+def removeEntryFromTotals(cur, entryTable, entryID):
+    entryIDColumn, entryCalories, dayCalories, dayCount = ENTRY_TOTAL_COLUMNS[entryTable]
+    cur.execute(
+        f"""
+        UPDATE TrackedDays
+        JOIN {entryTable} ON {entryTable}.trackedDayID = TrackedDays.trackedDayID
+        SET TrackedDays.{dayCalories} = TrackedDays.{dayCalories} - CAST({entryTable}.{entryCalories} AS SIGNED),
+            TrackedDays.{dayCount} = TrackedDays.{dayCount} - 1
+        WHERE {entryTable}.{entryIDColumn} = %s;
+        """,
+        (entryID,),
+    )
+
+# The real totals, added up from the entries themselves. Used to repair and to check the stored totals.
+# Archived entries still count towards their tracked day's totals
+ACTUAL_TOTALS_QUERY = """
+    FROM TrackedDays
+    LEFT JOIN (
+        SELECT trackedDayID, SUM(foodEntryCalories) AS calories, COUNT(*) AS entries
+        FROM (
+            SELECT trackedDayID, foodEntryCalories FROM FoodEntries {dayFilter}
+            UNION ALL
+            SELECT trackedDayID, foodEntryCalories FROM FoodEntriesArchive {dayFilter}
+        ) AS foodEntries
+        GROUP BY trackedDayID
+    ) AS food ON food.trackedDayID = TrackedDays.trackedDayID
+    LEFT JOIN (
+        SELECT trackedDayID, SUM(exerciseEntryCalories) AS calories, COUNT(*) AS entries
+        FROM (
+            SELECT trackedDayID, exerciseEntryCalories FROM ExerciseEntries {dayFilter}
+            UNION ALL
+            SELECT trackedDayID, exerciseEntryCalories FROM ExerciseEntriesArchive {dayFilter}
+        ) AS exerciseEntries
+        GROUP BY trackedDayID
+    ) AS exercise ON exercise.trackedDayID = TrackedDays.trackedDayID
+"""
+
+# Helper function to build the optional "only these tracked days" filter for the totals queries
+def trackedDayFilter(trackedDayIDs):
+    if trackedDayIDs is None:
+        return "", []
+    placeholders = ", ".join(["%s"] * len(trackedDayIDs))
+    return f"WHERE trackedDayID IN ({placeholders})", list(trackedDayIDs)
+
+# Helper function to recompute the stored totals from the entries, for all tracked days or only the given ones.
+# Does not commit, so callers can include it in a larger transaction
+def rebuildTrackedDayTotals(cur, trackedDayIDs=None):
+    if trackedDayIDs is not None and not trackedDayIDs:
+        return 0
+    dayFilter, dayParams = trackedDayFilter(trackedDayIDs)
+    # The filter is used by every entry table in the subqueries
+    params = dayParams * ACTUAL_TOTALS_QUERY.count("{dayFilter}")
+    query = "UPDATE" + ACTUAL_TOTALS_QUERY.format(dayFilter=dayFilter) + """
+    SET
+        TrackedDays.trackedDayFoodCalories = COALESCE(food.calories, 0),
+        TrackedDays.trackedDayFoodEntryCount = COALESCE(food.entries, 0),
+        TrackedDays.trackedDayExerciseCalories = COALESCE(exercise.calories, 0),
+        TrackedDays.trackedDayExerciseEntryCount = COALESCE(exercise.entries, 0)
+    """
+    if trackedDayIDs is not None:
+        query += " WHERE TrackedDays.trackedDayID IN ({})".format(
+            ", ".join(["%s"] * len(dayParams))
+        )
+        params += dayParams
+    cur.execute(query + ";", params)
+    return cur.rowcount
+
+# Helper function to list the tracked days whose stored totals don't match their entries
+def findTrackedDayTotalDrift(cur):
+    query = """
+    SELECT
+        TrackedDays.trackedDayID,
+        TrackedDays.trackedDayFoodCalories,
+        COALESCE(food.calories, 0) AS actualFoodCalories,
+        TrackedDays.trackedDayFoodEntryCount,
+        COALESCE(food.entries, 0) AS actualFoodEntryCount,
+        TrackedDays.trackedDayExerciseCalories,
+        COALESCE(exercise.calories, 0) AS actualExerciseCalories,
+        TrackedDays.trackedDayExerciseEntryCount,
+        COALESCE(exercise.entries, 0) AS actualExerciseEntryCount
+    """ + ACTUAL_TOTALS_QUERY.format(dayFilter="") + """
+    WHERE TrackedDays.trackedDayFoodCalories <> COALESCE(food.calories, 0)
+        OR TrackedDays.trackedDayFoodEntryCount <> COALESCE(food.entries, 0)
+        OR TrackedDays.trackedDayExerciseCalories <> COALESCE(exercise.calories, 0)
+        OR TrackedDays.trackedDayExerciseEntryCount <> COALESCE(exercise.entries, 0)
+    ORDER BY TrackedDays.trackedDayID;
     """
     cur.execute(query)
     return cur.fetchall()
 
-# Helper function to READ the Clients Records
-def fetchClientsDays():
+# Tracked days repaired per transaction by repairTrackedDayTotals
+REPAIR_BATCH_SIZE = 1000
+
+# Helper function to rebuild the totals of the given tracked days a batch at a time, committing each batch
+# so a large repair never builds one huge IN (...) list or keeps every affected day locked until the end
+def repairTrackedDayTotals(trackedDayIDs, batchSize=REPAIR_BATCH_SIZE, progress=None):
     cur = mysql.connection.cursor()
-    cur.execute("SELECT clientID, clientName FROM Clients;")
-    return cur.fetchall()
+    repaired = 0
+    for batch in chunked(trackedDayIDs, batchSize):
+        rebuildTrackedDayTotals(cur, batch)
+        logChanges(cur, "TrackedDays", "update", batch)
+        commitChanges("TrackedDays")
+        repaired += len(batch)
+        if progress:
+            progress(repaired, len(trackedDayIDs))
+    return repaired
+
+""" ___________ Helpers for the Entry Archive ___________ """
+# "flask archive-entries" moves the food and exercise entries of closed periods into compressed archive
+# tables with the same columns, so the live tables and their indexes stay the size of the recent past.
+# Tracked days are never archived and keep their stored totals, so reports read them as before. Listings,
+# exports and the API also read the archive, unless their date filter starts after the archived periods.
+# Archived entries are read-only; the edit and delete routes only change live entries, and answer 409 when
+# asked to change an archived one.
+
+# Live entry table -> its archive table, and the columns moved between them
+ARCHIVE_TABLES = {
+    "FoodEntries": (
+        "FoodEntriesArchive",
+        ("foodEntryID", "trackedDayID", "foodID", "foodEntryCalories", "foodEntryGramWeight", "foodEntryNote", "foodEntryCaloriesDerived"),
+    ),
+    "ExerciseEntries": (
+        "ExerciseEntriesArchive",
+        ("exerciseEntryID", "trackedDayID", "exerciseEntryName", "exerciseEntryType", "exerciseEntryCalories", "exerciseEntryNote"),
+    ),
+}
+ARCHIVED_THROUGH_QUERY = "SELECT MAX(archivedThrough) AS archivedThrough FROM ArchivedPeriods;"
+# Entries moved per transaction by the archive command
+ARCHIVE_BATCH_SIZE = 5000
+# Whole months of entries kept in the live tables, besides the current month
+ARCHIVE_KEEP_MONTHS = int(os.environ.get("KILOJULIA_ARCHIVE_KEEP_MONTHS", 12))
+
+ARCHIVED_ENTRY_ERROR = "This entry is archived and can no longer be changed."
+
+# Helper function to get the last date whose entries have been archived, or None if nothing has been
+def getArchivedThrough():
+    cur = mysql.read_connection.cursor()
+    cur.execute(ARCHIVED_THROUGH_QUERY)
+    return cur.fetchone()["archivedThrough"]
+
+# Helper function to turn a query that reads an entry table into the same query on its archive table.
+# Returns None when the archive can't hold any matching rows: nothing is archived, or the date filter
+# starts after the archived periods
+def buildArchiveQuery(query, entryTable, archivedThrough, startDate=None):
+    if archivedThrough is None or (startDate and str(startDate) > archivedThrough.isoformat()):
+        return None
+    archiveTable = ARCHIVE_TABLES[entryTable][0]
+    return re.sub(rf"\bFROM\s+{entryTable}\b", f"FROM {archiveTable} AS {entryTable}", query, count=1)
+
+def getArchiveQuery(query, entryTable, startDate=None):
+    return buildArchiveQuery(query, entryTable, getArchivedThrough(), startDate)
+
+# Helper function to check whether an entry is in the archive. Used when an edit or delete matched no live
+# row, so the route can say the entry is archived rather than report a change that didn't happen
+def isArchivedEntry(cur, entryTable, entryID):
+    archiveTable, columns = ARCHIVE_TABLES[entryTable]
+    cur.execute(f"SELECT 1 FROM {archiveTable} WHERE {columns[0]} = %s;", (entryID,))
+    return cur.fetchone() is not None
+
+# Helper function to merge one keyset page read from a live table and one read from its archive. Each is
+# ordered by the key and holds at most limit + 1 rows, so the first limit + 1 of the two together are the page
+def mergeArchivedRows(rows, archivedRows, keyFields, limit):
+    merged = sorted(list(rows) + list(archivedRows), key=lambda row: tuple(row[field] for field in keyFields))
+    return merged[:limit + 1]
+
+# Helper function to work out the default archive date: the end of the last month outside the kept months
+def getDefaultArchiveThrough(today=None):
+    today = today or datetime.date.today()
+    month = today.year * 12 + today.month - 1 - ARCHIVE_KEEP_MONTHS
+    return datetime.date(month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+
+# Helper function to move the entries of tracked days up to and including a date into the archive tables.
+# Works through each table in ID order, one batch per transaction, copying then deleting the batch in the same
+# transaction so every entry is always in exactly one of the two tables, and counting it towards the period in
+# ArchivedPeriods as it goes. Returns {table: entries moved}.
+# progress, if given, is called with the number moved so far after each batch
+def archiveEntries(through, batchSize=ARCHIVE_BATCH_SIZE, progress=None):
+    cur = mysql.connection.cursor()
+    # Record the period first, so readers look in the archive for these dates while entries are moving
+    cur.execute("INSERT IGNORE INTO ArchivedPeriods (archivedThrough) VALUES (%s);", (through,))
+    mysql.connection.commit()
+    moved = {}
+    for entryTable, (archiveTable, columns) in ARCHIVE_TABLES.items():
+        idColumn = f"{entryTable}.{columns[0]}"
+        batchFilter = f"""
+            FROM {entryTable}
+            JOIN TrackedDays ON {entryTable}.trackedDayID = TrackedDays.trackedDayID
+            WHERE TrackedDays.trackedDayDate <= %s AND {idColumn} > %s AND {idColumn} <= %s
+        """
+        lastID = 0
+        moved[entryTable] = 0
+        while True:
+            cur.execute(
+                f"""
+                SELECT MAX(entryID) AS batchEnd FROM (
+                    SELECT {idColumn} AS entryID
+                    FROM {entryTable}
+                    JOIN TrackedDays ON {entryTable}.trackedDayID = TrackedDays.trackedDayID
+                    WHERE TrackedDays.trackedDayDate <= %s AND {idColumn} > %s
+                    ORDER BY {idColumn} LIMIT %s
+                ) AS batch;
+                """,
+                (through, lastID, batchSize),
+            )
+            batchEnd = cur.fetchone()["batchEnd"]
+            if batchEnd is None:
+                break
+            batch = (through, lastID, batchEnd)
+            cur.execute(
+                "INSERT INTO {} ({}) SELECT {} {};".format(
+                    archiveTable,
+                    ", ".join(columns),
+                    ", ".join(f"{entryTable}.{column}" for column in columns),
+                    batchFilter,
+                ),
+                batch,
+            )
+            cur.execute(f"DELETE {entryTable} {batchFilter};", batch)
+            moved[entryTable] += cur.rowcount
+            # The period's count goes up in the same transaction, so it stays right if the run is stopped
+            cur.execute(
+                f"""
+                UPDATE ArchivedPeriods
+                SET archivedAt = CURRENT_TIMESTAMP, archived{entryTable} = archived{entryTable} + %s
+                WHERE archivedThrough = %s;
+                """,
+                (cur.rowcount, through),
+            )
+            commitChanges(entryTable)
+            lastID = batchEnd
+            if progress:
+                progress(sum(moved.values()))
+    return moved
 
 """ ___________ Routes for Foods Page ___________ """
 # Route for Reading and Updating Food Records
 @app.route("/foods", methods=["GET", "POST"])
+@cachedPage("Foods")
 def foods():
     if request.method == "POST":
         foodName = request.form["foodName"]
@@ -691,7 +1604,7 @@ def validateFoodForm(foodName, foodType, foodCaloriesPerGram):
 
 # Helper function to READ the Food Records
 def fetchFoods():
-    cur = mysql.connection.cursor()
+    cur = mysql.read_connection.cursor()
     cur.execute("SELECT * FROM Foods;")
     return cur.fetchall()
 
@@ -703,7 +1616,8 @@ def insertFood(foodName, foodType, foodCaloriesPerGram, foodNote):
             "INSERT INTO Foods (foodName, foodType, foodCaloriesPerGram, foodNote) VALUES (%s, %s, %s, %s);",
             (foodName, foodType, foodCaloriesPerGram, foodNote),
         )
-        mysql.connection.commit()
+        commitChanges("Foods")
+        invalidateNames("food")
     except IntegrityError as e:
         mysql.connection.rollback()
         raise e
@@ -712,26 +1626,53 @@ def insertFood(foodName, foodType, foodCaloriesPerGram, foodNote):
 def updateFoodRecord(foodID, foodName, foodType, foodCaloriesPerGram, foodNote):
     cur = mysql.connection.cursor()
     try:
+        cur.execute("SELECT foodCaloriesPerGram FROM Foods WHERE foodID = %s;", (foodID,))
+        oldFood = cur.fetchone()
         cur.execute(
             "UPDATE Foods SET foodName = %s, foodType = %s, foodCaloriesPerGram = %s, foodNote = %s WHERE foodID = %s;",
             (foodName, foodType, foodCaloriesPerGram, foodNote, foodID),
         )
-        mysql.connection.commit()
+        commitChanges("Foods")
+        invalidateNames("food")
     except IntegrityError as e:
         mysql.connection.rollback()
         raise e
+    # Entries whose calories were worked out from this food need recomputing if its calories per gram changed.
+    # The request does it in batches, unless KILOJULIA_BACKGROUND_RECOMPUTE=1 hands it to a job worker. The food is
+    # already saved, so if the job cannot be queued the request recomputes them itself rather than failing
+    if oldFood and Decimal(str(oldFood["foodCaloriesPerGram"])) != Decimal(str(foodCaloriesPerGram)):
+        if BACKGROUND_RECOMPUTE:
+            try:
+                jobQueue.submit("recompute-food-calories", {"foodID": foodID})
+                return
+            except Exception as e:
+                print(f"Could not queue recompute-food-calories for food {foodID}, recomputing now: {e}")
+        recomputeDerivedFoodCalories(foodID)
 
 # Helper function to DELETE a Food record
 def deleteFoodRecord(foodID):
     cur = mysql.connection.cursor()
     cur.execute("DELETE FROM Foods WHERE foodID = %s;", (foodID,))
-    mysql.connection.commit()
+    commitChanges("Foods", "FoodEntries")
+    invalidateNames("food")
 
 """ ___________ Routes for Food Entries Page ___________ """
 # Route for displaying Food Entries
 @app.route("/foodentries", methods=["GET"])
+@cachedPage("FoodEntries", "Foods", "TrackedDays", "Clients")
 def foodentries():
-    query = """
+    after, limit = getPageArgs()
+    filters = getListingFilters()
+    foodentries, hasMore = fetchFoodEntries(**filters, after=after, limit=limit)
+    return render_template(
+        "foodentries.j2",
+        foodentries=foodentries,
+        filters=filters,
+        nextPage=nextPageArgs(foodentries, hasMore, "foodEntryID"),
+    )
+
+# The food entry listing query, also used by the export
+FOOD_ENTRIES_QUERY = """
     SELECT 
         FoodEntries.foodEntryID, 
         TrackedDays.trackedDayDate, 
@@ -747,16 +1688,24 @@ def foodentries():
     JOIN 
         TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
     JOIN 
-        Clients ON TrackedDays.clientID = Clients.clientID;
+        Clients ON TrackedDays.clientID = Clients.clientID
     """
-    cur = mysql.connection.cursor()
-    cur.execute(query)
-    foodentries = cur.fetchall()
-    return render_template(
-        "foodentries.j2",
-        foodentries=foodentries,
-        clients=fetchClientNamesFoodEntries(),
-        foods=fetchFoodNames(),
+
+# Helper function to READ one page of Food Entries, optionally filtered by client, date range and food
+def fetchFoodEntries(
+    clientName=None,
+    startDate=None,
+    endDate=None,
+    foodName=None,
+    after=None,
+    limit=DEFAULT_PAGE_SIZE,
+):
+    conditions, params = buildListingConditions(
+        clientName, startDate, endDate, foodName
+    )
+    return fetchPage(
+        FOOD_ENTRIES_QUERY, conditions, params, "FoodEntries.foodEntryID", after, limit,
+        archiveQuery=getArchiveQuery(FOOD_ENTRIES_QUERY, "FoodEntries", startDate),
     )
 
 # Route for adding food entries
@@ -768,21 +1717,38 @@ def addfoodentry():
     gramWeight = request.form["gramWeight"]
     calories = request.form["calories"]
     note = request.form["note"]
-    # Fetch the tracked day ID since tracked days are an FK inside food entries
-    trackedDayID = getTrackedDayFoodEntries(trackedDayDate, clientName)
-    if not trackedDayID:
-        return "Tracked day not found for the given date and client name.", 400
+    trackedDayDate, error = parseEntryDate(trackedDayDate)
+    if error:
+        return error, 400
     # Fetch the food ID if there is one, otherwise set it to NULL (Foods are Nullable in Food Entries)
     foodID = fetchFoodsFoodEntries(foodName)
     if not foodID:
         foodID = None
+    # Blank calories are worked out from the food's calories per gram
+    derived = shouldDeriveCalories(calories, foodID is not None)
+    errors = validateFoodEntryForm(gramWeight, calories, derived)
+    if errors:
+        return ", ".join(errors), 400
     cur = mysql.connection.cursor()
     try:
+        if derived:
+            caloriesPerGram = lockFoodRates(cur, [foodID]).get(foodID)
+            if caloriesPerGram is None:
+                mysql.connection.rollback()
+                return "Food not found.", 400
+            calories = calculateFoodCalories(caloriesPerGram, gramWeight)
+        # The tracked day is found or created in the same transaction as the entry, so logging the first
+        # meal of a day doesn't need the day to be added on the Tracked Days page first
+        trackedDayID = resolveTrackedDay(cur, trackedDayDate, clientName)
+        if not trackedDayID:
+            return "Client not found.", 400
         cur.execute(
-            "INSERT INTO FoodEntries (trackedDayID, foodID, foodEntryCalories, foodEntryGramWeight, foodEntryNote) VALUES (%s, %s, %s, %s, %s);",
-            (trackedDayID, foodID, calories, gramWeight, note),
+            "INSERT INTO FoodEntries (trackedDayID, foodID, foodEntryCalories, foodEntryGramWeight, foodEntryNote, foodEntryCaloriesDerived) VALUES (%s, %s, %s, %s, %s, %s);",
+            (trackedDayID, foodID, calories, gramWeight, note, derived),
         )
-        mysql.connection.commit()
+        logChanges(cur, "FoodEntries", "insert", [cur.lastrowid])
+        addEntryToTotals(cur, "FoodEntries", trackedDayID, calories)
+        commitChanges("FoodEntries", "TrackedDays")
         return redirect("/foodentries")
     except IntegrityError:
         mysql.connection.rollback()
@@ -794,19 +1760,31 @@ def updatefoodentry(foodEntryID):
     gramWeight = request.form["gramWeight"]
     calories = request.form["calories"]
     note = request.form["note"]
-    # Validate the input values
-    if not gramWeight or int(gramWeight) < 1:
-        return "Weight must be at least 1 gram.", 400
-    if not calories or int(calories) < 1:
-        return "Calories must be at least 1.", 400
     cur = mysql.connection.cursor()
+    # Blank calories are worked out again from the entry's food, if it still has one
+    foodID = getEntryFoodID(cur, foodEntryID)
+    caloriesPerGram = lockFoodRates(cur, [foodID]).get(foodID) if foodID else None
+    derived = shouldDeriveCalories(calories, caloriesPerGram is not None)
+    # Validate the input values
+    errors = validateFoodEntryForm(gramWeight, calories, derived)
+    if errors:
+        mysql.connection.rollback()
+        return ", ".join(errors), 400
+    if derived:
+        calories = calculateFoodCalories(caloriesPerGram, gramWeight)
     try:
+        changeEntryInTotals(cur, "FoodEntries", foodEntryID, calories)
         cur.execute(
-            "UPDATE FoodEntries SET foodEntryCalories = %s, foodEntryGramWeight = %s, foodEntryNote = %s WHERE foodEntryID = %s;",
-            (calories, gramWeight, note, foodEntryID),
+            "UPDATE FoodEntries SET foodEntryCalories = %s, foodEntryGramWeight = %s, foodEntryNote = %s, foodEntryCaloriesDerived = %s WHERE foodEntryID = %s;",
+            (calories, gramWeight, note, derived, foodEntryID),
         )
-        mysql.connection.commit()
-        return "OK"
+        if cur.rowcount == 0 and isArchivedEntry(cur, "FoodEntries", foodEntryID):
+            mysql.connection.rollback()
+            return ARCHIVED_ENTRY_ERROR, 409
+        logChanges(cur, "FoodEntries", "update", [foodEntryID])
+        commitChanges("FoodEntries", "TrackedDays")
+        # Send back the saved calories so the page can show them when they were worked out here
+        return jsonify(foodEntryCalories=int(calories))
     except IntegrityError:
         mysql.connection.rollback()
         return "An error occurred while updating the food entry.", 400
@@ -817,10 +1795,14 @@ def setfoodnull(foodEntryID):
     cur = mysql.connection.cursor()
     try:
         cur.execute(
-            "UPDATE FoodEntries SET foodID = NULL WHERE foodEntryID = %s;",
+            "UPDATE FoodEntries SET foodID = NULL, foodEntryCaloriesDerived = 0 WHERE foodEntryID = %s;",
             (foodEntryID,),
         )
-        mysql.connection.commit()
+        if cur.rowcount == 0 and isArchivedEntry(cur, "FoodEntries", foodEntryID):
+            mysql.connection.rollback()
+            return ARCHIVED_ENTRY_ERROR, 409
+        logChanges(cur, "FoodEntries", "update", [foodEntryID])
+        commitChanges("FoodEntries")
         return "OK"
     except IntegrityError:
         mysql.connection.rollback()
@@ -830,48 +1812,157 @@ def setfoodnull(foodEntryID):
 @app.route("/deletefoodentry/<int:foodEntryID>", methods=["POST"])
 def deletefoodentry(foodEntryID):
     cur = mysql.connection.cursor()
+    logChanges(cur, "FoodEntries", "delete", [foodEntryID])
+    removeEntryFromTotals(cur, "FoodEntries", foodEntryID)
     cur.execute("DELETE FROM FoodEntries WHERE foodEntryID = %s;", (foodEntryID,))
-    mysql.connection.commit()
+    if cur.rowcount == 0 and isArchivedEntry(cur, "FoodEntries", foodEntryID):
+        mysql.connection.rollback()
+        return ARCHIVED_ENTRY_ERROR, 409
+    commitChanges("FoodEntries", "TrackedDays")
     return redirect("/foodentries")
 
-# Route to retrieved the tracked day associated with a food entry using the client name and date
-def getTrackedDayFoodEntries(trackedDayDate, clientName):
-    query = """
+# Helper function for validation for the Food Entry Form. Calories may be left blank when they will be derived from the food
+def validateFoodEntryForm(gramWeight, calories, deriveCalories=False):
+    errors = []
+    if not gramWeight or int(gramWeight) < 1:
+        errors.append("Weight must be at least 1 gram.")
+    if not deriveCalories and (not calories or int(calories) < 1):
+        errors.append("Calories must be at least 1.")
+    return errors
+
+""" ___________ Helpers for Derived Food Calories ___________ """
+# A food entry's calories can be left blank, in which case they are worked out from the food's calories per
+# gram. Those entries are flagged (foodEntryCaloriesDerived) so they are recomputed if the food is corrected.
+# Setting KILOJULIA_ALWAYS_DERIVE_CALORIES=1 works out the calories of every entry that has a food.
+ALWAYS_DERIVE_CALORIES = os.environ.get("KILOJULIA_ALWAYS_DERIVE_CALORIES") == "1"
+# Entries recomputed per transaction when a food changes, so the table is never locked for long
+RECOMPUTE_BATCH_SIZE = 2000
+# When a food's calories per gram change, the request recomputes its entries in batches. Set to 1 to hand that to a
+# background job instead (only with flask run-jobs running), so requests for popular foods return sooner
+BACKGROUND_RECOMPUTE = os.environ.get("KILOJULIA_BACKGROUND_RECOMPUTE") == "1"
+
+# Helper function to decide whether an entry's calories should be worked out from its food
+def shouldDeriveCalories(calories, hasFood):
+    return hasFood and (ALWAYS_DERIVE_CALORIES or not calories)
+
+# Helper function to work out an entry's calories. Rounds the same way as MySQL's ROUND() on a DECIMAL
+def calculateFoodCalories(caloriesPerGram, gramWeight):
+    calories = Decimal(str(caloriesPerGram)) * int(gramWeight)
+    return int(calories.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+# Helper function to read foods' calories per gram for entries being saved in the current transaction.
+# The rates are never cached, and the shared lock makes a change to one of these foods wait until this
+# transaction commits, so the recompute that follows the change always sees these entries.
+# Returns {foodID: caloriesPerGram}; foods that no longer exist are left out
+def lockFoodRates(cur, foodIDs):
+    rates = {}
+    for ids in chunked(sorted(set(foodIDs))):
+        placeholders = ", ".join(["%s"] * len(ids))
+        cur.execute(
+            f"SELECT foodID, foodCaloriesPerGram FROM Foods WHERE foodID IN ({placeholders}) LOCK IN SHARE MODE;",
+            ids,
+        )
+        for row in cur.fetchall():
+            rates[row["foodID"]] = row["foodCaloriesPerGram"]
+    return rates
+
+# Helper function to get the ID of the food linked to an entry, or None if it has no food
+def getEntryFoodID(cur, foodEntryID):
+    cur.execute("SELECT foodID FROM FoodEntries WHERE foodEntryID = %s;", (foodEntryID,))
+    result = cur.fetchone()
+    return result["foodID"] if result else None
+
+# The last entry ID of the next batch of a food's derived entries, after a given entry ID
+DERIVED_BATCH_END_QUERY = """
+    SELECT MAX(foodEntryID) AS batchEnd FROM (
+        SELECT foodEntryID FROM FoodEntries
+        WHERE foodID = %s AND foodEntryCaloriesDerived = 1 AND foodEntryID > %s
+        ORDER BY foodEntryID LIMIT %s
+    ) AS batch;
+    """
+
+# Helper function to recompute the derived calories of every entry of a food, and the tracked day totals
+# they feed into. Works through the entries in ID order, one batch per transaction, with two set-based
+# statements per batch (one for the day totals, one for the entries). Returns the number of entries updated.
+# progress, if given, is called with the number updated so far after each batch
+def recomputeDerivedFoodCalories(foodID, batchSize=RECOMPUTE_BATCH_SIZE, progress=None):
+    cur = mysql.connection.cursor()
+    lastID = 0
+    updated = 0
+    while True:
+        cur.execute(DERIVED_BATCH_END_QUERY, (foodID, lastID, batchSize))
+        batchEnd = cur.fetchone()["batchEnd"]
+        if batchEnd is None:
+            return updated
+        batch = (foodID, lastID, batchEnd)
+        # Move each day's total by the difference between the new and old calories of its entries
+        cur.execute(
+            """
+            UPDATE TrackedDays
+            JOIN (
+                SELECT FoodEntries.trackedDayID,
+                    SUM(CAST(ROUND(Foods.foodCaloriesPerGram * FoodEntries.foodEntryGramWeight) AS SIGNED)
+                        - CAST(FoodEntries.foodEntryCalories AS SIGNED)) AS calorieChange
+                FROM FoodEntries
+                JOIN Foods ON FoodEntries.foodID = Foods.foodID
+                WHERE FoodEntries.foodID = %s AND FoodEntries.foodEntryCaloriesDerived = 1
+                    AND FoodEntries.foodEntryID > %s AND FoodEntries.foodEntryID <= %s
+                GROUP BY FoodEntries.trackedDayID
+            ) AS changes ON changes.trackedDayID = TrackedDays.trackedDayID
+            SET TrackedDays.trackedDayFoodCalories = TrackedDays.trackedDayFoodCalories + changes.calorieChange;
+            """,
+            batch,
+        )
+        cur.execute(
+            """
+            UPDATE FoodEntries
+            JOIN Foods ON FoodEntries.foodID = Foods.foodID
+            SET FoodEntries.foodEntryCalories = ROUND(Foods.foodCaloriesPerGram * FoodEntries.foodEntryGramWeight)
+            WHERE FoodEntries.foodID = %s AND FoodEntries.foodEntryCaloriesDerived = 1
+                AND FoodEntries.foodEntryID > %s AND FoodEntries.foodEntryID <= %s;
+            """,
+            batch,
+        )
+        updated += cur.rowcount
+        # Logged as changes to the tracked days whose totals moved rather than one row per entry
+        cur.execute(
+            "SELECT DISTINCT trackedDayID FROM FoodEntries WHERE foodID = %s AND foodEntryCaloriesDerived = 1 AND foodEntryID > %s AND foodEntryID <= %s;",
+            batch,
+        )
+        logChanges(cur, "TrackedDays", "update", [row["trackedDayID"] for row in cur.fetchall()])
+        commitChanges("FoodEntries", "TrackedDays")
+        lastID = batchEnd
+        if progress:
+            progress(updated)
+
+TRACKED_DAY_BY_CLIENT_NAME_QUERY = """
     SELECT TrackedDays.trackedDayID
     FROM TrackedDays
     JOIN Clients ON TrackedDays.clientID = Clients.clientID
     WHERE TrackedDays.trackedDayDate = %s AND Clients.clientName = %s;
     """
-    cur = mysql.connection.cursor()
-    cur.execute(query, (trackedDayDate, clientName))
+
+# Route to retrieved the tracked day associated with a food entry using the client name and date. Only used by
+# writes, so it is read in the caller's transaction and never cached
+def getTrackedDayFoodEntries(cur, trackedDayDate, clientName):
+    cur.execute(TRACKED_DAY_BY_CLIENT_NAME_QUERY, (trackedDayDate, clientName))
     result = cur.fetchone()
     return result["trackedDayID"] if result else None
 
-# Route to get the food ID using the food name
+FOOD_BY_NAME_QUERY = "SELECT foodID FROM Foods WHERE foodName = %s;"
+
+# Route to get the food ID using the food name. Only used by writes, so it is read in the current transaction
+# and never cached, and a food renamed by another worker can't be picked up by its old name
 def fetchFoodsFoodEntries(foodName):
-    query = "SELECT foodID FROM Foods WHERE foodName = %s;"
     cur = mysql.connection.cursor()
-    cur.execute(query, (foodName,))
+    cur.execute(FOOD_BY_NAME_QUERY, (foodName,))
     result = cur.fetchone()
     return result["foodID"] if result else None
 
-# Route to get Client Names 
-def fetchClientNamesFoodEntries():
-    query = "SELECT clientName FROM Clients;"
-    cur = mysql.connection.cursor()
-    cur.execute(query)
-    return cur.fetchall()
-
-# Route to get Food Names
-def fetchFoodNames():
-    query = "SELECT foodName FROM Foods;"
-    cur = mysql.connection.cursor()
-    cur.execute(query)
-    return cur.fetchall()
-
 """ ___________ Routes for Exercise Entries Page ___________ """
 # Route for Reading and Creating Exercise Entries
 @app.route("/exerciseentries", methods=["GET", "POST"])
+@cachedPage("ExerciseEntries", "TrackedDays", "Clients")
 def exerciseentries():
     if request.method == "POST":
         trackedDayDate = request.form["trackedDayDate"]
@@ -880,16 +1971,19 @@ def exerciseentries():
         exerciseEntryType = request.form["type"]
         exerciseEntryCalories = request.form["calories"]
         exerciseEntryNote = request.form["note"]
-        # Fetch the tracked day ID
-        trackedDayID = getTrackedDaysExerciseEntries(trackedDayDate, clientName)
-        if not trackedDayID:
-            return "Tracked day not found for the given date and client name.", 400
+        trackedDayDate, error = parseEntryDate(trackedDayDate)
+        if error:
+            return error, 400
         # Validate the form data
         errors = validateExerciseEntryForm(
             exerciseEntryName, exerciseEntryType, exerciseEntryCalories
         )
         if not errors:
             try:
+                # Find or create the tracked day; insertExerciseEntry commits it along with the entry
+                trackedDayID = resolveTrackedDay(mysql.connection.cursor(), trackedDayDate, clientName)
+                if not trackedDayID:
+                    return "Client not found.", 400
                 insertExerciseEntry(
                     trackedDayID,
                     exerciseEntryName,
@@ -900,16 +1994,26 @@ def exerciseentries():
                 return redirect("/exerciseentries")
             except IntegrityError:
                 return "An error occurred while adding the exercise entry.", 400
-        return render_template(
-            "exerciseentries.j2",
-            exerciseentries=fetchExerciseEntries(),
-            errors=errors,
-            clients=fetchClientNamesFoodEntries(),
-        )
+        return renderExerciseEntries(errors=errors)
+    return renderExerciseEntries()
+
+# Helper function to render one page of the Exercise Entries listing using the paging/filter arguments in the URL
+def renderExerciseEntries(errors=None):
+    after, limit = getPageArgs()
+    filters = getListingFilters()
+    exerciseentries, hasMore = fetchExerciseEntries(
+        clientName=filters["clientName"],
+        startDate=filters["startDate"],
+        endDate=filters["endDate"],
+        after=after,
+        limit=limit,
+    )
     return render_template(
         "exerciseentries.j2",
-        exerciseentries=fetchExerciseEntries(),
-        clients=fetchClientNamesExerciseEntries(),
+        exerciseentries=exerciseentries,
+        errors=errors,
+        filters=filters,
+        nextPage=nextPageArgs(exerciseentries, hasMore, "exerciseEntryID"),
     )
 
 # Route for Updating Exercise Entries
@@ -925,13 +2029,14 @@ def updateExerciseEntry(exerciseEntryID):
     )
     if not errors:
         try:
-            updateExerciseEntryRecord(
+            if not updateExerciseEntryRecord(
                 exerciseEntryID,
                 exerciseEntryName,
                 exerciseEntryType,
                 exerciseEntryCalories,
                 exerciseEntryNote,
-            )
+            ):
+                return ARCHIVED_ENTRY_ERROR, 409
             return "OK"
         except IntegrityError:
             errors.append("An error occurred while updating the exercise entry.")
@@ -940,7 +2045,8 @@ def updateExerciseEntry(exerciseEntryID):
 # Route for Deleting Exercise Entries
 @app.route("/deleteexerciseentry/<int:exerciseEntryID>", methods=["POST"])
 def deleteExerciseEntry(exerciseEntryID):
-    deleteExerciseEntryRecord(exerciseEntryID)
+    if not deleteExerciseEntryRecord(exerciseEntryID):
+        return ARCHIVED_ENTRY_ERROR, 409
     return redirect("/exerciseentries")
 
 # Helper function for validation for the Exercise Entry Form
@@ -956,9 +2062,8 @@ def validateExerciseEntryForm(
         errors.append("Calories must be a positive number.")
     return errors
 
-# Helper function to READ the Exercise Entries
-def fetchExerciseEntries():
-    query = """
+# The exercise entry listing query, also used by the export
+EXERCISE_ENTRIES_QUERY = """
     SELECT 
         ExerciseEntries.exerciseEntryID, 
         TrackedDays.trackedDayDate, 
@@ -972,11 +2077,18 @@ def fetchExerciseEntries():
     JOIN 
         TrackedDays ON ExerciseEntries.trackedDayID = TrackedDays.trackedDayID
     JOIN 
-        Clients ON TrackedDays.clientID = Clients.clientID;
+        Clients ON TrackedDays.clientID = Clients.clientID
     """
-    cur = mysql.connection.cursor()
-    cur.execute(query)
-    return cur.fetchall()
+
+# Helper function to READ one page of Exercise Entries, optionally filtered by client and date range
+def fetchExerciseEntries(
+    clientName=None, startDate=None, endDate=None, after=None, limit=DEFAULT_PAGE_SIZE
+):
+    conditions, params = buildListingConditions(clientName, startDate, endDate)
+    return fetchPage(
+        EXERCISE_ENTRIES_QUERY, conditions, params, "ExerciseEntries.exerciseEntryID", after, limit,
+        archiveQuery=getArchiveQuery(EXERCISE_ENTRIES_QUERY, "ExerciseEntries", startDate),
+    )
 
 # Helper function to CREATE an Exercise Entry
 def insertExerciseEntry(
@@ -998,12 +2110,14 @@ def insertExerciseEntry(
                 exerciseEntryNote,
             ),
         )
-        mysql.connection.commit()
+        logChanges(cur, "ExerciseEntries", "insert", [cur.lastrowid])
+        addEntryToTotals(cur, "ExerciseEntries", trackedDayID, exerciseEntryCalories)
+        commitChanges("ExerciseEntries", "TrackedDays")
     except IntegrityError as e:
         mysql.connection.rollback()
         raise e
 
-# Helper function to UPDATE an Exercise Entry
+# Helper function to UPDATE an Exercise Entry. Returns False, changing nothing, if the entry is archived
 def updateExerciseEntryRecord(
     exerciseEntryID,
     exerciseEntryName,
@@ -1013,6 +2127,9 @@ def updateExerciseEntryRecord(
 ):
     cur = mysql.connection.cursor()
     try:
+        changeEntryInTotals(
+            cur, "ExerciseEntries", exerciseEntryID, exerciseEntryCalories
+        )
         cur.execute(
             "UPDATE ExerciseEntries SET exerciseEntryName = %s, exerciseEntryType = %s, exerciseEntryCalories = %s, exerciseEntryNote = %s WHERE exerciseEntryID = %s;",
             (
@@ -1023,18 +2140,29 @@ def updateExerciseEntryRecord(
                 exerciseEntryID,
             ),
         )
-        mysql.connection.commit()
+        if cur.rowcount == 0 and isArchivedEntry(cur, "ExerciseEntries", exerciseEntryID):
+            mysql.connection.rollback()
+            return False
+        logChanges(cur, "ExerciseEntries", "update", [exerciseEntryID])
+        commitChanges("ExerciseEntries", "TrackedDays")
+        return True
     except IntegrityError as e:
         mysql.connection.rollback()
         raise e
 
-# Helper function to DELETE an Exercise Entry
+# Helper function to DELETE an Exercise Entry. Returns False, changing nothing, if the entry is archived
 def deleteExerciseEntryRecord(exerciseEntryID):
     cur = mysql.connection.cursor()
+    logChanges(cur, "ExerciseEntries", "delete", [exerciseEntryID])
+    removeEntryFromTotals(cur, "ExerciseEntries", exerciseEntryID)
     cur.execute(
         "DELETE FROM ExerciseEntries WHERE exerciseEntryID = %s;", (exerciseEntryID,)
     )
-    mysql.connection.commit()
+    if cur.rowcount == 0 and isArchivedEntry(cur, "ExerciseEntries", exerciseEntryID):
+        mysql.connection.rollback()
+        return False
+    commitChanges("ExerciseEntries", "TrackedDays")
+    return True
 
 # Helper function to fetch client names and tracked day dates
 def fetchClientNamesAndTrackedDays():
@@ -1049,29 +2177,1720 @@ def fetchClientNamesAndTrackedDays():
     JOIN 
         TrackedDays ON Clients.clientID = TrackedDays.clientID;
     """
-    cur = mysql.connection.cursor()
+    cur = mysql.read_connection.cursor()
     cur.execute(query)
     return cur.fetchall()
 
-# Route to get the tracked dayy ID using the date and client name
-def getTrackedDaysExerciseEntries(trackedDayDate, clientName):
-    query = """
-    SELECT TrackedDays.trackedDayID
+""" ___________ Routes for Progress Reports ___________ """
+# Reports are built from the stored tracked day totals with one grouped query, so a year of one
+# client's data is a few hundred index-ordered rows and never touches the entry tables.
+
+# How each bucket size groups tracked days (weeks start on Monday, months on the 1st)
+REPORT_BUCKETS = {
+    "day": "TrackedDays.trackedDayDate",
+    "week": "DATE_SUB(TrackedDays.trackedDayDate, INTERVAL WEEKDAY(TrackedDays.trackedDayDate) DAY)",
+    "month": "DATE_SUB(TrackedDays.trackedDayDate, INTERVAL DAYOFMONTH(TrackedDays.trackedDayDate) - 1 DAY)",
+}
+# Reports cover this many days when no start date is given
+DEFAULT_REPORT_DAYS = 90
+# A day counts as on target when its net calories are within this fraction of the target
+ADHERENCE_TOLERANCE = float(os.environ.get("KILOJULIA_ADHERENCE_TOLERANCE", 0.1))
+# Calories in roughly one kilogram of body weight, for the estimated weight trend
+CALORIES_PER_KG = 7700
+
+# The columns every report row has, summed over the tracked days in a bucket
+REPORT_COLUMNS = f"""
+    MIN(TrackedDays.trackedDayDate) AS firstDay,
+    MAX(TrackedDays.trackedDayDate) AS lastDay,
+    COUNT(*) AS trackedDays,
+    CAST(SUM(TrackedDays.trackedDayFoodCalories) AS SIGNED) AS caloriesIn,
+    CAST(SUM(TrackedDays.trackedDayExerciseCalories) AS SIGNED) AS caloriesOut,
+    CAST(SUM(TrackedDays.trackedDayCalorieTarget) AS SIGNED) AS calorieTarget,
+    CAST(SUM(
+        ABS(TrackedDays.trackedDayFoodCalories - TrackedDays.trackedDayExerciseCalories - TrackedDays.trackedDayCalorieTarget)
+        <= TrackedDays.trackedDayCalorieTarget * {ADHERENCE_TOLERANCE}
+    ) AS SIGNED) AS adherentDays
+"""
+
+# Helper function to build one client's report query, grouped by the given bucket
+def buildClientReportQuery(bucket):
+    return f"""
+    SELECT {REPORT_BUCKETS[bucket]} AS period, {REPORT_COLUMNS}
     FROM TrackedDays
-    JOIN Clients ON TrackedDays.clientID = Clients.clientID
-    WHERE TrackedDays.trackedDayDate = %s AND Clients.clientName = %s;
+    WHERE TrackedDays.clientID = %s AND TrackedDays.trackedDayDate BETWEEN %s AND %s
+    GROUP BY period
+    ORDER BY period;
+    """
+
+# Helper function to build the report query for every client of one staff member
+def buildStaffReportQuery(bucket):
+    return f"""
+    SELECT TrackedDays.clientID, {REPORT_BUCKETS[bucket]} AS period, {REPORT_COLUMNS}
+    FROM StaffClients
+    JOIN TrackedDays ON TrackedDays.clientID = StaffClients.clientID
+    WHERE StaffClients.staffID = %s AND TrackedDays.trackedDayDate BETWEEN %s AND %s
+    GROUP BY TrackedDays.clientID, period
+    ORDER BY TrackedDays.clientID, period;
+    """
+
+# Helper function to build the report query for a chunk of clientCount clients, used by the clinic report
+def buildClinicReportQuery(bucket, clientCount):
+    placeholders = ", ".join(["%s"] * clientCount)
+    return f"""
+    SELECT TrackedDays.clientID, {REPORT_BUCKETS[bucket]} AS period, {REPORT_COLUMNS}
+    FROM TrackedDays
+    WHERE TrackedDays.clientID IN ({placeholders}) AND TrackedDays.trackedDayDate BETWEEN %s AND %s
+    GROUP BY TrackedDays.clientID, period
+    ORDER BY TrackedDays.clientID, period;
+    """
+
+# Route for a client's progress report, e.g. /reports/client/1?startDate=2024-01-01&endDate=2024-12-31&bucket=week
+@app.route("/reports/client/<int:clientID>", methods=["GET"])
+@cachedPage("Clients", "TrackedDays")
+def clientReport(clientID):
+    bucket, startDate, endDate, error = getReportArgs()
+    if error:
+        return error, 400
+    cur = mysql.read_connection.cursor()
+    cur.execute(
+        "SELECT clientID, clientName, clientWeight FROM Clients WHERE clientID = %s;",
+        (clientID,),
+    )
+    client = cur.fetchone()
+    if not client:
+        return "Client not found.", 404
+    cur.execute(buildClientReportQuery(bucket), (clientID, startDate, endDate))
+    periods = [summarizeReportRow(row) for row in cur.fetchall()]
+    addWeightTrend(periods, client["clientWeight"])
+    return jsonify(
+        clientID=client["clientID"],
+        clientName=client["clientName"],
+        clientWeight=float(client["clientWeight"]),
+        bucket=bucket,
+        startDate=startDate.isoformat(),
+        endDate=endDate.isoformat(),
+        summary=summarizeReportRows(periods),
+        periods=periods,
+    )
+
+# Route for a report on every client assigned to a staff member, with the same arguments as the client report
+@app.route("/reports/staff/<int:staffID>", methods=["GET"])
+@cachedPage("Staff", "StaffClients", "Clients", "TrackedDays")
+def staffReport(staffID):
+    bucket, startDate, endDate, error = getReportArgs()
+    if error:
+        return error, 400
+    cur = mysql.read_connection.cursor()
+    cur.execute("SELECT staffID, staffName FROM Staff WHERE staffID = %s;", (staffID,))
+    staffMember = cur.fetchone()
+    if not staffMember:
+        return "Staff member not found.", 404
+    cur.execute(
+        """
+        SELECT Clients.clientID, Clients.clientName, Clients.clientWeight
+        FROM StaffClients
+        JOIN Clients ON StaffClients.clientID = Clients.clientID
+        WHERE StaffClients.staffID = %s
+        ORDER BY Clients.clientName;
+        """,
+        (staffID,),
+    )
+    clients = {
+        client["clientID"]: dict(client, clientWeight=float(client["clientWeight"]), periods=[])
+        for client in cur.fetchall()
+    }
+    # One grouped query for the whole caseload instead of one per client
+    cur.execute(buildStaffReportQuery(bucket), (staffID, startDate, endDate))
+    for row in cur.fetchall():
+        clients[row.pop("clientID")]["periods"].append(summarizeReportRow(row))
+    for client in clients.values():
+        addWeightTrend(client["periods"], client["clientWeight"])
+        client["summary"] = summarizeReportRows(client["periods"])
+    return jsonify(
+        staffID=staffMember["staffID"],
+        staffName=staffMember["staffName"],
+        bucket=bucket,
+        startDate=startDate.isoformat(),
+        endDate=endDate.isoformat(),
+        summary=summarizeReportRows(
+            [period for client in clients.values() for period in client["periods"]]
+        ),
+        clients=list(clients.values()),
+    )
+
+# Helper function to read the report arguments from the URL (or another dict of arguments).
+# Returns (bucket, startDate, endDate, error)
+def getReportArgs(args=None):
+    args = request.args if args is None else args
+    bucket = args.get("bucket", "day")
+    if bucket not in REPORT_BUCKETS:
+        return None, None, None, "Bucket must be day, week or month."
+    try:
+        endDate = datetime.date.fromisoformat(
+            args.get("endDate") or datetime.date.today().isoformat()
+        )
+        startDate = datetime.date.fromisoformat(
+            args.get("startDate")
+            or (endDate - datetime.timedelta(days=DEFAULT_REPORT_DAYS - 1)).isoformat()
+        )
+    except ValueError:
+        return None, None, None, "Dates must be in YYYY-MM-DD format."
+    if startDate > endDate:
+        return None, None, None, "Start date must be before end date."
+    return bucket, startDate, endDate, None
+
+# Helper function to add the calculated fields to one report row
+def summarizeReportRow(row):
+    row = dict(row)
+    for field in ("period", "firstDay", "lastDay"):
+        if row.get(field) is not None:
+            row[field] = str(row[field])
+    row["netCalories"] = row["caloriesIn"] - row["caloriesOut"]
+    row["netVsTarget"] = row["netCalories"] - row["calorieTarget"]
+    row["adherencePercent"] = (
+        round(100 * row["adherentDays"] / row["trackedDays"], 1) if row["trackedDays"] else None
+    )
+    return row
+
+# Helper function to total up a list of report rows
+def summarizeReportRows(rows):
+    totals = {
+        field: sum(row[field] for row in rows)
+        for field in ("trackedDays", "caloriesIn", "caloriesOut", "calorieTarget", "adherentDays")
+    }
+    return summarizeReportRow(totals)
+
+# Helper function to add an estimated weight trend to report rows. Clients only store their current weight,
+# so the trend works backwards from it using each period's calories over or under target
+def addWeightTrend(rows, currentWeight):
+    weight = float(currentWeight)
+    for row in reversed(rows):
+        row["estimatedWeightKg"] = round(weight, 2)
+        weight -= row["netVsTarget"] / CALORIES_PER_KG
+    for row in rows:
+        row["estimatedWeightChangeKg"] = round(row["netVsTarget"] / CALORIES_PER_KG, 2)
+
+# Helper function to build the progress report of every client in the clinic, one grouped query per chunk of
+# clients. Too slow for a request on a large clinic, so it runs as a background job (see clinicReportJob).
+# progress, if given, is called with (clients done, clients) after each chunk
+def buildClinicReport(bucket, startDate, endDate, progress=None):
+    cur = mysql.read_connection.cursor()
+    cur.execute("SELECT clientID, clientName, clientWeight FROM Clients ORDER BY clientID;")
+    clients = [dict(client, clientWeight=float(client["clientWeight"]), periods=[]) for client in cur.fetchall()]
+    done = 0
+    for chunk in chunked(clients):
+        chunkClients = {client["clientID"]: client for client in chunk}
+        cur.execute(buildClinicReportQuery(bucket, len(chunk)), list(chunkClients) + [startDate, endDate])
+        for row in cur.fetchall():
+            chunkClients[row.pop("clientID")]["periods"].append(summarizeReportRow(row))
+        done += len(chunk)
+        if progress:
+            progress(done, len(clients))
+    for client in clients:
+        addWeightTrend(client["periods"], client["clientWeight"])
+        client["summary"] = summarizeReportRows(client["periods"])
+    return dict(
+        bucket=bucket,
+        startDate=startDate.isoformat(),
+        endDate=endDate.isoformat(),
+        summary=summarizeReportRows([period for client in clients for period in client["periods"]]),
+        clients=clients,
+    )
+
+""" ___________ Routes for Staff Dashboard ___________ """
+# A staff member's whole caseload on one page. Everything comes from five set-based queries however many
+# clients they have (staff, clients, recent days, food entries, exercise entries), and every client's panel
+# is sent with the page so switching between clients happens in the browser without another request.
+# The page then follows the change feed from the last change it includes, so it can show which clients
+# have been edited since it loaded.
+
+# Tracked days and entries of each kind shown per client
+DASHBOARD_DAYS = 14
+DASHBOARD_ENTRIES = 10
+
+# Route to pick a staff member's dashboard
+@app.route("/dashboard", methods=["GET"])
+def dashboards():
+    staffName = request.args.get("staffName")
+    if staffName:
+        staffID = getStaffByName(staffName)
+        if not staffID:
+            return render_template("dashboard.j2", staffMember=None, error="Staff member not found.")
+        return redirect(url_for("dashboard", staffID=staffID))
+    return render_template("dashboard.j2", staffMember=None)
+
+# Route for a staff member's dashboard
+@app.route("/dashboard/<int:staffID>", methods=["GET"])
+@cachedPage("Staff", "StaffClients", "Clients", "TrackedDays", "Foods", "FoodEntries", "ExerciseEntries")
+def dashboard(staffID):
+    cur = mysql.read_connection.cursor()
+    # The latest change is read with the staff member, before the rest, so the page follows the change feed
+    # from a point its data already includes
+    cur.execute(
+        """
+        SELECT staffID, staffName, staffCapacity,
+            (SELECT COALESCE(MAX(changeID), 0) FROM ChangeLog) AS latestChangeID
+        FROM Staff WHERE staffID = %s;
+        """,
+        (staffID,),
+    )
+    staffMember = cur.fetchone()
+    if not staffMember:
+        return "Staff member not found.", 404
+    cur.execute(
+        """
+        SELECT Clients.*
+        FROM StaffClients
+        JOIN Clients ON StaffClients.clientID = Clients.clientID
+        WHERE StaffClients.staffID = %s
+        ORDER BY Clients.clientName;
+        """,
+        (staffID,),
+    )
+    clients = {client["clientID"]: dict(client, days=[], foodEntries=[], exerciseEntries=[], today=None) for client in cur.fetchall()}
+    # Each client's most recent tracked days, numbered newest first per client
+    cur.execute(
+        """
+        SELECT * FROM (
+            SELECT
+                TrackedDays.trackedDayID,
+                TrackedDays.clientID,
+                TrackedDays.trackedDayDate,
+                TrackedDays.trackedDayCalorieTarget,
+                TrackedDays.trackedDayFoodCalories,
+                TrackedDays.trackedDayExerciseCalories,
+                TrackedDays.trackedDayFoodCalories - TrackedDays.trackedDayExerciseCalories AS trackedDayTotalCalories,
+                TrackedDays.trackedDayNote,
+                ROW_NUMBER() OVER (
+                    PARTITION BY TrackedDays.clientID ORDER BY TrackedDays.trackedDayDate DESC
+                ) AS dayRank
+            FROM StaffClients
+            JOIN TrackedDays ON TrackedDays.clientID = StaffClients.clientID
+            WHERE StaffClients.staffID = %s
+        ) AS recentDays
+        WHERE dayRank <= %s
+        ORDER BY clientID, trackedDayDate DESC;
+        """,
+        (staffID, DASHBOARD_DAYS),
+    )
+    days = cur.fetchall()
+    today = datetime.date.today()
+    for day in days:
+        clients[day["clientID"]]["days"].append(day)
+        if day["trackedDayDate"] == today:
+            clients[day["clientID"]]["today"] = day
+    # The latest entries come from the recent days only, so these read a few rows per client
+    dayIDs = [day["trackedDayID"] for day in days]
+    if dayIDs:
+        placeholders = ", ".join(["%s"] * len(dayIDs))
+        cur.execute(
+            f"""
+            SELECT * FROM (
+                SELECT
+                    FoodEntries.foodEntryID,
+                    TrackedDays.clientID,
+                    TrackedDays.trackedDayDate,
+                    Foods.foodName,
+                    FoodEntries.foodEntryGramWeight,
+                    FoodEntries.foodEntryCalories,
+                    FoodEntries.foodEntryNote,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY TrackedDays.clientID
+                        ORDER BY TrackedDays.trackedDayDate DESC, FoodEntries.foodEntryID DESC
+                    ) AS entryRank
+                FROM FoodEntries
+                JOIN TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
+                LEFT JOIN Foods ON FoodEntries.foodID = Foods.foodID
+                WHERE FoodEntries.trackedDayID IN ({placeholders})
+            ) AS latestEntries
+            WHERE entryRank <= %s
+            ORDER BY clientID, entryRank;
+            """,
+            dayIDs + [DASHBOARD_ENTRIES],
+        )
+        for entry in cur.fetchall():
+            clients[entry["clientID"]]["foodEntries"].append(entry)
+        cur.execute(
+            f"""
+            SELECT * FROM (
+                SELECT
+                    ExerciseEntries.exerciseEntryID,
+                    TrackedDays.clientID,
+                    TrackedDays.trackedDayDate,
+                    ExerciseEntries.exerciseEntryName,
+                    ExerciseEntries.exerciseEntryType,
+                    ExerciseEntries.exerciseEntryCalories,
+                    ExerciseEntries.exerciseEntryNote,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY TrackedDays.clientID
+                        ORDER BY TrackedDays.trackedDayDate DESC, ExerciseEntries.exerciseEntryID DESC
+                    ) AS entryRank
+                FROM ExerciseEntries
+                JOIN TrackedDays ON ExerciseEntries.trackedDayID = TrackedDays.trackedDayID
+                WHERE ExerciseEntries.trackedDayID IN ({placeholders})
+            ) AS latestEntries
+            WHERE entryRank <= %s
+            ORDER BY clientID, entryRank;
+            """,
+            dayIDs + [DASHBOARD_ENTRIES],
+        )
+        for entry in cur.fetchall():
+            clients[entry["clientID"]]["exerciseEntries"].append(entry)
+    return render_template(
+        "dashboard.j2",
+        staffMember=staffMember,
+        clients=list(clients.values()),
+        today=today,
+    )
+
+""" ___________ Routes for the Change Feed ___________ """
+# Open pages keep up with other staff members' edits by asking for the changes to one staff member's clients
+# (and assignments) after the last change they saw, either as a long-poll (/changes/<staffID>?after=<changeID>,
+# answered as soon as there is something new or when the wait runs out) or as a Server-Sent Events stream
+# (/changes/<staffID>/stream). While they wait they don't query MySQL: the process's change feed watcher wakes
+# them when the log grows. Each waiting request holds a worker thread, so only MAX_CHANGE_WAITERS of them wait
+# at once; the others are answered straight away with what there is, and told to come back after
+# CHANGE_BUSY_RETRY_SECONDS
+
+# Longest a long-poll waits for a change, and how long an event stream stays open before the browser reconnects
+MAX_CHANGE_WAIT = 30
+CHANGE_STREAM_SECONDS = 300
+# Seconds between keep-alive comments on a quiet event stream, so proxies don't close it
+CHANGE_HEARTBEAT_SECONDS = 15
+# Seconds a browser waits before asking again when every waiting place was taken
+CHANGE_BUSY_RETRY_SECONDS = 10
+MAX_CHANGES = 500
+
+CHANGES_QUERY = """
+    SELECT changeID, changeTable, changeOperation, changeRowID, trackedDayID, clientID, staffID, changedAt
+    FROM ChangeLog
+    WHERE changeID > %s
+        AND (clientID IN (SELECT clientID FROM StaffClients WHERE staffID = %s) OR staffID = %s)
+    ORDER BY changeID
+    LIMIT %s;
+"""
+
+# Route for the changes to a staff member's clients after a given change, waiting for one if there are none yet.
+# Without ?after= it answers straight away with the latest change ID to start from
+@app.route("/changes/<int:staffID>", methods=["GET"])
+def changes(staffID):
+    if not fetchFeedRows("SELECT staffID FROM Staff WHERE staffID = %s;", (staffID,)):
+        return jsonify(error="Staff member not found."), 404
+    after = request.args.get("after", type=int)
+    if after is None:
+        return jsonify(changes=[], last=getLatestChangeID())
+    wait = min(max(request.args.get("wait", MAX_CHANGE_WAIT, type=float), 0), MAX_CHANGE_WAIT)
+    waiting = wait > 0 and changeFeed.claim()
+    try:
+        rows = waitForChanges(staffID, after, wait if waiting else 0)
+    finally:
+        if waiting:
+            changeFeed.release()
+    response = jsonify(changes=[apiRow(row) for row in rows], last=rows[-1]["changeID"] if rows else after)
+    if wait > 0 and not waiting:
+        response.headers["Retry-After"] = str(CHANGE_BUSY_RETRY_SECONDS)
+    return response
+
+# Route for a Server-Sent Events stream of the changes to a staff member's clients. A reconnecting browser
+# sends the last event's ID in Last-Event-ID and carries on from there
+@app.route("/changes/<int:staffID>/stream", methods=["GET"])
+def changeStream(staffID):
+    if not fetchFeedRows("SELECT staffID FROM Staff WHERE staffID = %s;", (staffID,)):
+        return "Staff member not found.", 404
+    after = request.headers.get("Last-Event-ID", type=int)
+    if after is None:
+        after = request.args.get("after", type=int)
+    if after is None:
+        after = getLatestChangeID()
+    response = Response(streamChanges(staffID, after), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Ask proxies to pass events on as they come instead of buffering them
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+# Helper function that yields a staff member's changes as Server-Sent Events until the stream's time is up.
+# When no waiting place is free, it sends the changes there are now and closes
+def streamChanges(staffID, after):
+    waiting = changeFeed.claim()
+    try:
+        # How long the browser waits before reconnecting, in milliseconds
+        yield f"retry: {1000 if waiting else CHANGE_BUSY_RETRY_SECONDS * 1000}\n\n"
+        deadline = time.monotonic() + (CHANGE_STREAM_SECONDS if waiting else 0)
+        while True:
+            rows = waitForChanges(staffID, after, max(min(CHANGE_HEARTBEAT_SECONDS, deadline - time.monotonic()), 0))
+            for row in rows:
+                after = row["changeID"]
+                yield f"id: {after}\nevent: change\ndata: {json.dumps(apiRow(row))}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            if not rows:
+                yield ": keep-alive\n\n"
+    finally:
+        if waiting:
+            changeFeed.release()
+
+# Helper function to get a staff member's changes after a change ID, waiting up to timeout seconds for one.
+# Only re-queries when the change feed says the log has grown, whoever the new changes are for
+def waitForChanges(staffID, after, timeout):
+    deadline = time.monotonic() + timeout
+    checkedThrough = after
+    while True:
+        rows = fetchFeedRows(CHANGES_QUERY, (after, staffID, staffID, MAX_CHANGES))
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            return rows
+        latestID = changeFeed.wait(checkedThrough, remaining)
+        if latestID is None or latestID <= checkedThrough:
+            return rows
+        checkedThrough = latestID
+
+# Helper function to run a change feed query on a briefly borrowed connection. The feed routes spend most of
+# their time waiting, so they don't hold a connection for the whole request like mysql.connection does
+def fetchFeedRows(query, params):
+    with db.pool.connection() as connection:
+        cur = connection.cursor()
+        cur.execute(query, params)
+        return list(cur.fetchall())
+
+""" ___________ Routes for Exports ___________ """
+# Exports stream rows straight from the database to the browser. An unbuffered server-side cursor hands
+# rows over in batches, so a multi-million-row export uses the same memory as a small one and the
+# download starts as soon as the first batch is read.
+
+# What each export URL sends, as (listing query, ID column it is ordered by, whether it can filter by food,
+# entry table whose archive it also reads)
+EXPORT_KINDS = {
+    "trackeddays": (TRACKED_DAYS_QUERY, "TrackedDays.trackedDayID", False, None),
+    "foodentries": (FOOD_ENTRIES_QUERY, "FoodEntries.foodEntryID", True, "FoodEntries"),
+    "exerciseentries": (EXERCISE_ENTRIES_QUERY, "ExerciseEntries.exerciseEntryID", False, "ExerciseEntries"),
+}
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+# Rows read from the server and written out per chunk
+EXPORT_BATCH_SIZE = 1000
+# Exports hold their connection for as long as the download takes, so they get their own small pool
+# rather than tying up the connections the pages use. Extra exports are turned away instead of queuing
+EXPORT_CONNECTIONS = int(os.environ.get("KILOJULIA_EXPORT_CONNECTIONS", 2))
+exportPool = db.ConnectionPool(min_size=0, max_size=EXPORT_CONNECTIONS)
+# Seconds MySQL waits on a slow download before giving up on the connection
+EXPORT_WRITE_TIMEOUT = 3600
+
+# Route to export tracked days or entries, e.g. /export/foodentries.csv?clientName=Muhammad%20Ali&startDate=2024-01-01
+# Takes the same clientName/startDate/endDate(/foodName) filters as the listing pages, plus staffID for a
+# staff member's whole caseload
+@app.route("/export/<kind>.<fileFormat>", methods=["GET"])
+def export(kind, fileFormat):
+    if kind not in EXPORT_KINDS or fileFormat not in EXPORT_FORMATS:
+        return "Unknown export.", 404
+    query, idColumn, canFilterFood, entryTable = EXPORT_KINDS[kind]
+    filters = getListingFilters()
+    if not canFilterFood:
+        filters.pop("foodName")
+    conditions, params = buildListingConditions(
+        **filters, staffID=request.args.get("staffID", type=int)
+    )
+    suffix = (" WHERE " + " AND ".join(conditions) if conditions else "") + f" ORDER BY {idColumn};"
+    # Archived entries are sent first, then the live ones, each in ID order
+    queries = [query + suffix]
+    archiveQuery = getArchiveQuery(query, entryTable, filters["startDate"]) if entryTable else None
+    if archiveQuery:
+        queries.insert(0, archiveQuery + suffix)
+    try:
+        connection = exportPool.acquire(timeout=0)
+    except db.PoolTimeoutError:
+        return "Too many exports are running. Please try again shortly.", 429
+    try:
+        setup = connection.cursor()
+        setup.execute("SET SESSION net_write_timeout = %s;", (EXPORT_WRITE_TIMEOUT,))
+        setup.close()
+        cur = instrumentation.wrap(connection).cursor(SSDictCursor)
+        cur.execute(queries[0], params)
+    except DatabaseError:
+        exportPool.release(connection)
+        raise
+    response = Response(
+        streamExport(cur, fileFormat, [(nextQuery, params) for nextQuery in queries[1:]]),
+        mimetype=EXPORT_FORMATS[fileFormat],
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename={kind}.{fileFormat}"
+    # Ask proxies to pass the rows on as they come instead of buffering the whole file
+    response.headers["X-Accel-Buffering"] = "no"
+    # The server closes the response when the download finishes or the browser disconnects. If rows were
+    # left unread, release() finds the connection unusable and closes it rather than reading them all
+    response.call_on_close(lambda: exportPool.release(connection))
+    return response
+
+# Helper function that yields an export query's rows as CSV or NDJSON text, one batch of rows at a time.
+# Any further (query, params) with the same columns are run on the cursor afterwards and sent on as well
+def streamExport(cur, fileFormat, moreQueries=()):
+    columns = [column[0] for column in cur.description]
+    if fileFormat == "csv":
+        yield formatCsvRows([columns])
+    moreQueries = list(moreQueries)
+    while True:
+        rows = cur.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows:
+            if not moreQueries:
+                break
+            cur.execute(*moreQueries.pop(0))
+            continue
+        if fileFormat == "csv":
+            yield formatCsvRows([[row[column] for column in columns] for row in rows])
+        else:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+    cur.close()
+
+# Helper function to turn rows into CSV text
+def formatCsvRows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+""" ___________ Routes for the JSON API ___________ """
+# Read-only JSON versions of every table under /api/v1. Responses carry an ETag and Last-Modified built from
+# the TableVersions counters of the tables the rows come from, so a client polling for changes gets an
+# empty 304 Not Modified (costing one small lookup) until one of those tables is written to.
+#
+#   /api/v1/foodentries?fields=foodEntryID,foodName,foodEntryCalories&clientName=Muhammad%20Ali&limit=50
+#   /api/v1/foodentries?after=<last foodEntryID>   (the "next" link in each response)
+#   /api/v1/clients/3
+#   /api/v1/staffclients/1-3                         (staffID-clientID)
+
+API_PREFIX = "/api/v1"
+
+# For each resource: the SQL behind each field it can return, the tables it reads, the key fields it is ordered
+# and looked up by, the tables whose changes affect it, the listing filters it accepts and, for entries, the
+# entry table whose archive it also reads
+API_RESOURCES = {
+    "staff": {
+        "fields": {
+            "staffID": "Staff.staffID",
+            "staffName": "Staff.staffName",
+            "staffEmail": "Staff.staffEmail",
+            "staffCapacity": "Staff.staffCapacity",
+            "staffNote": "Staff.staffNote",
+        },
+        "from": "Staff",
+        "keys": ("staffID",),
+        "tables": ("Staff",),
+        "filters": (),
+    },
+    "clients": {
+        "fields": {
+            "clientID": "Clients.clientID",
+            "clientName": "Clients.clientName",
+            "clientEmail": "Clients.clientEmail",
+            "clientSex": "Clients.clientSex",
+            "clientAge": "Clients.clientAge",
+            "clientHeight": "Clients.clientHeight",
+            "clientWeight": "Clients.clientWeight",
+            "clientActivityLevel": "Clients.clientActivityLevel",
+            "clientCalorieTarget": "Clients.clientCalorieTarget",
+            "clientBMR": "Clients.clientBMR",
+            "clientTDEE": "Clients.clientTDEE",
+            "clientNote": "Clients.clientNote",
+        },
+        "from": "Clients",
+        "keys": ("clientID",),
+        "tables": ("Clients",),
+        "filters": (),
+    },
+    "staffclients": {
+        "fields": {
+            "staffID": "StaffClients.staffID",
+            "clientID": "StaffClients.clientID",
+            "staffName": "Staff.staffName",
+            "clientName": "Clients.clientName",
+        },
+        "from": """StaffClients
+            JOIN Staff ON StaffClients.staffID = Staff.staffID
+            JOIN Clients ON StaffClients.clientID = Clients.clientID""",
+        "keys": ("staffID", "clientID"),
+        "tables": ("StaffClients", "Staff", "Clients"),
+        "filters": (),
+    },
+    "trackeddays": {
+        "fields": {
+            "trackedDayID": "TrackedDays.trackedDayID",
+            "clientID": "TrackedDays.clientID",
+            "clientName": "Clients.clientName",
+            "trackedDayDate": "TrackedDays.trackedDayDate",
+            "trackedDayCalorieTarget": "TrackedDays.trackedDayCalorieTarget",
+            "trackedDayFoodCalories": "TrackedDays.trackedDayFoodCalories",
+            "trackedDayExerciseCalories": "TrackedDays.trackedDayExerciseCalories",
+            "trackedDayTotalCalories": "TrackedDays.trackedDayFoodCalories - TrackedDays.trackedDayExerciseCalories",
+            "trackedDayFoodEntryCount": "TrackedDays.trackedDayFoodEntryCount",
+            "trackedDayExerciseEntryCount": "TrackedDays.trackedDayExerciseEntryCount",
+            "trackedDayNote": "TrackedDays.trackedDayNote",
+        },
+        "from": "TrackedDays JOIN Clients ON TrackedDays.clientID = Clients.clientID",
+        "keys": ("trackedDayID",),
+        "tables": ("TrackedDays", "Clients"),
+        "filters": ("clientName", "startDate", "endDate", "staffID"),
+    },
+    "foods": {
+        "fields": {
+            "foodID": "Foods.foodID",
+            "foodName": "Foods.foodName",
+            "foodType": "Foods.foodType",
+            "foodCaloriesPerGram": "Foods.foodCaloriesPerGram",
+            "foodNote": "Foods.foodNote",
+        },
+        "from": "Foods",
+        "keys": ("foodID",),
+        "tables": ("Foods",),
+        "filters": (),
+    },
+    "foodentries": {
+        "fields": {
+            "foodEntryID": "FoodEntries.foodEntryID",
+            "trackedDayID": "FoodEntries.trackedDayID",
+            "trackedDayDate": "TrackedDays.trackedDayDate",
+            "clientName": "Clients.clientName",
+            "foodID": "FoodEntries.foodID",
+            "foodName": "Foods.foodName",
+            "foodEntryCalories": "FoodEntries.foodEntryCalories",
+            "foodEntryGramWeight": "FoodEntries.foodEntryGramWeight",
+            "foodEntryCaloriesDerived": "FoodEntries.foodEntryCaloriesDerived",
+            "foodEntryNote": "FoodEntries.foodEntryNote",
+        },
+        "from": """FoodEntries
+            LEFT JOIN Foods ON FoodEntries.foodID = Foods.foodID
+            JOIN TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
+            JOIN Clients ON TrackedDays.clientID = Clients.clientID""",
+        "keys": ("foodEntryID",),
+        "tables": ("FoodEntries", "Foods", "TrackedDays", "Clients"),
+        "filters": ("clientName", "startDate", "endDate", "foodName", "staffID"),
+        "archive": "FoodEntries",
+    },
+    "exerciseentries": {
+        "fields": {
+            "exerciseEntryID": "ExerciseEntries.exerciseEntryID",
+            "trackedDayID": "ExerciseEntries.trackedDayID",
+            "trackedDayDate": "TrackedDays.trackedDayDate",
+            "clientName": "Clients.clientName",
+            "exerciseEntryName": "ExerciseEntries.exerciseEntryName",
+            "exerciseEntryType": "ExerciseEntries.exerciseEntryType",
+            "exerciseEntryCalories": "ExerciseEntries.exerciseEntryCalories",
+            "exerciseEntryNote": "ExerciseEntries.exerciseEntryNote",
+        },
+        "from": """ExerciseEntries
+            JOIN TrackedDays ON ExerciseEntries.trackedDayID = TrackedDays.trackedDayID
+            JOIN Clients ON TrackedDays.clientID = Clients.clientID""",
+        "keys": ("exerciseEntryID",),
+        "tables": ("ExerciseEntries", "TrackedDays", "Clients"),
+        "filters": ("clientName", "startDate", "endDate", "staffID"),
+        "archive": "ExerciseEntries",
+    },
+}
+
+# Route to list a resource one page at a time
+@app.route(f"{API_PREFIX}/<resource>", methods=["GET"])
+def apiList(resource):
+    definition = API_RESOURCES.get(resource)
+    if definition is None:
+        return jsonify(error="Unknown resource."), 404
+    fields, error = getApiFields(definition, request.args.get("fields"))
+    if error:
+        return jsonify(error=error), 400
+    after = None
+    if request.args.get("after"):
+        after = parseApiKey(definition, request.args["after"])
+        if after is None:
+            return jsonify(error="Invalid after value."), 400
+    _, limit = getPageArgs()
+    versions = getApiVersions(definition)
+    if isNotModified(versions):
+        return apiNotModified(versions)
+
+    filters = getApiFilters(request.args)
+    query, params = buildApiListQuery(definition, fields, filters, after, limit)
+    cur = mysql.read_connection.cursor()
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    if definition.get("archive"):
+        archiveQuery = getArchiveQuery(query, definition["archive"], filters["startDate"])
+        if archiveQuery:
+            cur.execute(archiveQuery, params)
+            rows = mergeArchivedRows(rows, cur.fetchall(), definition["keys"], limit)
+    rows = [apiRow(row) for row in rows]
+    nextPage = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        args = request.args.to_dict()
+        args["after"] = "-".join(str(rows[-1][key]) for key in definition["keys"])
+        nextPage = url_for("apiList", resource=resource, **args)
+    return apiResponse({"data": rows, "next": nextPage}, versions)
+
+# Route to get one row of a resource by its key
+@app.route(f"{API_PREFIX}/<resource>/<itemKey>", methods=["GET"])
+def apiItem(resource, itemKey):
+    definition = API_RESOURCES.get(resource)
+    if definition is None:
+        return jsonify(error="Unknown resource."), 404
+    key = parseApiKey(definition, itemKey)
+    if key is None:
+        return jsonify(error="Not found."), 404
+    fields, error = getApiFields(definition, request.args.get("fields"))
+    if error:
+        return jsonify(error=error), 400
+    versions = getApiVersions(definition)
+    if isNotModified(versions):
+        return apiNotModified(versions)
+    query = buildApiItemQuery(definition, fields)
+    cur = mysql.read_connection.cursor()
+    cur.execute(query, key)
+    row = cur.fetchone()
+    if row is None and definition.get("archive"):
+        archiveQuery = getArchiveQuery(query, definition["archive"])
+        if archiveQuery:
+            cur.execute(archiveQuery, key)
+            row = cur.fetchone()
+    if row is None:
+        return jsonify(error="Not found."), 404
+    return apiResponse({"data": apiRow(row)}, versions)
+
+# Helper function to read ?fields=a,b,c. Key fields are always included. Returns (fields, error)
+def getApiFields(definition, requested):
+    if not requested:
+        return list(definition["fields"]), None
+    fields = [field.strip() for field in requested.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in definition["fields"]]
+    if unknown:
+        return None, "Unknown fields: " + ", ".join(unknown)
+    return list(definition["keys"]) + [field for field in fields if field not in definition["keys"]], None
+
+# Helper function to turn "3" or "1-3" into a list of key values, or None if it isn't valid
+def parseApiKey(definition, value):
+    parts = value.split("-")
+    if len(parts) != len(definition["keys"]) or not all(part.isdigit() for part in parts):
+        return None
+    return [int(part) for part in parts]
+
+# Helper function to read the listing filters from query string arguments, for the resources that accept them
+def getApiFilters(args):
+    filters = {name: args.get(name) or None for name in ("clientName", "startDate", "endDate", "foodName")}
+    filters["staffID"] = args.get("staffID", type=int)
+    return filters
+
+# Helper function to build the SELECT ... FROM part of an API query for the chosen fields
+def buildApiSelect(definition, fields):
+    columns = ", ".join(f"{definition['fields'][field]} AS {field}" for field in fields)
+    return f"SELECT {columns} FROM {definition['from']}"
+
+# Helper function to build one page of a listing as (query, params). One extra row is fetched to tell
+# whether there is a next page
+def buildApiListQuery(definition, fields, filters, after, limit):
+    conditions, params = buildListingConditions(
+        **{name: value for name, value in filters.items() if name in definition["filters"]}
+    )
+    keyColumns = [definition["fields"][key] for key in definition["keys"]]
+    if after:
+        conditions.append(
+            "({}) > ({})".format(", ".join(keyColumns), ", ".join(["%s"] * len(after)))
+        )
+        params += after
+    query = buildApiSelect(definition, fields)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY {} LIMIT %s;".format(", ".join(keyColumns))
+    return query, params + [limit + 1]
+
+# Helper function to build the query for one row, looked up by its key values
+def buildApiItemQuery(definition, fields):
+    conditions = " AND ".join(f"{definition['fields'][name]} = %s" for name in definition["keys"])
+    return f"{buildApiSelect(definition, fields)} WHERE {conditions};"
+
+# Helper function to make database values JSON friendly
+def apiRow(row):
+    for field, value in row.items():
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            row[field] = value.isoformat()
+        elif isinstance(value, Decimal):
+            row[field] = float(value)
+    return row
+
+# Helper function to get the ETag and Last-Modified time for a request from its tables' counters.
+# The counters are read before the rows, so a write landing in between only makes the next poll refetch.
+# The URL (fields, filters, page) is part of the ETag since each one is a different response
+def getApiVersions(definition):
+    return makeApiVersions(definition, getTableVersions(definition["tables"]), request.full_path)
+
+def makeApiVersions(definition, versions, fullPath):
+    fingerprint = "|".join(
+        f"{table}:{versions.get(table, (0, None))[0]}" for table in definition["tables"]
+    )
+    etag = hashlib.sha1(f"{fingerprint}|{fullPath}".encode()).hexdigest()[:24]
+    changes = [(modifiedAt, settled) for _, modifiedAt, settled in versions.values() if modifiedAt]
+    # Last-Modified only has whole seconds, so it is left off until the tables have gone a full second without
+    # a change. Otherwise a later write in the same second would carry the same time, and a client sending it
+    # back in If-Modified-Since would get a 304 for its stale copy. The ETag still covers those responses
+    lastModified = None
+    if changes and all(settled for _, settled in changes):
+        lastModified = max(modifiedAt for modifiedAt, _ in changes).replace(microsecond=0, tzinfo=datetime.timezone.utc)
+    return etag, lastModified
+
+# Helper function to check the request's If-None-Match (or, without it, If-Modified-Since) header
+def isNotModified(versions, ifNoneMatch=None, ifModifiedSince=None):
+    if ifNoneMatch is None:
+        ifNoneMatch, ifModifiedSince = request.if_none_match, request.if_modified_since
+    etag, lastModified = versions
+    if ifNoneMatch:
+        return ifNoneMatch.contains_weak(etag)
+    if ifModifiedSince and lastModified:
+        return lastModified <= ifModifiedSince
+    return False
+
+# Helper function to add the caching headers. no-cache lets clients keep the response but makes them
+# check back (cheaply) every time
+def setApiCacheHeaders(response, versions):
+    etag, lastModified = versions
+    response.set_etag(etag, weak=True)
+    if lastModified:
+        response.last_modified = lastModified
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def apiNotModified(versions):
+    return setApiCacheHeaders(Response(status=304), versions)
+
+def apiResponse(body, versions):
+    return setApiCacheHeaders(jsonify(body), versions)
+
+""" ___________ Routes for Bulk Entry Imports ___________ """
+# Entries are written in chunks, each chunk being one multi-row INSERT and one commit
+IMPORT_CHUNK_SIZE = 1000
+# Allowed values of the ExerciseEntries.exerciseEntryType ENUM
+EXERCISE_TYPES = ("Cardio", "Strength", "Stretching", "Balance", "Other")
+# Shorter column names that device exports tend to use, mapped to our form field names
+IMPORT_FIELD_ALIASES = {
+    "client": "clientName",
+    "date": "trackedDayDate",
+    "food": "foodName",
+    "grams": "gramWeight",
+    "exercise": "exerciseName",
+}
+
+# Route for importing a CSV or JSON file of food or exercise entries
+@app.route("/importentries", methods=["GET", "POST"])
+def importentries():
+    if request.method == "POST":
+        kind = request.form.get("kind")
+        upload = request.files.get("file")
+        if kind not in ("food", "exercise"):
+            return "Entry type must be food or exercise.", 400
+        if not upload or not upload.filename:
+            return "Please choose a file to import.", 400
+        try:
+            rows = readImportFile(
+                io.TextIOWrapper(upload.stream, encoding="utf-8-sig"), upload.filename
+            )
+        except (ValueError, csv.Error) as e:
+            return f"Could not read the file: {e}", 400
+        return jsonify(importEntries(kind, rows))
+    return render_template("importentries.j2")
+
+# Helper function to read the rows of a CSV or JSON import file as dictionaries
+def readImportFile(file, filename):
+    if filename.lower().endswith(".json"):
+        data = json.load(file)
+        # Accept either a list of entries or {"entries": [...]}
+        if isinstance(data, dict):
+            data = data.get("entries", [])
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError("JSON imports must be a list of entry objects.")
+        rows = data
+    else:
+        rows = list(csv.DictReader(file))
+    return [
+        {
+            IMPORT_FIELD_ALIASES.get(key.strip(), key.strip()): (
+                value.strip() if isinstance(value, str) else value
+            )
+            for key, value in row.items()
+            if key
+        }
+        for row in rows
+    ]
+
+# Helper function to check one imported row and convert it to the values we store. Returns (entry, errors)
+def parseImportRow(kind, row):
+    errors = []
+    entry = {
+        "clientName": row.get("clientName"),
+        "note": row.get("note") or None,
+    }
+    if not entry["clientName"]:
+        errors.append("Client name is required.")
+    try:
+        entry["trackedDayDate"] = datetime.date.fromisoformat(
+            str(row.get("trackedDayDate") or "")
+        )
+    except ValueError:
+        errors.append("Date must be in YYYY-MM-DD format.")
+    try:
+        if kind == "food":
+            entry["foodName"] = row.get("foodName") or None
+            entry["gramWeight"] = int(row.get("gramWeight") or 0)
+            entry["calories"] = int(row.get("calories") or 0)
+            # Blank calories are worked out from the food once it has been looked up
+            entry["derived"] = shouldDeriveCalories(
+                entry["calories"], entry["foodName"] is not None
+            )
+            errors += validateFoodEntryForm(
+                entry["gramWeight"], entry["calories"], entry["derived"]
+            )
+        else:
+            entry["exerciseName"] = row.get("exerciseName")
+            entry["type"] = row.get("type")
+            entry["calories"] = int(row.get("calories") or 0)
+            errors += validateExerciseEntryForm(
+                entry["exerciseName"], entry["type"], entry["calories"]
+            )
+            if entry["type"] and entry["type"] not in EXERCISE_TYPES:
+                errors.append("Exercise type must be one of " + ", ".join(EXERCISE_TYPES) + ".")
+    except (TypeError, ValueError):
+        errors.append("Weight and calories must be whole numbers.")
+    return entry, errors
+
+# Helper function to split a list into chunks for IN (...) lookups and batched writes
+def chunked(items, size=IMPORT_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# Helper function to compare names the way the database's case- and accent-insensitive collation does, so a name
+# typed as "alice" or "Chloe" finds the row MySQL matched for "Alice" or "Chloé"
+def nameKey(name):
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold().rstrip()
+
+# Helper function to look up many clients by name in as few queries as possible, keyed by nameKey
+def fetchClientsByNames(clientNames):
+    clients = {}
+    cur = mysql.connection.cursor()
+    for names in chunked(clientNames):
+        placeholders = ", ".join(["%s"] * len(names))
+        cur.execute(
+            f"SELECT clientID, clientName, clientCalorieTarget, clientTDEE FROM Clients WHERE clientName IN ({placeholders});",
+            names,
+        )
+        for client in cur.fetchall():
+            clients[nameKey(client["clientName"])] = client
+    return clients
+
+# Helper function to look up many foods by name in as few queries as possible, keyed by nameKey
+def fetchFoodsByNames(foodNames):
+    foods = {}
+    cur = mysql.connection.cursor()
+    for names in chunked(foodNames):
+        placeholders = ", ".join(["%s"] * len(names))
+        cur.execute(
+            f"SELECT foodID, foodName, foodCaloriesPerGram FROM Foods WHERE foodName IN ({placeholders});",
+            names,
+        )
+        for food in cur.fetchall():
+            foods[nameKey(food["foodName"])] = food
+    return foods
+
+# Helper function to build the lookup of the tracked days of clientCount clients between two dates
+def buildTrackedDayIDsQuery(clientCount):
+    placeholders = ", ".join(["%s"] * clientCount)
+    return f"""
+    SELECT trackedDayID, clientID, trackedDayDate FROM TrackedDays
+    WHERE clientID IN ({placeholders}) AND trackedDayDate BETWEEN %s AND %s;
     """
+
+# Helper function to find the tracked day IDs for many (clientID, date) pairs at once
+def fetchTrackedDayIDs(clientDays):
+    trackedDayIDs = {}
     cur = mysql.connection.cursor()
-    cur.execute(query, (trackedDayDate, clientName))
-    result = cur.fetchone()
-    return result["trackedDayID"] if result else None
+    for pairs in chunked(clientDays):
+        clientIDs = sorted({clientID for clientID, _ in pairs})
+        dates = [date for _, date in pairs]
+        cur.execute(buildTrackedDayIDsQuery(len(clientIDs)), clientIDs + [min(dates), max(dates)])
+        for day in cur.fetchall():
+            trackedDayIDs[(day["clientID"], day["trackedDayDate"])] = day["trackedDayID"]
+    return {pair: trackedDayIDs[pair] for pair in clientDays if pair in trackedDayIDs}
+
+# Helper function to find the tracked days for many (clientID, date) pairs, creating the missing ones
+# using the client's calorie target (or TDEE estimate). Returns ({(clientID, date): trackedDayID}, number of days created)
+def resolveTrackedDays(clientDays, clients):
+    trackedDayIDs = fetchTrackedDayIDs(clientDays)
+    missing = [pair for pair in clientDays if pair not in trackedDayIDs]
+    createdDays = 0
+    if missing:
+        targets = {client["clientID"]: getDefaultCalorieTarget(client) for client in clients.values()}
+        cur = mysql.connection.cursor()
+        for pairs in chunked(missing):
+            created = []
+            # One upsert per day, so its row count says whether it inserted the day or found one another
+            # request created in the meantime, which is kept rather than failing the whole chunk
+            for clientID, date in pairs:
+                cur.execute(
+                    "INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayCalorieTarget) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE trackedDayID = LAST_INSERT_ID(trackedDayID);",
+                    (clientID, date, targets[clientID]),
+                )
+                trackedDayIDs[(clientID, date)] = cur.lastrowid
+                if cur.rowcount == 1:
+                    created.append(cur.lastrowid)
+            logChanges(cur, "TrackedDays", "insert", created)
+            commitChanges("TrackedDays")
+            createdDays += len(created)
+    return trackedDayIDs, createdDays
+
+# Helper function to import parsed rows of food or exercise entries. Every row is checked first, then the
+# good rows are written in chunks with multi-row INSERTs. Returns a summary with the errors for each bad row.
+# progress, if given, is called with (rows done, rows to write) after each chunk
+def importEntries(kind, rows, progress=None):
+    errors = []
+    entries = []
+    for rowNumber, row in enumerate(rows, start=1):
+        entry, rowErrors = parseImportRow(kind, row)
+        if rowErrors:
+            errors.append({"row": rowNumber, "error": " ".join(rowErrors)})
+        else:
+            entries.append((rowNumber, entry))
+
+    # Resolve every name with one query per chunk of names instead of one query per row
+    clients = fetchClientsByNames({entry["clientName"] for _, entry in entries})
+    foods = {}
+    if kind == "food":
+        foods = fetchFoodsByNames(
+            {entry["foodName"] for _, entry in entries if entry["foodName"]}
+        )
+    resolved = []
+    for rowNumber, entry in entries:
+        if nameKey(entry["clientName"]) not in clients:
+            errors.append({"row": rowNumber, "error": "Client not found."})
+        elif kind == "food" and entry["foodName"] and nameKey(entry["foodName"]) not in foods:
+            errors.append({"row": rowNumber, "error": "Food not found."})
+        else:
+            entry["clientID"] = clients[nameKey(entry["clientName"])]["clientID"]
+            if kind == "food":
+                entry["foodID"] = foods[nameKey(entry["foodName"])]["foodID"] if entry["foodName"] else None
+            resolved.append((rowNumber, entry))
+    trackedDayIDs, createdDays = resolveTrackedDays(
+        sorted({(entry["clientID"], entry["trackedDayDate"]) for _, entry in resolved}),
+        clients,
+    )
 
-# Route to get the client names and IDs
-def fetchClientNamesExerciseEntries():
-    query = "SELECT clientID, clientName FROM Clients;"
+    if kind == "food":
+        entryTable = "FoodEntries"
+        insertQuery = "INSERT INTO FoodEntries (trackedDayID, foodID, foodEntryCalories, foodEntryGramWeight, foodEntryNote, foodEntryCaloriesDerived) VALUES (%s, %s, %s, %s, %s, %s);"
+    else:
+        entryTable = "ExerciseEntries"
+        insertQuery = "INSERT INTO ExerciseEntries (trackedDayID, exerciseEntryName, exerciseEntryType, exerciseEntryCalories, exerciseEntryNote) VALUES (%s, %s, %s, %s, %s);"
+    _, _, dayCalories, dayCount = ENTRY_TOTAL_COLUMNS[entryTable]
+
+    imported = 0
+    done = 0
     cur = mysql.connection.cursor()
-    cur.execute(query)
-    return cur.fetchall()
+    for chunk in chunked(resolved):
+        values = []
+        dayTotals = {}
+        written = []
+        # Derived calories use each food's calories per gram as it is in this chunk's transaction, so a food
+        # changed part-way through a long import can't leave entries with its old rate
+        rates = {}
+        if kind == "food":
+            rates = lockFoodRates(cur, [entry["foodID"] for _, entry in chunk if entry["derived"]])
+        for rowNumber, entry in chunk:
+            trackedDayID = trackedDayIDs[(entry["clientID"], entry["trackedDayDate"])]
+            if kind == "food":
+                if entry["derived"]:
+                    if entry["foodID"] not in rates:
+                        errors.append({"row": rowNumber, "error": "Food not found."})
+                        continue
+                    entry["calories"] = calculateFoodCalories(rates[entry["foodID"]], entry["gramWeight"])
+                values.append(
+                    (
+                        trackedDayID,
+                        entry["foodID"],
+                        entry["calories"],
+                        entry["gramWeight"],
+                        entry["note"],
+                        entry["derived"],
+                    )
+                )
+            else:
+                values.append(
+                    (
+                        trackedDayID,
+                        entry["exerciseName"],
+                        entry["type"],
+                        entry["calories"],
+                        entry["note"],
+                    )
+                )
+            written.append(rowNumber)
+            calories, count = dayTotals.get(trackedDayID, (0, 0))
+            dayTotals[trackedDayID] = (calories + entry["calories"], count + 1)
+        try:
+            # executemany turns an INSERT ... VALUES into a single multi-row INSERT
+            if values:
+                cur.executemany(insertQuery, values)
+            cur.executemany(
+                f"UPDATE TrackedDays SET {dayCalories} = {dayCalories} + %s, {dayCount} = {dayCount} + %s WHERE trackedDayID = %s;",
+                [(calories, count, trackedDayID) for trackedDayID, (calories, count) in dayTotals.items()],
+            )
+            # Imported entries are logged as changes to their tracked days rather than one row per entry
+            logChanges(cur, "TrackedDays", "update", dayTotals)
+            commitChanges(entryTable, "TrackedDays")
+            imported += len(written)
+        except DatabaseError as e:
+            mysql.connection.rollback()
+            errors += [{"row": rowNumber, "error": f"Database error: {e}"} for rowNumber in written]
+        done += len(chunk)
+        if progress:
+            progress(done, len(resolved))
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "imported": imported,
+        "failed": len({error["row"] for error in errors}),
+        "createdTrackedDays": createdDays,
+        "errors": errors,
+    }
+
+""" ___________ Routes for Batch Edits ___________ """
+# Applies a list of creates, updates and deletes of tracked days, food entries and exercise entries as one
+# transaction, so saving a week of edits is one request and one commit instead of one per row. Every
+# operation is checked with the same validate*Form helpers as the single-row routes before anything is
+# written, and if any operation fails the whole batch is rolled back. Each operation takes the same fields
+# as the form of its single-row route:
+#
+#   POST /batch
+#   {"operations": [
+#       {"op": "create", "table": "foodentries", "data": {"clientName": "...", "trackedDayDate": "2024-06-01",
+#           "foodName": "Apple", "gramWeight": 150, "calories": "", "note": ""}},
+#       {"op": "update", "table": "exerciseentries", "id": 12, "data": {"exerciseEntryName": "Running",
+#           "exerciseEntryType": "Cardio", "exerciseEntryCalories": 300, "exerciseEntryNote": ""}},
+#       {"op": "delete", "table": "foodentries", "id": 40}
+#   ]}
+
+# Most operations accepted in one batch
+MAX_BATCH_OPERATIONS = 1000
+# For each table: its name in the database, its ID column, and the tables a delete reaches through its cascades
+BATCH_TABLES = {
+    "trackeddays": ("TrackedDays", "trackedDayID", ("TrackedDays", "FoodEntries", "ExerciseEntries")),
+    "foodentries": ("FoodEntries", "foodEntryID", ("FoodEntries", "TrackedDays")),
+    "exerciseentries": ("ExerciseEntries", "exerciseEntryID", ("ExerciseEntries", "TrackedDays")),
+}
+BATCH_OPS = ("create", "update", "delete")
+
+# Route for applying a batch of edits
+@app.route("/batch", methods=["POST"])
+def batch():
+    body = request.get_json(silent=True)
+    operations = body.get("operations") if isinstance(body, dict) else body
+    if not isinstance(operations, list) or not operations:
+        return jsonify(error="Send a JSON list of operations."), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify(error=f"A batch can have at most {MAX_BATCH_OPERATIONS} operations."), 400
+    result = applyBatch(operations)
+    return jsonify(result), 200 if result["applied"] else 400
+
+# Helper function to check the shape of one operation. Returns the operation's errors
+def checkBatchOperation(operation):
+    if not isinstance(operation, dict):
+        return ["Each operation must be an object."]
+    errors = []
+    if operation.get("op") not in BATCH_OPS:
+        errors.append("op must be one of " + ", ".join(BATCH_OPS) + ".")
+    if operation.get("table") not in BATCH_TABLES:
+        errors.append("table must be one of " + ", ".join(BATCH_TABLES) + ".")
+    if operation.get("op") in ("update", "delete") and not isinstance(operation.get("id"), int):
+        errors.append("id is required.")
+    if operation.get("op") in ("create", "update") and not isinstance(operation.get("data"), dict):
+        errors.append("data is required.")
+    return errors
+
+# Helper function to read the rows that updates and deletes refer to, one query per table. Entries are locked,
+# so the archive command can't move them before the batch writes them.
+# Returns {table: {id: row}}; food entry rows include the ID of their food
+def fetchBatchTargets(operations):
+    ids = {}
+    for operation in operations:
+        if operation["op"] != "create":
+            ids.setdefault(operation["table"], set()).add(operation["id"])
+    queries = {
+        "trackeddays": "SELECT trackedDayID FROM TrackedDays WHERE trackedDayID IN ({});",
+        "foodentries": """
+            SELECT foodEntryID, trackedDayID AS rowTrackedDayID, foodID
+            FROM FoodEntries
+            WHERE foodEntryID IN ({})
+            FOR UPDATE;
+            """,
+        "exerciseentries": "SELECT exerciseEntryID, trackedDayID AS rowTrackedDayID FROM ExerciseEntries WHERE exerciseEntryID IN ({}) FOR UPDATE;",
+    }
+    targets = {table: {} for table in BATCH_TABLES}
+    cur = mysql.connection.cursor()
+    for table, tableIDs in ids.items():
+        idColumn = BATCH_TABLES[table][1]
+        for chunk in chunked(sorted(tableIDs)):
+            cur.execute(queries[table].format(", ".join(["%s"] * len(chunk))), chunk)
+            for row in cur.fetchall():
+                targets[table][row[idColumn]] = row
+    return targets
+
+# Helper function to validate one create or update and work out the values to write. Returns (values, errors).
+# New entries also get the (clientID, date) of the tracked day they go on, as values["day"]
+def prepareBatchValues(operation, target, clients, foods):
+    data = operation["data"]
+    table, op = operation["table"], operation["op"]
+    values = {}
+    if op == "create":
+        client = clients.get(nameKey(str(data.get("clientName") or "")))
+        if not client:
+            return None, ["Client not found."]
+        if table != "trackeddays":
+            try:
+                values["day"] = (client["clientID"], datetime.date.fromisoformat(str(data.get("trackedDayDate") or "")))
+            except ValueError:
+                return None, ["Date must be in YYYY-MM-DD format."]
+    if table == "trackeddays":
+        clientID = client["clientID"] if op == "create" else data.get("clientID")
+        calorieTarget = data.get("trackedDayCalorieTarget")
+        # New days without a target take the client's, the same as the tracked day form
+        if op == "create" and not calorieTarget:
+            calorieTarget = getDefaultCalorieTarget(client)
+        errors = validateTrackedDayForm(clientID, data.get("trackedDayDate"), calorieTarget)
+        values["row"] = (clientID, data.get("trackedDayDate"), calorieTarget, data.get("trackedDayNote"))
+        return values, errors
+    if table == "foodentries":
+        gramWeight, calories = data.get("gramWeight"), data.get("calories")
+        food = None
+        if op == "create":
+            if data.get("foodName"):
+                food = foods.get(nameKey(str(data["foodName"])))
+                if not food:
+                    return None, ["Food not found."]
+            caloriesPerGram = food["foodCaloriesPerGram"] if food else None
+        else:
+            caloriesPerGram = target["foodCaloriesPerGram"]
+        # Blank calories are worked out from the food, the same as in the single-row routes
+        derived = shouldDeriveCalories(calories, caloriesPerGram is not None)
+        errors = validateFoodEntryForm(gramWeight, calories, derived)
+        if errors:
+            return None, errors
+        if derived:
+            calories = calculateFoodCalories(caloriesPerGram, gramWeight)
+        values["row"] = (int(calories), int(gramWeight), data.get("note"), derived)
+        if op == "create":
+            values["row"] = (food["foodID"] if food else None,) + values["row"]
+        return values, []
+    if op == "create":
+        name, exerciseType = data.get("exerciseName"), data.get("type")
+        calories, note = data.get("calories"), data.get("note")
+    else:
+        name, exerciseType = data.get("exerciseEntryName"), data.get("exerciseEntryType")
+        calories, note = data.get("exerciseEntryCalories"), data.get("exerciseEntryNote")
+    errors = validateExerciseEntryForm(name, exerciseType, calories)
+    if exerciseType and exerciseType not in EXERCISE_TYPES:
+        errors.append("Exercise type must be one of " + ", ".join(EXERCISE_TYPES) + ".")
+    values["row"] = (name, exerciseType, calories, note)
+    return values, errors
+
+# Helper function to pick the prepared operations of one kind
+def selectBatch(prepared, table, op):
+    return [item for item in prepared if item["table"] == table and item["op"] == op]
+
+# Helper function to apply a batch of operations in one transaction. Returns {"applied": bool, "results": [...]}
+# with one result per operation, in the order they were sent
+def applyBatch(operations):
+    results = [{"index": index} for index in range(len(operations))]
+    failed = False
+    for result, operation in zip(results, operations):
+        errors = checkBatchOperation(operation)
+        if errors:
+            result["errors"] = errors
+            failed = True
+    if failed:
+        return {"applied": False, "results": results}
+
+    # Look up everything the operations refer to with a few set-based queries before writing anything
+    targets = fetchBatchTargets(operations)
+    creates = [operation for operation in operations if operation["op"] == "create"]
+    clients = fetchClientsByNames(
+        {operation["data"].get("clientName") for operation in creates if operation["data"].get("clientName")}
+    )
+    foods = fetchFoodsByNames(
+        {
+            operation["data"].get("foodName")
+            for operation in creates
+            if operation["table"] == "foodentries" and operation["data"].get("foodName")
+        }
+    )
+    # Derived calories use each food's calories per gram as it is in this transaction (see lockFoodRates)
+    rates = lockFoodRates(
+        mysql.connection.cursor(),
+        [food["foodID"] for food in foods.values()]
+        + [target["foodID"] for target in targets["foodentries"].values() if target["foodID"]],
+    )
+    for row in list(foods.values()) + list(targets["foodentries"].values()):
+        row["foodCaloriesPerGram"] = rates.get(row["foodID"])
+    prepared = []
+    for result, operation in zip(results, operations):
+        target = targets[operation["table"]].get(operation.get("id"))
+        if operation["op"] != "create" and target is None:
+            entryTable = BATCH_TABLES[operation["table"]][0]
+            archived = entryTable in ARCHIVE_TABLES and isArchivedEntry(mysql.connection.cursor(), entryTable, operation["id"])
+            result["errors"] = [ARCHIVED_ENTRY_ERROR if archived else "Not found."]
+            failed = True
+            continue
+        values, errors = {}, []
+        if operation["op"] != "delete":
+            try:
+                values, errors = prepareBatchValues(operation, target, clients, foods)
+            except (TypeError, ValueError):
+                errors = ["Weight, calories and calorie targets must be whole numbers."]
+        if errors:
+            result["errors"] = errors
+            failed = True
+            continue
+        prepared.append(
+            dict(values, result=result, table=operation["table"], op=operation["op"], id=operation.get("id"), target=target)
+        )
+    if failed:
+        return {"applied": False, "results": results}
+
+    cur = mysql.connection.cursor()
+    # Tracked days whose totals are recomputed at the end, in place of adjusting them entry by entry
+    affectedDays = set()
+    # The operations being written, so a database error can be reported against them
+    step = []
+    try:
+        # Tracked days are written first so that entries created in the same batch can go on them.
+        # Creates are inserted one at a time to get each new row's ID
+        for item in selectBatch(prepared, "trackeddays", "create"):
+            step = [item]
+            cur.execute(
+                "INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote) VALUES (%s, %s, %s, %s);",
+                item["row"],
+            )
+            item["result"]["id"] = cur.lastrowid
+        step = selectBatch(prepared, "trackeddays", "update")
+        if step:
+            moved = findMovedTrackedDays(cur, {item["id"]: item["row"][0] for item in step})
+            logTrackedDayChanges(cur, "delete", moved)
+            cur.executemany(
+                "UPDATE TrackedDays SET clientID = %s, trackedDayDate = %s, trackedDayCalorieTarget = %s, trackedDayNote = %s WHERE trackedDayID = %s;",
+                [item["row"] + (item["id"],) for item in step],
+            )
+            logChanges(cur, "TrackedDays", "update", [item["id"] for item in step if item["id"] not in moved])
+            logTrackedDayChanges(cur, "insert", moved)
+        logChanges(
+            cur, "TrackedDays", "insert", [item["result"]["id"] for item in selectBatch(prepared, "trackeddays", "create")]
+        )
+
+        # New entries find their tracked day by client and date, creating it if it doesn't exist yet, like the
+        # entry forms do
+        entryCreates = [item for item in prepared if item["table"] != "trackeddays" and item["op"] == "create"]
+        trackedDayIDs = fetchTrackedDayIDs(sorted({item["day"] for item in entryCreates})) if entryCreates else {}
+        for day in sorted({item["day"] for item in entryCreates} - trackedDayIDs.keys()):
+            step = [item for item in entryCreates if item["day"] == day]
+            trackedDayIDs[day] = upsertTrackedDay(cur, *day)[0]
+        for item in entryCreates:
+            step = [item]
+            trackedDayID = trackedDayIDs[item["day"]]
+            if item["table"] == "foodentries":
+                cur.execute(
+                    "INSERT INTO FoodEntries (trackedDayID, foodID, foodEntryCalories, foodEntryGramWeight, foodEntryNote, foodEntryCaloriesDerived) VALUES (%s, %s, %s, %s, %s, %s);",
+                    (trackedDayID,) + item["row"],
+                )
+                item["result"]["foodEntryCalories"] = item["row"][1]
+            else:
+                cur.execute(
+                    "INSERT INTO ExerciseEntries (trackedDayID, exerciseEntryName, exerciseEntryType, exerciseEntryCalories, exerciseEntryNote) VALUES (%s, %s, %s, %s, %s);",
+                    (trackedDayID,) + item["row"],
+                )
+            item["result"]["id"] = cur.lastrowid
+            affectedDays.add(trackedDayID)
+        for table in ("foodentries", "exerciseentries"):
+            logChanges(
+                cur,
+                BATCH_TABLES[table][0],
+                "insert",
+                [item["result"]["id"] for item in entryCreates if item["table"] == table],
+            )
+
+        # Updates of each table go through one executemany
+        step = selectBatch(prepared, "foodentries", "update")
+        if step:
+            cur.executemany(
+                "UPDATE FoodEntries SET foodEntryCalories = %s, foodEntryGramWeight = %s, foodEntryNote = %s, foodEntryCaloriesDerived = %s WHERE foodEntryID = %s;",
+                [item["row"] + (item["id"],) for item in step],
+            )
+            for item in step:
+                item["result"]["foodEntryCalories"] = item["row"][0]
+        step = selectBatch(prepared, "exerciseentries", "update")
+        if step:
+            cur.executemany(
+                "UPDATE ExerciseEntries SET exerciseEntryName = %s, exerciseEntryType = %s, exerciseEntryCalories = %s, exerciseEntryNote = %s WHERE exerciseEntryID = %s;",
+                [item["row"] + (item["id"],) for item in step],
+            )
+        affectedDays.update(
+            item["target"]["rowTrackedDayID"] for item in prepared if item["table"] != "trackeddays" and item["op"] == "update"
+        )
+        for table in ("foodentries", "exerciseentries"):
+            logChanges(cur, BATCH_TABLES[table][0], "update", [item["id"] for item in selectBatch(prepared, table, "update")])
+
+        # Deletes of each table are one DELETE ... IN per chunk. Entries go before tracked days, whose
+        # cascades would otherwise remove them first
+        for table in ("foodentries", "exerciseentries", "trackeddays"):
+            entryTable, idColumn, _ = BATCH_TABLES[table]
+            for step in chunked(selectBatch(prepared, table, "delete")):
+                placeholders = ", ".join(["%s"] * len(step))
+                # Deleted tracked days take the rest of their entries with them
+                if table == "trackeddays":
+                    logTrackedDayChanges(cur, "delete", [item["id"] for item in step])
+                else:
+                    logChanges(cur, entryTable, "delete", [item["id"] for item in step])
+                cur.execute(f"DELETE FROM {entryTable} WHERE {idColumn} IN ({placeholders});", [item["id"] for item in step])
+                if table != "trackeddays":
+                    affectedDays.update(item["target"]["rowTrackedDayID"] for item in step)
+
+        step = []
+        rebuildTrackedDayTotals(cur, sorted(affectedDays))
+        changedTables = set()
+        for item in prepared:
+            table, idColumn, cascades = BATCH_TABLES[item["table"]]
+            changedTables.update(cascades if item["op"] == "delete" else (table, "TrackedDays"))
+            item["result"].setdefault("id", item["id"])
+        commitChanges(*sorted(changedTables))
+    except DatabaseError as e:
+        mysql.connection.rollback()
+        for item in step or prepared:
+            item["result"]["errors"] = [f"Database error: {e}"]
+        return {"applied": False, "results": results}
+    return {"applied": True, "results": results}
+
+""" ___________ Routes for Background Jobs ___________ """
+# Work that can take longer than a request should (clinic-wide reports, recomputations, large imports and
+# archiving) runs as a job instead: POST /jobs queues it and answers straight away with the job's URL,
+# GET /jobs/<jobID> shows its status, progress and result, and POST /jobs/<jobID>/cancel stops it.
+# Jobs run in the worker processes started by "flask run-jobs" (see jobs.py), and the number of workers is
+# the number of jobs that run at once. Job times are in UTC
+
+JOB_WORKERS = int(os.environ.get("KILOJULIA_JOB_WORKERS", 2))
+# New jobs are turned away while this many are waiting for a worker
+MAX_QUEUED_JOBS = int(os.environ.get("KILOJULIA_MAX_QUEUED_JOBS", 100))
+jobQueue = JobQueue(db.pool, keepDays=int(os.environ.get("KILOJULIA_JOB_KEEP_DAYS", 7)))
+
+# Route to queue a job. Takes form fields (with the file for an import) or a JSON object: "kind" plus the
+# job's own fields, e.g. {"kind": "clinic-report", "bucket": "week", "startDate": "2024-01-01"}
+@app.route("/jobs", methods=["POST"])
+def submitJob():
+    data = request.get_json(silent=True) or request.form.to_dict()
+    kind = data.get("kind") if isinstance(data, dict) else None
+    if kind not in jobQueue.handlers:
+        return jsonify(error=f"Job kind must be one of: {', '.join(sorted(jobQueue.handlers))}."), 400
+    params, jobInput, error = getJobParams(kind, data)
+    if error:
+        return jsonify(error=error), 400
+    if jobQueue.queued() >= MAX_QUEUED_JOBS:
+        return jsonify(error="Too many jobs are waiting. Please try again later."), 429
+    jobID = jobQueue.submit(kind, params, jobInput)
+    response = jsonify(jobID=jobID, jobStatus="queued", url=url_for("getJob", jobID=jobID))
+    response.status_code = 202
+    response.headers["Location"] = url_for("getJob", jobID=jobID)
+    return response
+
+# Route for a job's status, progress and, once it has finished, its result or error
+@app.route("/jobs/<int:jobID>", methods=["GET"])
+def getJob(jobID):
+    job = jobQueue.get(jobID)
+    if job is None:
+        return jsonify(error="Job not found."), 404
+    return jsonify(apiRow(job))
+
+# Route to cancel a job. A queued job never runs; a running one stops at its next step, keeping the
+# batches it already committed
+@app.route("/jobs/<int:jobID>/cancel", methods=["POST"])
+def cancelJob(jobID):
+    if jobQueue.cancel(jobID):
+        return jsonify(apiRow(jobQueue.get(jobID)))
+    if jobQueue.get(jobID) is None:
+        return jsonify(error="Job not found."), 404
+    return jsonify(error="This job has already finished."), 409
+
+# Helper function to check a new job's fields. Returns (params, input, error); input is the uploaded file, if any
+def getJobParams(kind, data):
+    if kind == "import-entries":
+        upload = request.files.get("file")
+        if data.get("entryKind") not in ("food", "exercise"):
+            return None, None, "Entry type must be food or exercise."
+        if not upload or not upload.filename:
+            return None, None, "Please choose a file to import."
+        return {"entryKind": data["entryKind"], "filename": upload.filename}, upload.read(), None
+    if kind == "recompute-food-calories":
+        try:
+            return {"foodID": int(data.get("foodID"))}, None, None
+        except (TypeError, ValueError):
+            return None, None, "Food ID must be a whole number."
+    if kind == "archive-entries":
+        through = data.get("through")
+        try:
+            through = datetime.date.fromisoformat(through).isoformat() if through else None
+        except ValueError:
+            return None, None, "Dates must be in YYYY-MM-DD format."
+        return {"through": through}, None, None
+    if kind == "clinic-report":
+        bucket, startDate, endDate, error = getReportArgs(data)
+        if error:
+            return None, None, error
+        return {"bucket": bucket, "startDate": startDate.isoformat(), "endDate": endDate.isoformat()}, None, None
+    return {}, None, None
+
+# The job kinds. Each runs in a worker process inside an app context, so it can use the same helpers as the
+# routes, and passes job.progress to them so the job's progress shows up and cancelling it takes effect
+@jobQueue.handler("import-entries")
+def importEntriesJob(job):
+    file = io.TextIOWrapper(io.BytesIO(job.input), encoding="utf-8-sig")
+    return importEntries(job.params["entryKind"], readImportFile(file, job.params["filename"]), progress=job.progress)
+
+@jobQueue.handler("recompute-food-calories")
+def recomputeFoodCaloriesJob(job):
+    return {"updated": recomputeDerivedFoodCalories(job.params["foodID"], progress=job.progress)}
+
+@jobQueue.handler("rebuild-totals")
+def rebuildTotalsJob(job):
+    cur = mysql.connection.cursor()
+    drift = findTrackedDayTotalDrift(cur)
+    return {"repaired": repairTrackedDayTotals([day["trackedDayID"] for day in drift], progress=job.progress)}
+
+@jobQueue.handler("refresh-energy")
+def refreshEnergyJob(job):
+    cur = mysql.connection.cursor()
+    refreshed = refreshClientEnergy(cur)
+    commitChanges("Clients")
+    return {"refreshed": refreshed}
+
+@jobQueue.handler("archive-entries")
+def archiveEntriesJob(job):
+    through = job.params.get("through")
+    through = datetime.date.fromisoformat(through) if through else getDefaultArchiveThrough()
+    return dict(archiveEntries(through, progress=job.progress), through=through.isoformat())
+
+@jobQueue.handler("clinic-report")
+def clinicReportJob(job):
+    bucket, startDate, endDate, _ = getReportArgs(job.params)
+    return buildClinicReport(bucket, startDate, endDate, progress=job.progress)
+
+""" ___________ Worker Warmup ___________ """
+# Helper function to get a new server process ready before it is sent any requests: opens the pool's
+# connections, builds the name search indexes and compiles every template, so the first requests a worker
+# serves aren't slower than the rest. gunicorn.conf.py calls it in each worker
+def warmUp():
+    started = time.perf_counter()
+    db.pool.fill()
+    # Start checking the replicas now, so they can take reads from the first requests
+    mysql.replicas.start()
+    with app.app_context():
+        for namespace in NAME_INDEX_QUERIES:
+            getNameIndex(namespace)
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    app.logger.info("Warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
+
+""" ___________ Maintenance Commands ___________ """
+# Command to repair or check the stored Tracked Day totals: "flask rebuild-totals" or "flask rebuild-totals --verify"
+@app.cli.command("rebuild-totals")
+@click.option("--verify", is_flag=True, help="Only report tracked days whose totals have drifted.")
+def rebuildTotalsCommand(verify):
+    cur = mysql.connection.cursor()
+    drift = findTrackedDayTotalDrift(cur)
+    for day in drift:
+        click.echo(
+            "Tracked day {trackedDayID}: food {trackedDayFoodCalories} kcal/{trackedDayFoodEntryCount} entries "
+            "(actual {actualFoodCalories}/{actualFoodEntryCount}), exercise {trackedDayExerciseCalories} kcal/"
+            "{trackedDayExerciseEntryCount} entries (actual {actualExerciseCalories}/{actualExerciseEntryCount})".format(**day)
+        )
+    if verify:
+        click.echo(f"{len(drift)} tracked day(s) with drifted totals.")
+        if drift:
+            raise SystemExit(1)
+        return
+    repairTrackedDayTotals([day["trackedDayID"] for day in drift])
+    click.echo(f"Repaired totals for {len(drift)} tracked day(s).")
+
+# Command to recompute every client's BMR and TDEE estimates: "flask refresh-energy". Only needed after
+# changing the formula or activity factors, since client edits keep their own estimates current
+@app.cli.command("refresh-energy")
+def refreshEnergyCommand():
+    started = time.perf_counter()
+    refreshed = refreshClientEnergy(mysql.connection.cursor())
+    commitChanges("Clients")
+    click.echo(f"Updated the energy estimates of {refreshed} client(s) in {time.perf_counter() - started:.2f}s.")
+
+# Command to import a CSV or JSON file of entries: "flask import-entries --kind food week.csv"
+@app.cli.command("import-entries")
+@click.option("--kind", type=click.Choice(["food", "exercise"]), required=True)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+def importEntriesCommand(kind, path):
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        summary = importEntries(kind, readImportFile(file, path))
+    for error in summary["errors"]:
+        click.echo(f"Row {error['row']}: {error['error']}", err=True)
+    click.echo(
+        f"Imported {summary['imported']} entries, {summary['failed']} row(s) failed, "
+        f"created {summary['createdTrackedDays']} tracked day(s)."
+    )
+
+# Command to start the background job workers: "flask run-jobs", or "flask run-jobs --workers 4".
+# Ctrl+C or SIGTERM stops them once their current jobs finish
+@app.cli.command("run-jobs")
+@click.option("--workers", type=int, default=JOB_WORKERS, show_default=True, help="Number of jobs that run at once.")
+def runJobsCommand(workers):
+    click.echo(f"Running background jobs with {workers} worker(s).")
+    jobQueue.runWorkers(workers, app.app_context)
+
+# Command to apply pending schema migrations: "flask migrate", or "flask migrate --list" to only show them
+@app.cli.command("migrate")
+@click.option("--list", "listOnly", is_flag=True, help="Only list the migrations that haven't been applied.")
+@click.option("--target", type=int, help="Stop after this migration version.")
+def migrateCommand(listOnly, target):
+    if listOnly:
+        pending = migrations.pending_migrations(mysql.connection.cursor())
+        for version, name, _ in pending:
+            click.echo(f"{version:04d} {name}")
+        click.echo(f"{len(pending)} pending migration(s).")
+        return
+    try:
+        applied = migrations.migrate(mysql.connection, target=target, log=click.echo)
+    except migrations.MigrationError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Applied {len(applied)} migration(s).")
+
+# Command to move the entries of closed periods into the archive tables: "flask archive-entries".
+# Without --through, archives everything before the last KILOJULIA_ARCHIVE_KEEP_MONTHS whole months
+@app.cli.command("archive-entries")
+@click.option("--through", type=click.DateTime(formats=["%Y-%m-%d"]), help="Archive entries of tracked days up to and including this date.")
+def archiveEntriesCommand(through):
+    through = through.date() if through else getDefaultArchiveThrough()
+    moved = archiveEntries(through)
+    click.echo(
+        f"Archived {moved['FoodEntries']} food and {moved['ExerciseEntries']} exercise entries through {through}."
+    )
+
+# Command to delete change log rows older than the given number of days: "flask prune-change-log --days 7".
+# Pages only ask for recent changes, so old rows are never read again
+@app.cli.command("prune-change-log")
+@click.option("--days", type=int, default=CHANGE_LOG_KEEP_DAYS, show_default=True, help="Keep changes from this many days.")
+def pruneChangeLogCommand(days):
+    cur = mysql.connection.cursor()
+    deleted = 0
+    while True:
+        # In batches, so no single statement holds locks on the log for long
+        cur.execute(
+            "DELETE FROM ChangeLog WHERE changedAt < UTC_TIMESTAMP(6) - INTERVAL %s DAY ORDER BY changeID LIMIT %s;",
+            (days, ARCHIVE_BATCH_SIZE),
+        )
+        mysql.connection.commit()
+        deleted += cur.rowcount
+        if cur.rowcount < ARCHIVE_BATCH_SIZE:
+            break
+    click.echo(f"Deleted {deleted} change log rows older than {days} days.")
 
 """
 Citation for the following code:
@@ -0,0 +1,213 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Async serving mode. The read-only JSON API (/api/v1) is served here by coroutines on a non-blocking MySQL
+# pool, so one process keeps hundreds of requests in flight while they wait on the database. Every other
+# route is passed to the Flask app in app.py, which asgiref runs on a thread pool.
+#
+#   uvicorn asgi:app --host 127.0.0.1 --port 8000
+#
+# Responses, ETags and caching headers are the same as the Flask versions of these routes, so clients can
+# switch between the two serving modes without noticing.
+
+import json
+import urllib.parse
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+
+from app import (
+    API_PREFIX,
+    API_RESOURCES,
+    ARCHIVED_THROUGH_QUERY,
+    apiRow,
+    buildApiItemQuery,
+    buildApiListQuery,
+    buildArchiveQuery,
+    buildTableVersionsQuery,
+    getApiFields,
+    getApiFilters,
+    getPageArgs,
+    isNotModified,
+    makeApiVersions,
+    mergeArchivedRows,
+    parseApiKey,
+    readTableVersions,
+)
+from app import app as flaskApp
+from database.async_db import AsyncConnectionPool
+from database.db_connector import PoolTimeoutError
+
+asyncPool = AsyncConnectionPool()
+flaskHandler = WsgiToAsgi(flaskApp)
+
+
+# The parts of an ASGI request the async routes need, in the same shapes Flask would give them
+class AsyncRequest:
+    def __init__(self, scope):
+        self.path = scope["path"]
+        self.queryString = scope.get("query_string", b"").decode("latin-1")
+        self.args = MultiDict(urllib.parse.parse_qsl(self.queryString, keep_blank_values=True))
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        # Matches Flask's request.full_path, which is part of the ETag
+        self.fullPath = f"{self.path}?{self.queryString}"
+
+
+# ASGI entry point
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http" and scope["method"] == "GET":
+        route = matchAsyncRoute(scope["path"])
+        if route:
+            handler, args = route
+            try:
+                status, headers, body = await handler(AsyncRequest(scope), *args)
+            except PoolTimeoutError:
+                status, headers, body = jsonResponse({"error": "The server is busy. Please try again."}, 503)
+            return await sendResponse(send, status, headers, body)
+    return await flaskHandler(scope, receive, send)
+
+
+# Opens the async pool when the server starts and closes it when the server stops
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await asyncPool.open()
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await asyncPool.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+# Helper function to find the async handler for a path. Returns (handler, args), or None to let Flask have it
+def matchAsyncRoute(path):
+    if not path.startswith(API_PREFIX + "/"):
+        return None
+    parts = path[len(API_PREFIX) + 1:].split("/")
+    if parts[0] not in API_RESOURCES:
+        return None
+    if len(parts) == 1:
+        return apiList, (parts[0],)
+    if len(parts) == 2 and parts[1]:
+        return apiItem, (parts[0], parts[1])
+    return None
+
+
+# Async version of the apiList route in app.py
+async def apiList(request, resource):
+    definition = API_RESOURCES[resource]
+    fields, error = getApiFields(definition, request.args.get("fields"))
+    if error:
+        return jsonResponse({"error": error}, 400)
+    after = None
+    if request.args.get("after"):
+        after = parseApiKey(definition, request.args["after"])
+        if after is None:
+            return jsonResponse({"error": "Invalid after value."}, 400)
+    _, limit = getPageArgs(request.args)
+    versions = await getApiVersions(request, definition)
+    if requestNotModified(request, versions):
+        return apiResponse(None, versions)
+
+    filters = getApiFilters(request.args)
+    query, params = buildApiListQuery(definition, fields, filters, after, limit)
+    rows = await asyncPool.fetchall(query, params)
+    archiveQuery = await getArchiveQuery(query, definition, filters["startDate"])
+    if archiveQuery:
+        rows = mergeArchivedRows(rows, await asyncPool.fetchall(archiveQuery, params), definition["keys"], limit)
+    rows = [apiRow(row) for row in rows]
+    nextPage = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        args = request.args.to_dict()
+        args["after"] = "-".join(str(rows[-1][key]) for key in definition["keys"])
+        nextPage = f"{API_PREFIX}/{resource}?{urllib.parse.urlencode(args)}"
+    return apiResponse({"data": rows, "next": nextPage}, versions)
+
+
+# Async version of the apiItem route in app.py
+async def apiItem(request, resource, itemKey):
+    definition = API_RESOURCES[resource]
+    key = parseApiKey(definition, itemKey)
+    if key is None:
+        return jsonResponse({"error": "Not found."}, 404)
+    fields, error = getApiFields(definition, request.args.get("fields"))
+    if error:
+        return jsonResponse({"error": error}, 400)
+    versions = await getApiVersions(request, definition)
+    if requestNotModified(request, versions):
+        return apiResponse(None, versions)
+    query = buildApiItemQuery(definition, fields)
+    rows = await asyncPool.fetchall(query, key)
+    if not rows:
+        archiveQuery = await getArchiveQuery(query, definition)
+        if archiveQuery:
+            rows = await asyncPool.fetchall(archiveQuery, key)
+    if not rows:
+        return jsonResponse({"error": "Not found."}, 404)
+    return apiResponse({"data": apiRow(rows[0])}, versions)
+
+
+async def getApiVersions(request, definition):
+    rows = await asyncPool.fetchall(*buildTableVersionsQuery(definition["tables"]))
+    return makeApiVersions(definition, readTableVersions(rows), request.fullPath)
+
+
+# Async version of getArchiveQuery in app.py, for the resources that have archived rows
+async def getArchiveQuery(query, definition, startDate=None):
+    if not definition.get("archive"):
+        return None
+    rows = await asyncPool.fetchall(ARCHIVED_THROUGH_QUERY)
+    return buildArchiveQuery(query, definition["archive"], rows[0]["archivedThrough"], startDate)
+
+
+def requestNotModified(request, versions):
+    return isNotModified(
+        versions,
+        parse_etags(request.headers.get("if-none-match")),
+        parse_date(request.headers.get("if-modified-since")),
+    )
+
+
+# Helper function to build a JSON response as (status, headers, body), encoded the same way as Flask's jsonify
+def jsonResponse(body, status=200):
+    encoded = (json.dumps(body, separators=(",", ":"), sort_keys=True) + "\n").encode()
+    return status, [("Content-Type", "application/json")], encoded
+
+
+# Helper function to build an API response with its caching headers. A body of None means 304 Not Modified
+def apiResponse(body, versions):
+    etag, lastModified = versions
+    if body is None:
+        status, headers, encoded = 304, [], b""
+    else:
+        status, headers, encoded = jsonResponse(body)
+    headers.append(("ETag", quote_etag(etag, weak=True)))
+    if lastModified:
+        headers.append(("Last-Modified", http_date(lastModified)))
+    headers.append(("Cache-Control", "private, no-cache"))
+    return status, headers, encoded
+
+
+async def sendResponse(send, status, headers, body):
+    headers = headers + [("Content-Length", str(len(body)))]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,461 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Times every route in app.py against the database from the .env file (fill it with benchmarks/seed.py first)
+# and saves throughput, latency percentiles and queries per request to benchmarks/results.
+#
+#   python -m benchmarks.run --mode client --iterations 50
+#   gunicorn
+#   python -m benchmarks.run --mode http --url http://127.0.0.1:8000 --concurrency 16 --duration 10
+#   python -m benchmarks.run --compare benchmarks/results/OLD.json benchmarks/results/NEW.json --fail-over 15
+#
+# To compare the async serving mode (asgi.py) with gunicorn, load the same routes from each server at a
+# concurrency well above the number of gunicorn workers, then compare the two result files:
+#
+#   gunicorn -w 4 -b 127.0.0.1:8000 wsgi:app
+#   python -m benchmarks.run --mode http --only api --concurrency 200 --output benchmarks/results/wsgi.json
+#   uvicorn asgi:app --host 127.0.0.1 --port 8000
+#   python -m benchmarks.run --mode http --only api --concurrency 200 --output benchmarks/results/asgi.json
+#   python -m benchmarks.run --compare benchmarks/results/wsgi.json benchmarks/results/asgi.json
+#
+# benchmarks/serving.py does the same for gunicorn's default settings and the ones in gunicorn.conf.py.
+#
+# "client" mode calls the app in-process through Flask's test client, one request at a time, which shows the
+# cost of each route on its own. "http" mode sends concurrent requests to a running server, which shows how
+# the routes hold up under load.
+
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import database.db_connector as db
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+# Requests sent to each route before timing starts, so caches and pooled connections are warm
+WARMUP_REQUESTS = 3
+# Marks the entries the write benchmarks create, so they can be found and deleted again
+WRITE_MARKER = "benchmark"
+
+
+# Picks real names and IDs from the seeded database for the route URLs
+def load_sample():
+    with db.pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            SELECT Clients.clientID, Clients.clientName, MAX(TrackedDays.trackedDayDate) AS last_day,
+            COUNT(*) AS days
+            FROM Clients JOIN TrackedDays ON TrackedDays.clientID = Clients.clientID
+            GROUP BY Clients.clientID
+            ORDER BY days DESC
+            LIMIT 1;
+            """
+        )
+        client = cursor.fetchone()
+        if not client:
+            raise SystemExit("The database has no tracked days. Run python -m benchmarks.seed first.")
+        cursor.execute(
+            "SELECT staffID FROM StaffClients WHERE clientID = %s LIMIT 1;", (client["clientID"],)
+        )
+        staff = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT trackedDayID, trackedDayDate, trackedDayCalorieTarget, trackedDayNote
+            FROM TrackedDays WHERE clientID = %s AND trackedDayDate = %s;
+            """,
+            (client["clientID"], client["last_day"]),
+        )
+        day = cursor.fetchone()
+        cursor.execute("SELECT foodID, foodName FROM Foods ORDER BY foodID LIMIT 1;")
+        food = cursor.fetchone()
+        cursor.execute("SELECT foodEntryID FROM FoodEntries ORDER BY foodEntryID LIMIT 1 OFFSET 100;")
+        entry = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT TABLE_NAME AS name, TABLE_ROWS AS estimatedRows FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE();
+            """
+        )
+        tables = {row["name"]: row["estimatedRows"] for row in cursor.fetchall()}
+    last_day = client["last_day"]
+    return {
+        "clientID": client["clientID"],
+        "clientName": client["clientName"],
+        "staffID": staff["staffID"] if staff else 1,
+        "trackedDayID": day["trackedDayID"],
+        "trackedDayDate": last_day.isoformat(),
+        "trackedDayCalorieTarget": day["trackedDayCalorieTarget"],
+        "trackedDayNote": day["trackedDayNote"] or "",
+        "monthStart": (last_day - datetime.timedelta(days=29)).isoformat(),
+        "yearStart": (last_day - datetime.timedelta(days=364)).isoformat(),
+        "foodName": food["foodName"],
+        "afterFoodEntryID": entry["foodEntryID"] if entry else 0,
+        "tables": tables,
+    }
+
+
+# The read-only routes, as (name, path)
+def read_routes(sample):
+    quote = urllib.parse.quote
+    client = quote(sample["clientName"])
+    month = f"startDate={sample['monthStart']}&endDate={sample['trackedDayDate']}"
+    year = f"startDate={sample['yearStart']}&endDate={sample['trackedDayDate']}"
+    return [
+        ("index", "/"),
+        ("staff", "/staff"),
+        ("clients", "/clients"),
+        ("staffclients", "/staffclients"),
+        ("foods", "/foods"),
+        ("trackeddays", "/trackeddays"),
+        ("trackeddays filtered", f"/trackeddays?clientName={client}&{month}"),
+        ("foodentries", "/foodentries"),
+        ("foodentries next page", f"/foodentries?after={sample['afterFoodEntryID']}"),
+        ("foodentries filtered", f"/foodentries?clientName={client}&{month}"),
+        ("exerciseentries", "/exerciseentries"),
+        ("exerciseentries filtered", f"/exerciseentries?clientName={client}&{month}"),
+        ("search foods", f"/search/foods?q={quote(sample['foodName'][:4])}"),
+        ("search clients", f"/search/clients?q={quote(sample['clientName'][:3])}"),
+        ("search staff", "/search/staff?q=a"),
+        ("report client daily", f"/reports/client/{sample['clientID']}?bucket=day&{year}"),
+        ("report client weekly", f"/reports/client/{sample['clientID']}?bucket=week&{year}"),
+        ("report client monthly", f"/reports/client/{sample['clientID']}?bucket=month&{year}"),
+        ("report staff weekly", f"/reports/staff/{sample['staffID']}?bucket=week&{month}"),
+        ("dashboard", f"/dashboard/{sample['staffID']}"),
+        ("api foodentries", "/api/v1/foodentries"),
+        ("api foodentries filtered", f"/api/v1/foodentries?clientName={client}&{month}"),
+        ("api trackeddays staff", f"/api/v1/trackeddays?staffID={sample['staffID']}&{month}"),
+        ("api client", f"/api/v1/clients/{sample['clientID']}"),
+        ("importentries form", "/importentries"),
+        ("stats", "/stats"),
+    ]
+
+
+# Sends requests through Flask's test client, in this process
+class TestClientTransport:
+    def __init__(self):
+        from app import app
+
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        response.close()
+        return response.status_code, response.headers.get("X-DB-Query-Count")
+
+    def close(self):
+        pass
+
+
+# Sends requests to a running server over one keep-alive HTTP connection (one per thread)
+class HTTPTransport:
+    def __init__(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        self.connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+        self.prefix = parsed.path.rstrip("/")
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data) if data else None
+        headers = {"Content-Type": "application/x-www-form-urlencoded"} if data else {}
+        try:
+            self.connection.request(method, self.prefix + path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return 0, None
+        return response.status, response.getheader("X-DB-Query-Count")
+
+    def close(self):
+        self.connection.close()
+
+
+# Latencies and query counts collected for one route
+class RouteTimings:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, latency, status, queries):
+        with self._lock:
+            self.latencies.append(latency)
+            if status == 0 or status >= 400:
+                self.errors += 1
+            if queries is not None:
+                self.queries.append(int(queries))
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 2)
+
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughputRps": round(len(latencies) / self.seconds, 1) if self.seconds else None,
+            "meanMs": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+            "p50Ms": percentile(0.5),
+            "p95Ms": percentile(0.95),
+            "p99Ms": percentile(0.99),
+            "maxMs": round(latencies[-1] * 1000, 2) if latencies else None,
+            "queriesPerRequest": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+        }
+
+
+def timed(transport, timings, method, path, data=None):
+    started = time.perf_counter()
+    status, queries = transport.request(method, path, data)
+    timings.add(time.perf_counter() - started, status, queries)
+    return status
+
+
+# One pass of the write routes: add a food and an exercise entry, update them, then delete them.
+# Each worker uses its own marker so it only touches the entries it made
+def write_cycle(transport, results, sample, marker):
+    def timings(name):
+        return results.setdefault(name, RouteTimings())
+
+    day = {"trackedDayDate": sample["trackedDayDate"], "clientName": sample["clientName"]}
+    timed(
+        transport, timings("addfoodentry"), "POST", "/addfoodentry",
+        dict(day, foodName=sample["foodName"], gramWeight="150", calories="", note=marker),
+    )
+    timed(
+        transport, timings("add exerciseentry"), "POST", "/exerciseentries",
+        dict(day, exerciseName="Running", type="Cardio", calories="300", note=marker),
+    )
+    timed(
+        transport, timings("updatetrackedday"), "POST", f"/updatetrackedday/{sample['trackedDayID']}",
+        {
+            "clientID": sample["clientID"],
+            "trackedDayDate": sample["trackedDayDate"],
+            "trackedDayCalorieTarget": sample["trackedDayCalorieTarget"],
+            "trackedDayNote": sample["trackedDayNote"],
+        },
+    )
+    # Finding the new IDs isn't part of any route, so it isn't timed
+    with db.pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT foodEntryID FROM FoodEntries WHERE trackedDayID = %s AND foodEntryNote = %s;",
+            (sample["trackedDayID"], marker),
+        )
+        food_entry_ids = [row["foodEntryID"] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT exerciseEntryID FROM ExerciseEntries WHERE trackedDayID = %s AND exerciseEntryNote = %s;",
+            (sample["trackedDayID"], marker),
+        )
+        exercise_entry_ids = [row["exerciseEntryID"] for row in cursor.fetchall()]
+    for food_entry_id in food_entry_ids:
+        timed(
+            transport, timings("updatefoodentry"), "POST", f"/updatefoodentry/{food_entry_id}",
+            {"gramWeight": "200", "calories": "", "note": marker},
+        )
+        timed(transport, timings("deletefoodentry"), "POST", f"/deletefoodentry/{food_entry_id}")
+    for exercise_entry_id in exercise_entry_ids:
+        timed(
+            transport, timings("updateexerciseentry"), "POST", f"/updateexerciseentry/{exercise_entry_id}",
+            {
+                "exerciseEntryName": "Running",
+                "exerciseEntryType": "Cardio",
+                "exerciseEntryCalories": "350",
+                "exerciseEntryNote": marker,
+            },
+        )
+        timed(transport, timings("deleteexerciseentry"), "POST", f"/deleteexerciseentry/{exercise_entry_id}")
+
+
+# Runs each route one request at a time through the test client
+def run_client(sample, routes, iterations, writes):
+    transport = TestClientTransport()
+    results = {}
+    for name, path in routes:
+        for _ in range(WARMUP_REQUESTS):
+            transport.request("GET", path)
+        timings = results[name] = RouteTimings()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            timed(transport, timings, "GET", path)
+        timings.seconds = time.perf_counter() - started
+        print(f"{name:28} {timings.summary()['p50Ms']} ms p50")
+    if writes:
+        started = time.perf_counter()
+        for number in range(iterations):
+            write_cycle(transport, results, sample, f"{WRITE_MARKER}-{os.getpid()}-{number}")
+        elapsed = time.perf_counter() - started
+        for name, timings in results.items():
+            if not timings.seconds:
+                timings.seconds = elapsed
+    return results
+
+
+# Runs each route for duration seconds from concurrency threads, each with its own connection to the server
+def run_http(sample, routes, url, concurrency, duration, writes):
+    results = {}
+
+    def hammer(work):
+        deadline = time.perf_counter() + duration
+        threads = []
+        for worker in range(concurrency):
+
+            def loop(worker=worker):
+                transport = HTTPTransport(url)
+                number = 0
+                while time.perf_counter() < deadline:
+                    work(transport, worker, number)
+                    number += 1
+                transport.close()
+
+            threads.append(threading.Thread(target=loop))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    for name, path in routes:
+        warmup = HTTPTransport(url)
+        for _ in range(WARMUP_REQUESTS):
+            warmup.request("GET", path)
+        warmup.close()
+        timings = results[name] = RouteTimings()
+        timings.seconds = hammer(lambda transport, worker, number: timed(transport, timings, "GET", path))
+        summary = timings.summary()
+        print(f"{name:28} {summary['throughputRps']} req/s, {summary['p95Ms']} ms p95")
+    if writes:
+        write_results = {}
+        elapsed = hammer(
+            lambda transport, worker, number: write_cycle(
+                transport, write_results, sample, f"{WRITE_MARKER}-{os.getpid()}-{worker}-{number}"
+            )
+        )
+        for timings in write_results.values():
+            timings.seconds = elapsed
+        results.update(write_results)
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=ROOT, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        )
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def save_results(results, meta, output=None):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(
+        RESULTS_DIR,
+        "{}-{}{}-{}.json".format(
+            time.strftime("%Y%m%d-%H%M%S"), meta["commit"], "-dirty" if meta["dirty"] else "", meta["mode"]
+        ),
+    )
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(
+            {"meta": meta, "routes": {name: timings.summary() for name, timings in results.items()}},
+            file,
+            indent=2,
+        )
+    return output
+
+
+# Prints how each route changed between two result files. Returns the routes whose p95 got worse by more
+# than fail_over percent
+def compare(old_path, new_path, fail_over=None):
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'route':28} {'p95 ms':>20} {'change':>8} {'req/s':>18} {'queries':>12}")
+    regressions = []
+    for name, after in new["routes"].items():
+        before = old["routes"].get(name)
+        if not before or not before.get("p95Ms") or after.get("p95Ms") is None:
+            print(f"{name:28} {'(new)':>20}")
+            continue
+        change = (after["p95Ms"] - before["p95Ms"]) / before["p95Ms"] * 100
+        if fail_over is not None and change > fail_over:
+            regressions.append(name)
+        print(
+            f"{name:28} {before['p95Ms']:>9} -> {after['p95Ms']:<8} {change:>+7.1f}% "
+            f"{before['throughputRps']!s:>8} -> {after['throughputRps']!s:<7} "
+            f"{before['queriesPerRequest']!s:>5} -> {after['queriesPerRequest']!s}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the KiloJulia routes.")
+    parser.add_argument("--mode", choices=("client", "http"), default="client")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to load in http mode.")
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per route in client mode.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections in http mode.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per route in http mode.")
+    parser.add_argument("--writes", action="store_true", help="Also time the entry add/update/delete routes.")
+    parser.add_argument("--only", help="Only time the read routes whose name contains this text, e.g. api.")
+    parser.add_argument("--output", help="Where to save the results (default benchmarks/results).")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files.")
+    parser.add_argument("--fail-over", type=float, help="With --compare, fail if a p95 rose by more than this %%.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        regressions = compare(*args.compare, fail_over=args.fail_over)
+        if regressions:
+            raise SystemExit(f"p95 regressions over {args.fail_over}%: {', '.join(regressions)}")
+        return
+
+    sample = load_sample()
+    routes = [(name, path) for name, path in read_routes(sample) if not args.only or args.only in name]
+    commit, dirty = git_commit()
+    meta = {
+        "commit": commit,
+        "dirty": dirty,
+        "mode": args.mode,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "writes": args.writes,
+        "only": args.only,
+        "tables": sample.pop("tables"),
+    }
+    if args.mode == "client":
+        meta["iterations"] = args.iterations
+        results = run_client(sample, routes, args.iterations, args.writes)
+    else:
+        meta.update(url=args.url, concurrency=args.concurrency, duration=args.duration)
+        results = run_http(sample, routes, args.url, args.concurrency, args.duration, args.writes)
+    print(f"Saved {save_results(results, meta, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Fills the database from database/DDL.sql with synthetic staff, clients, foods, tracked days and entries
+# for benchmarking. The same --seed always gives the same data.
+#
+#   python -m benchmarks.seed --scale readme --truncate
+#   python -m benchmarks.seed --clients 2000 --foods 20000 --entries 1000000
+#
+# Uses the database settings from the .env file, the same as the app.
+
+import argparse
+import datetime
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.db_connector as db
+
+# Preset sizes. "readme" is the scale the README says the clinic runs at
+SCALES = {
+    "small": {"clients": 100, "foods": 2000, "entries": 20000},
+    "readme": {"clients": 100, "foods": 20000, "entries": 200000},
+    "large": {"clients": 2000, "foods": 20000, "entries": 1000000},
+    "huge": {"clients": 10000, "foods": 20000, "entries": 5000000},
+}
+
+# Rows sent per multi-row INSERT
+CHUNK_SIZE = 5000
+# Clients per staff member, and how many staff each client is assigned to
+CLIENTS_PER_STAFF = 20
+STAFF_PER_CLIENT = (1, 3)
+# Food and exercise entries per tracked day
+FOOD_ENTRIES_PER_DAY = (3, 7)
+EXERCISE_ENTRIES_PER_DAY = (0, 2)
+
+FIRST_NAMES = (
+    "Amira", "Ben", "Carla", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jamal", "Kara", "Luis",
+    "Maya", "Noor", "Omar", "Priya", "Quinn", "Rosa", "Sami", "Tara", "Uma", "Victor", "Wen", "Yusuf", "Zoe",
+)
+LAST_NAMES = (
+    "Adams", "Baker", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jensen", "Khan",
+    "Lopez", "Murphy", "Nguyen", "Okafor", "Patel", "Quinn", "Rossi", "Smith", "Tanaka", "Usman", "Vega",
+)
+FOOD_WORDS = (
+    "Apple", "Banana", "Rice", "Oats", "Chicken", "Salmon", "Tofu", "Lentils", "Spinach", "Yogurt", "Bread",
+    "Almonds", "Cheese", "Pasta", "Beef", "Egg", "Potato", "Broccoli", "Mango", "Quinoa", "Soup", "Olive Oil",
+)
+FOOD_STYLES = ("Raw", "Boiled", "Grilled", "Baked", "Fried", "Steamed", "Roasted", "Dried", "Canned", "Fresh")
+FOOD_TYPES = (
+    "Fruits", "Vegetables", "Seafood", "Dairy", "Mushrooms", "Grains", "Meat", "Spices", "Nuts", "Greens",
+    "Sweets", "Oils and Sauces", "Beverages", "Alcohol", "Soups", "Baked Products", "Fast Foods",
+    "Meals and Recipes", "Other",
+)
+EXERCISES = (
+    ("Running", "Cardio"), ("Cycling", "Cardio"), ("Swimming", "Cardio"), ("Weightlifting", "Strength"),
+    ("Push Ups", "Strength"), ("Yoga", "Stretching"), ("Pilates", "Balance"), ("Climbing", "Other"),
+)
+ACTIVITY_LEVELS = ("Sedentary", "Light", "Moderate", "High", "Athlete")
+
+# Tables in the order they are emptied by --truncate (children first)
+TABLES = ("FoodEntries", "ExerciseEntries", "TrackedDays", "StaffClients", "Foods", "Clients", "Staff")
+
+
+# Sends rows to the database in multi-row INSERTs of CHUNK_SIZE rows
+class ChunkedInserter:
+    def __init__(self, connection, table, columns):
+        self.connection = connection
+        self.query = "INSERT INTO {} ({}) VALUES ({});".format(
+            table, ", ".join(columns), ", ".join(["%s"] * len(columns))
+        )
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.connection.cursor().executemany(self.query, self.rows)
+            self.connection.commit()
+            self.count += len(self.rows)
+            self.rows = []
+
+
+def next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 AS nextID FROM {table};")
+    return cursor.fetchone()["nextID"]
+
+
+def seed(connection, clients, foods, entries, seed=1, end_date=None, log=print):
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    cursor = connection.cursor()
+    # The generated rows are consistent, so skip the per-row checks to load faster
+    cursor.execute("SET foreign_key_checks = 0, unique_checks = 0;")
+
+    staff_count = max(1, math.ceil(clients / CLIENTS_PER_STAFF))
+    first_staff = next_id(cursor, "Staff", "staffID")
+    first_client = next_id(cursor, "Clients", "clientID")
+    first_food = next_id(cursor, "Foods", "foodID")
+    day_id = next_id(cursor, "TrackedDays", "trackedDayID")
+    food_entry_id = next_id(cursor, "FoodEntries", "foodEntryID")
+    exercise_entry_id = next_id(cursor, "ExerciseEntries", "exerciseEntryID")
+
+    log(f"Seeding {staff_count} staff, {clients} clients and {foods} foods")
+    staff_rows = ChunkedInserter(
+        connection, "Staff", ("staffID", "staffName", "staffEmail", "staffCapacity", "staffNote")
+    )
+    for staff_id in range(first_staff, first_staff + staff_count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {staff_id}"
+        staff_rows.add((staff_id, name, f"staff{staff_id}@bench.example", "Available", None))
+    staff_rows.flush()
+
+    client_rows = ChunkedInserter(
+        connection,
+        "Clients",
+        (
+            "clientID", "clientName", "clientEmail", "clientSex", "clientAge", "clientHeight", "clientWeight",
+            "clientActivityLevel", "clientCalorieTarget", "clientNote",
+        ),
+    )
+    assignments = ChunkedInserter(connection, "StaffClients", ("staffID", "clientID"))
+    targets = {}
+    for client_id in range(first_client, first_client + clients):
+        target = rng.randrange(1500, 3200, 50)
+        targets[client_id] = target
+        client_rows.add(
+            (
+                client_id,
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {client_id}",
+                f"client{client_id}@bench.example",
+                rng.choice(("Male", "Female")),
+                rng.randint(18, 80),
+                round(rng.uniform(150, 200), 1),
+                round(rng.uniform(50, 130), 1),
+                rng.choice(ACTIVITY_LEVELS),
+                target,
+                None,
+            )
+        )
+        staff_ids = rng.sample(
+            range(first_staff, first_staff + staff_count), min(staff_count, rng.randint(*STAFF_PER_CLIENT))
+        )
+        for staff_id in staff_ids:
+            assignments.add((staff_id, client_id))
+    client_rows.flush()
+    assignments.flush()
+
+    food_rows = ChunkedInserter(
+        connection, "Foods", ("foodID", "foodName", "foodType", "foodCaloriesPerGram", "foodNote")
+    )
+    calories_per_gram = {}
+    for food_id in range(first_food, first_food + foods):
+        calories_per_gram[food_id] = round(rng.uniform(0.1, 9.0), 2)
+        food_rows.add(
+            (
+                food_id,
+                f"{rng.choice(FOOD_STYLES)} {rng.choice(FOOD_WORDS)} {food_id}",
+                rng.choice(FOOD_TYPES),
+                calories_per_gram[food_id],
+                None,
+            )
+        )
+    food_rows.flush()
+
+    # Spread the entries evenly over the clients, as consecutive days ending on end_date
+    average_per_day = sum(FOOD_ENTRIES_PER_DAY) / 2 + sum(EXERCISE_ENTRIES_PER_DAY) / 2
+    days_per_client = max(1, math.ceil(entries / clients / average_per_day))
+    log(f"Seeding about {entries} entries over {days_per_client} days per client")
+    day_rows = ChunkedInserter(
+        connection,
+        "TrackedDays",
+        (
+            "trackedDayID", "clientID", "trackedDayDate", "trackedDayCalorieTarget", "trackedDayNote",
+            "trackedDayFoodCalories", "trackedDayExerciseCalories", "trackedDayFoodEntryCount",
+            "trackedDayExerciseEntryCount",
+        ),
+    )
+    food_entries = ChunkedInserter(
+        connection,
+        "FoodEntries",
+        (
+            "foodEntryID", "trackedDayID", "foodID", "foodEntryCalories", "foodEntryGramWeight",
+            "foodEntryNote", "foodEntryCaloriesDerived",
+        ),
+    )
+    exercise_entries = ChunkedInserter(
+        connection,
+        "ExerciseEntries",
+        (
+            "exerciseEntryID", "trackedDayID", "exerciseEntryName", "exerciseEntryType",
+            "exerciseEntryCalories", "exerciseEntryNote",
+        ),
+    )
+    started = time.monotonic()
+    made = 0
+    next_log = 100000
+    for client_id in range(first_client, first_client + clients):
+        for offset in range(days_per_client, 0, -1):
+            if made >= entries:
+                break
+            food_calories = exercise_calories = 0
+            food_count = rng.randint(*FOOD_ENTRIES_PER_DAY)
+            exercise_count = rng.randint(*EXERCISE_ENTRIES_PER_DAY)
+            for _ in range(food_count):
+                food_id = rng.randrange(first_food, first_food + foods)
+                grams = rng.randint(20, 400)
+                calories = round(calories_per_gram[food_id] * grams)
+                food_calories += calories
+                food_entries.add((food_entry_id, day_id, food_id, calories, grams, None, 1))
+                food_entry_id += 1
+            for _ in range(exercise_count):
+                name, kind = rng.choice(EXERCISES)
+                calories = rng.randrange(50, 800, 10)
+                exercise_calories += calories
+                exercise_entries.add((exercise_entry_id, day_id, name, kind, calories, None))
+                exercise_entry_id += 1
+            day_rows.add(
+                (
+                    day_id,
+                    client_id,
+                    end_date - datetime.timedelta(days=offset - 1),
+                    targets[client_id],
+                    None,
+                    food_calories,
+                    exercise_calories,
+                    food_count,
+                    exercise_count,
+                )
+            )
+            day_id += 1
+            made += food_count + exercise_count
+        if made >= next_log:
+            log(f"  {made} entries ({made / (time.monotonic() - started):.0f}/s)")
+            next_log += 100000
+    for inserter in (day_rows, food_entries, exercise_entries):
+        inserter.flush()
+    cursor.execute("SET foreign_key_checks = 1, unique_checks = 1;")
+    summary = {
+        "staff": staff_count,
+        "clients": clients,
+        "foods": foods,
+        "trackedDays": day_rows.count,
+        "foodEntries": food_entries.count,
+        "exerciseEntries": exercise_entries.count,
+    }
+    log(f"Seeded {summary}")
+    return summary
+
+
+# Empties every app table, keeping the schema and SchemaMigrations
+def truncate(connection):
+    cursor = connection.cursor()
+    cursor.execute("SET foreign_key_checks = 0;")
+    for table in TABLES:
+        cursor.execute(f"TRUNCATE TABLE {table};")
+    cursor.execute("SET foreign_key_checks = 1;")
+    connection.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the KiloJulia database with synthetic data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--clients", type=int, help="Overrides the scale's client count.")
+    parser.add_argument("--foods", type=int, help="Overrides the scale's food count.")
+    parser.add_argument("--entries", type=int, help="Overrides the scale's food + exercise entry count.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable data.")
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat, help="Last tracked day (default today).")
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables first.")
+    args = parser.parse_args(argv)
+    sizes = dict(SCALES[args.scale])
+    for name in sizes:
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+    with db.pool.connection() as connection:
+        if args.truncate:
+            truncate(connection)
+        seed(connection, seed=args.seed, end_date=args.end_date, **sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Compares gunicorn's default settings (one synchronous worker, no preload or warmup) with the settings in
+# gunicorn.conf.py. Starts each server in turn, loads it with benchmarks/run.py in http mode, then prints the
+# change in throughput and latency per route:
+#
+#   python -m benchmarks.serving --concurrency 32 --duration 10
+#   KILOJULIA_WORKERS=8 python -m benchmarks.serving --only api
+#
+# Run it against a seeded database (benchmarks/seed.py) on the machine the app will run on, since the
+# number of workers follows the number of CPU cores.
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import run
+
+# Seconds to wait for a server to answer before giving up
+STARTUP_TIMEOUT = 60
+
+
+# Starts gunicorn with a config file and waits until it answers requests
+def start_server(config, port):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", config, "--bind", f"127.0.0.1:{port}", "wsgi:app"],
+        cwd=ROOT,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.5)
+    stop_server(server)
+    raise SystemExit(f"gunicorn did not answer within {STARTUP_TIMEOUT} seconds")
+
+
+# SIGTERM lets the workers finish their requests before they exit
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare gunicorn's defaults with gunicorn.conf.py.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent connections.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per route.")
+    parser.add_argument("--only", help="Only time the read routes whose name contains this text, e.g. api.")
+    args = parser.parse_args(argv)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    outputs = {}
+    with tempfile.TemporaryDirectory() as folder:
+        # An empty config file stops gunicorn from reading gunicorn.conf.py, so it runs on its defaults
+        defaults = os.path.join(folder, "defaults.conf.py")
+        open(defaults, "w").close()
+        for name, config in (("defaults", defaults), ("tuned", os.path.join(ROOT, "gunicorn.conf.py"))):
+            print(f"Serving with {name} settings")
+            outputs[name] = os.path.join(run.RESULTS_DIR, f"serving-{stamp}-{name}.json")
+            run_args = ["--mode", "http", "--url", f"http://127.0.0.1:{args.port}", "--output", outputs[name]]
+            run_args += ["--concurrency", str(args.concurrency), "--duration", str(args.duration)]
+            if args.only:
+                run_args += ["--only", args.only]
+            server = start_server(config, args.port)
+            try:
+                run.main(run_args)
+            finally:
+                stop_server(server)
+    run.compare(outputs["defaults"], outputs["tuned"])
+
+
+if __name__ == "__main__":
+    main()
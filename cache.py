@@ -0,0 +1,298 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# redis is optional and only needed for the "redis://" page cache backend
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+# A small thread-safe in-memory cache. It holds at most maxsize entries, dropping the least recently
+# used one when full, and entries expire ttl seconds after they were stored.
+# Keys are tuples whose first item is a namespace (e.g. ("client", "Muhammad Ali")) so that all the
+# entries of one kind can be invalidated together.
+class LRUCache:
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # Returns the cached value, or default if the key is missing or expired
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # Stores the value only if the key isn't already there. Returns whether it was stored
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= time.monotonic():
+                return False
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # Deletes the key only if it still holds value, e.g. a lock that may have passed to someone else.
+    # Returns whether it was deleted
+    def deleteIf(self, key, value):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != value:
+                return False
+            del self._entries[key]
+            return True
+
+    # Drop every entry in the given namespaces, or everything if no namespace is given
+    def invalidate(self, *namespaces):
+        with self._lock:
+            if not namespaces:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] in namespaces]:
+                    del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "maxSize": self.maxsize,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Turns a cache key into a file or Redis key. The namespace is kept readable so the entries of one kind are easy to find
+def _keyName(key):
+    return str(key[0]), hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+# A cache kept as files in a directory, shared by every worker process on the machine and kept across
+# restarts. Values must be bytes. Each namespace is a subdirectory. Entries are only ever replaced or left to
+# expire, never deleted in bulk, so concurrent writers can't lose a directory out from under them
+class FileCache:
+    # Expired files are only noticed when read, so every this many writes the whole directory is swept
+    sweepEvery = 500
+
+    def __init__(self, directory, ttl=60):
+        self.directory = directory
+        self.ttl = ttl
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        namespace, name = _keyName(key)
+        return os.path.join(self.directory, namespace, name)
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            # The file's modified time is set to when it expires
+            if os.path.getmtime(path) < time.time():
+                os.remove(path)
+                raise FileNotFoundError
+            with open(path, "rb") as file:
+                value = file.read()
+        except OSError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename it so readers never see half a value
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, "wb") as file:
+            file.write(value)
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        os.utime(temporary, (expires, expires))
+        os.replace(temporary, path)
+        self._writes += 1
+        if self._writes % self.sweepEvery == 0:
+            self.sweep()
+
+    # Stores the value only if the key isn't already there (or has expired). Returns whether it was stored.
+    # The value is written to a temporary file and hard linked into place, which fails if the file exists,
+    # so this is safe between processes
+    def add(self, key, value, ttl=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(value)
+            expires = time.time() + (self.ttl if ttl is None else ttl)
+            os.utime(temporary, (expires, expires))
+            for _ in range(2):
+                try:
+                    os.link(temporary, path)
+                    return True
+                except FileExistsError:
+                    try:
+                        if os.path.getmtime(path) >= time.time():
+                            return False
+                        os.remove(path)
+                    except OSError:
+                        pass
+            return False
+        finally:
+            os.remove(temporary)
+
+    # Delete every expired file
+    def sweep(self):
+        now = time.time()
+        for folder, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    if os.path.getmtime(path) < now:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    # Deletes the key only if it still holds value. Returns whether it was deleted
+    def deleteIf(self, key, value):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                if file.read() != value:
+                    return False
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "file",
+            "directory": self.directory,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# A cache in Redis (or anything that speaks its protocol), shared by every process and machine using it.
+# Values must be bytes. Redis expires entries itself and evicts by its own maxmemory policy
+class RedisCache:
+    def __init__(self, url, ttl=60, prefix="kilojulia"):
+        if redis is None:
+            raise RuntimeError("The redis package is needed for a redis:// cache. Run pip install redis.")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _name(self, key):
+        namespace, name = _keyName(key)
+        return f"{self.prefix}:{namespace}:{name}"
+
+    def get(self, key, default=None):
+        value = self.client.get(self._name(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._name(key), value, ex=max(1, int(self.ttl if ttl is None else ttl)))
+
+    # Stores the value only if the key isn't already there. Returns whether it was stored
+    def add(self, key, value, ttl=None):
+        return bool(
+            self.client.set(self._name(key), value, nx=True, ex=max(1, int(self.ttl if ttl is None else ttl)))
+        )
+
+    def delete(self, key):
+        self.client.delete(self._name(key))
+
+    # Deletes the key only if it still holds value, checked and deleted in one step on the server.
+    # Returns whether it was deleted
+    def deleteIf(self, key, value):
+        script = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+        return bool(self.client.eval(script, 1, self._name(key), value))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Makes a cache from a URL: "memory://" (an LRUCache in this process), "file:///path/to/dir" or
+# "redis://host:6379/0". Returns None for "none" or an empty URL
+def makeCache(url, ttl=60, maxsize=1000):
+    if not url or url == "none":
+        return None
+    if url.startswith("memory://"):
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    if url.startswith("file://"):
+        return FileCache(url[len("file://"):], ttl=ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url, ttl=ttl)
+    raise ValueError(f"Unknown cache URL: {url}")
@@ -0,0 +1,75 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# Lets any number of waiting requests (long-polls and event streams) find out when the change log has grown.
+# One background thread per process reads the latest change ID every pollInterval seconds and wakes the
+# waiters, so a hundred open dashboards cost one tiny query a second instead of a hundred.
+# Writes in this process call notify() after committing, so their own changes are seen straight away.
+# Each waiting request still holds a server thread, so at most maxWaiters of them (None for no limit) may
+# wait at once; see claim()
+class ChangeFeed:
+    def __init__(self, fetchLatestID, pollInterval=1.0, maxWaiters=None):
+        # Function returning the highest changeID in the change log
+        self.fetchLatestID = fetchLatestID
+        self.pollInterval = pollInterval
+        self.maxWaiters = maxWaiters
+        self._waiters = threading.BoundedSemaphore(maxWaiters) if maxWaiters else None
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._latestID = None
+        self._thread = None
+        self._pid = None
+
+    # The watcher starts with the first waiter. Threads don't survive a fork, so each worker starts its own
+    def _start(self):
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._watch, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        while True:
+            try:
+                latestID = self.fetchLatestID()
+            except Exception:
+                logger.exception("Could not read the latest change ID")
+                latestID = None
+            if latestID is not None:
+                with self._condition:
+                    if latestID != self._latestID:
+                        self._latestID = latestID
+                        self._condition.notify_all()
+            self._wake.wait(self.pollInterval)
+            self._wake.clear()
+
+    # Ask the watcher to look now instead of at its next poll, e.g. right after this process logged a change
+    def notify(self):
+        self._wake.set()
+
+    # Claims a place for a request that wants to wait. Returns False when every place is taken, in which case
+    # the request should answer straight away instead. Every True must be paired with a release()
+    def claim(self):
+        return self._waiters is None or self._waiters.acquire(blocking=False)
+
+    def release(self):
+        if self._waiters is not None:
+            self._waiters.release()
+
+    # Waits until there is a change after afterID or the timeout passes. Returns the latest change ID seen,
+    # or None if the change log couldn't be read yet
+    def wait(self, afterID, timeout):
+        with self._condition:
+            self._start()
+            self._condition.wait_for(lambda: self._latestID is not None and self._latestID > afterID, timeout)
+            return self._latestID
@@ -31,8 +31,8 @@ CREATE TABLE IF NOT EXISTS `Staff` (
   `staffCapacity` ENUM('Available', 'Not Available') NOT NULL DEFAULT 'Available',
   `staffNote` VARCHAR(255) NULL DEFAULT NULL,
   PRIMARY KEY (`staffID`),
-  UNIQUE INDEX `staffID_UNIQUE` (`staffID` ASC) VISIBLE,
-  UNIQUE INDEX `staffEmail_UNIQUE` (`staffEmail` ASC) VISIBLE);
+  UNIQUE INDEX `staffEmail_UNIQUE` (`staffEmail` ASC) VISIBLE,
+  INDEX `idx_staff_name` (`staffName` ASC) VISIBLE);
 
 -- Create Table `Clients`
 DROP TABLE IF EXISTS `Clients` ;
@@ -46,10 +46,12 @@ CREATE TABLE IF NOT EXISTS `Clients` (
   `clientWeight` DECIMAL(5,1) UNSIGNED NOT NULL,
   `clientActivityLevel` ENUM('Sedentary', 'Light', 'Moderate', 'High', 'Athlete') NOT NULL,
   `clientCalorieTarget` INT UNSIGNED NOT NULL DEFAULT 0,
+  `clientBMR` INT UNSIGNED NOT NULL DEFAULT 0,
+  `clientTDEE` INT UNSIGNED NOT NULL DEFAULT 0,
   `clientNote` VARCHAR(255) NULL DEFAULT NULL,
   PRIMARY KEY (`clientID`),
-  UNIQUE INDEX `personID_UNIQUE` (`clientID` ASC) VISIBLE,
-  UNIQUE INDEX `clientEmail_UNIQUE` (`clientEmail` ASC) VISIBLE);
+  UNIQUE INDEX `clientEmail_UNIQUE` (`clientEmail` ASC) VISIBLE,
+  INDEX `idx_client_name` (`clientName` ASC) VISIBLE);
 
 -- Create Table `StaffClients`
 DROP TABLE IF EXISTS `StaffClients` ;
@@ -58,7 +60,6 @@ CREATE TABLE IF NOT EXISTS `StaffClients` (
   `clientID` INT NOT NULL,
   PRIMARY KEY (`staffID`, `clientID`),
   INDEX `fk_Staff_has_Clients_Clients1_idx` (`clientID` ASC) VISIBLE,
-  INDEX `fk_Staff_has_Clients_Staff1_idx` (`staffID` ASC) VISIBLE,
   CONSTRAINT `fk_Staff_has_Clients_Staff1`
     FOREIGN KEY (`staffID`)
     REFERENCES `Staff` (`staffID`)
@@ -78,9 +79,15 @@ CREATE TABLE IF NOT EXISTS `TrackedDays` (
   `trackedDayDate` DATE NOT NULL DEFAULT CURRENT_DATE,
   `trackedDayCalorieTarget` INT NOT NULL DEFAULT 0,
   `trackedDayNote` VARCHAR(255) NULL DEFAULT NULL,
+  -- Running totals of the day's entries, kept up to date by the app on every entry insert/update/delete
+  `trackedDayFoodCalories` INT NOT NULL DEFAULT 0,
+  `trackedDayExerciseCalories` INT NOT NULL DEFAULT 0,
+  `trackedDayFoodEntryCount` INT NOT NULL DEFAULT 0,
+  `trackedDayExerciseEntryCount` INT NOT NULL DEFAULT 0,
   PRIMARY KEY (`trackedDayID`),
-  UNIQUE INDEX `dayID_UNIQUE` (`trackedDayID` ASC) VISIBLE,
-  INDEX `fk_TrackedDays_Clients1_idx` (`clientID` ASC) VISIBLE,
+  -- One tracked day per client per date. Also serves the foreign key, since it starts with clientID
+  UNIQUE INDEX `uc_day_client_date` (`clientID` ASC, `trackedDayDate` ASC) VISIBLE,
+  INDEX `idx_day_date` (`trackedDayDate` ASC) VISIBLE,
   CONSTRAINT `fk_TrackedDays_Clients1`
     FOREIGN KEY (`clientID`)
     REFERENCES `Clients` (`clientID`)
@@ -98,8 +105,7 @@ CREATE TABLE IF NOT EXISTS `Foods` (
   `foodCaloriesPerGram` DECIMAL(5,2) UNSIGNED NOT NULL,
   `foodNote` VARCHAR(255) NULL DEFAULT NULL,
   PRIMARY KEY (`foodID`),
-  UNIQUE INDEX `uc_food_name` (`foodName` ASC) VISIBLE,
-  UNIQUE INDEX `foodID_UNIQUE` (`foodID` ASC) VISIBLE);
+  UNIQUE INDEX `uc_food_name` (`foodName` ASC) VISIBLE);
 
 -- Create Table `FoodEntries`
 DROP TABLE IF EXISTS `FoodEntries` ;
@@ -110,9 +116,11 @@ CREATE TABLE IF NOT EXISTS `FoodEntries` (
   `foodEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
   `foodEntryGramWeight` INT UNSIGNED NOT NULL DEFAULT 0,
   `foodEntryNote` VARCHAR(255) NULL DEFAULT NULL,
+  -- 1 when the calories were worked out from the food's calories per gram and should follow changes to it
+  `foodEntryCaloriesDerived` TINYINT(1) NOT NULL DEFAULT 0,
   PRIMARY KEY (`foodEntryID`),
   INDEX `idx_entry_day` (`trackedDayID` ASC) VISIBLE,
-  UNIQUE INDEX `entryID_UNIQUE` (`foodEntryID` ASC) VISIBLE,
+  INDEX `idx_entry_food` (`foodID` ASC, `foodEntryCaloriesDerived` ASC) VISIBLE,
   CONSTRAINT `fk_entry_day`
     FOREIGN KEY (`trackedDayID`)
     REFERENCES `TrackedDays` (`trackedDayID`)
@@ -135,7 +143,6 @@ CREATE TABLE IF NOT EXISTS `ExerciseEntries` (
   `exerciseEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
   `exerciseEntryNote` VARCHAR(255) NULL DEFAULT NULL,
   PRIMARY KEY (`exerciseEntryID`),
-  UNIQUE INDEX `exerciseID_UNIQUE` (`exerciseEntryID` ASC) VISIBLE,
   INDEX `fk_Exercises_Days1_idx` (`trackedDayID` ASC) VISIBLE,
   CONSTRAINT `fk_Exercises_Days1`
     FOREIGN KEY (`trackedDayID`)
@@ -143,6 +150,143 @@ CREATE TABLE IF NOT EXISTS `ExerciseEntries` (
     ON DELETE CASCADE
     ON UPDATE CASCADE);
 
+-- Create Table `FoodEntriesArchive`, food entries of closed periods moved out of the live table (compressed)
+DROP TABLE IF EXISTS `FoodEntriesArchive` ;
+CREATE TABLE IF NOT EXISTS `FoodEntriesArchive` (
+  `foodEntryID` INT NOT NULL,
+  `trackedDayID` INT NOT NULL,
+  `foodID` INT,
+  `foodEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
+  `foodEntryGramWeight` INT UNSIGNED NOT NULL DEFAULT 0,
+  `foodEntryNote` VARCHAR(255) NULL DEFAULT NULL,
+  `foodEntryCaloriesDerived` TINYINT(1) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`foodEntryID`),
+  INDEX `idx_archive_entry_day` (`trackedDayID` ASC) VISIBLE,
+  INDEX `idx_archive_entry_food` (`foodID` ASC) VISIBLE,
+  CONSTRAINT `fk_archive_entry_day`
+    FOREIGN KEY (`trackedDayID`)
+    REFERENCES `TrackedDays` (`trackedDayID`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE,
+  CONSTRAINT `fk_archive_entry_food`
+    FOREIGN KEY (`foodID`)
+    REFERENCES `Foods` (`foodID`)
+    ON DELETE SET NULL
+    ON UPDATE CASCADE)
+  ROW_FORMAT = COMPRESSED;
+
+-- Create Table `ExerciseEntriesArchive`
+DROP TABLE IF EXISTS `ExerciseEntriesArchive` ;
+CREATE TABLE IF NOT EXISTS `ExerciseEntriesArchive` (
+  `exerciseEntryID` INT NOT NULL,
+  `trackedDayID` INT NOT NULL,
+  `exerciseEntryName` VARCHAR(255) NOT NULL,
+  `exerciseEntryType` ENUM('Cardio', 'Strength', 'Stretching', 'Balance', 'Other') NOT NULL,
+  `exerciseEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
+  `exerciseEntryNote` VARCHAR(255) NULL DEFAULT NULL,
+  PRIMARY KEY (`exerciseEntryID`),
+  INDEX `idx_archive_exercise_day` (`trackedDayID` ASC) VISIBLE,
+  CONSTRAINT `fk_archive_exercise_day`
+    FOREIGN KEY (`trackedDayID`)
+    REFERENCES `TrackedDays` (`trackedDayID`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE)
+  ROW_FORMAT = COMPRESSED;
+
+-- Create Table `ArchivedPeriods`. One row per archive run: entries on tracked days up to and including archivedThrough are in the archive tables
+DROP TABLE IF EXISTS `ArchivedPeriods` ;
+CREATE TABLE IF NOT EXISTS `ArchivedPeriods` (
+  `archivedThrough` DATE NOT NULL,
+  `archivedAt` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `archivedFoodEntries` INT UNSIGNED NOT NULL DEFAULT 0,
+  `archivedExerciseEntries` INT UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`archivedThrough`));
+
+-- Create Table `TableVersions`, a change counter per table that the app bumps on every write
+DROP TABLE IF EXISTS `TableVersions` ;
+CREATE TABLE IF NOT EXISTS `TableVersions` (
+  `tableName` VARCHAR(64) NOT NULL,
+  `tableVersion` BIGINT UNSIGNED NOT NULL DEFAULT 1,
+  `tableModifiedAt` DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (`tableName`));
+
+INSERT INTO TableVersions (tableName, tableModifiedAt) VALUES
+('Staff', UTC_TIMESTAMP(6)), ('Clients', UTC_TIMESTAMP(6)), ('StaffClients', UTC_TIMESTAMP(6)),
+('TrackedDays', UTC_TIMESTAMP(6)), ('Foods', UTC_TIMESTAMP(6)), ('FoodEntries', UTC_TIMESTAMP(6)),
+('ExerciseEntries', UTC_TIMESTAMP(6)), ('ChangeLog', UTC_TIMESTAMP(6));
+
+-- Create Table `ChangeLog`, an append-only log of entry, tracked day and assignment changes for live pages
+DROP TABLE IF EXISTS `ChangeLog` ;
+CREATE TABLE IF NOT EXISTS `ChangeLog` (
+  `changeID` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `changeTable` VARCHAR(64) NOT NULL,
+  `changeOperation` ENUM('insert', 'update', 'delete') NOT NULL,
+  `changeRowID` INT NULL DEFAULT NULL,
+  `trackedDayID` INT NULL DEFAULT NULL,
+  `clientID` INT NULL DEFAULT NULL,
+  `staffID` INT NULL DEFAULT NULL,
+  `changedAt` DATETIME(6) NOT NULL,
+  PRIMARY KEY (`changeID`),
+  INDEX `idx_change_client` (`clientID` ASC, `changeID` ASC) VISIBLE,
+  INDEX `idx_change_time` (`changedAt` ASC) VISIBLE);
+
+-- Create Table `PendingChanges`, changes logged by transactions that haven't committed yet, moved into
+-- `ChangeLog` just before each commit so change IDs follow commit order
+DROP TABLE IF EXISTS `PendingChanges` ;
+CREATE TABLE IF NOT EXISTS `PendingChanges` (
+  `pendingID` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `connectionID` BIGINT UNSIGNED NOT NULL,
+  `changeTable` VARCHAR(64) NOT NULL,
+  `changeOperation` ENUM('insert', 'update', 'delete') NOT NULL,
+  `changeRowID` INT NULL DEFAULT NULL,
+  `trackedDayID` INT NULL DEFAULT NULL,
+  `clientID` INT NULL DEFAULT NULL,
+  `staffID` INT NULL DEFAULT NULL,
+  `changedAt` DATETIME(6) NOT NULL,
+  PRIMARY KEY (`pendingID`),
+  INDEX `idx_pending_connection` (`connectionID` ASC, `pendingID` ASC) VISIBLE);
+
+-- Create Table `Jobs`, background jobs queued by the app and run by the "flask run-jobs" workers
+DROP TABLE IF EXISTS `Jobs` ;
+CREATE TABLE IF NOT EXISTS `Jobs` (
+  `jobID` INT NOT NULL AUTO_INCREMENT,
+  `jobKind` VARCHAR(64) NOT NULL,
+  `jobStatus` ENUM('queued', 'running', 'succeeded', 'failed', 'cancelled') NOT NULL DEFAULT 'queued',
+  `jobParams` JSON NOT NULL,
+  `jobInput` LONGBLOB NULL DEFAULT NULL,
+  `jobProgressDone` INT UNSIGNED NOT NULL DEFAULT 0,
+  `jobProgressTotal` INT UNSIGNED NULL DEFAULT NULL,
+  `jobCancelRequested` TINYINT(1) NOT NULL DEFAULT 0,
+  `jobResult` LONGTEXT NULL DEFAULT NULL,
+  `jobError` TEXT NULL DEFAULT NULL,
+  `jobWorker` VARCHAR(255) NULL DEFAULT NULL,
+  `jobCreatedAt` DATETIME NOT NULL,
+  `jobStartedAt` DATETIME NULL DEFAULT NULL,
+  `jobHeartbeatAt` DATETIME NULL DEFAULT NULL,
+  `jobFinishedAt` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`jobID`),
+  INDEX `idx_job_status` (`jobStatus` ASC, `jobID` ASC) VISIBLE);
+
+-- Create Table `SchemaMigrations`, the migrations in database/migrations that have been applied
+DROP TABLE IF EXISTS `SchemaMigrations` ;
+CREATE TABLE IF NOT EXISTS `SchemaMigrations` (
+  `migrationVersion` INT NOT NULL,
+  `migrationName` VARCHAR(255) NOT NULL,
+  `migrationAppliedAt` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`migrationVersion`));
+
+-- The tables above already include these migrations
+INSERT INTO SchemaMigrations (migrationVersion, migrationName) VALUES
+(1, 'tracked_day_totals'),
+(2, 'derived_food_calories'),
+(3, 'lookup_indexes'),
+(4, 'table_versions'),
+(5, 'entry_archive'),
+(6, 'change_log'),
+(7, 'jobs'),
+(8, 'client_energy'),
+(9, 'pending_changes');
+
 /*_________ Insert Statements for Sample Data _________*/
 
 -- Insert Staff
@@ -202,6 +346,34 @@ VALUES
 (3, (SELECT trackedDayID FROM TrackedDays WHERE clientID = (SELECT clientID FROM Clients WHERE clientName = 'Jessica Jackson') AND trackedDayDate = '2024-04-20'), 'Rock Climbing', 'Other', 200, 'At a gym'),
 (4, (SELECT trackedDayID FROM TrackedDays WHERE clientID = (SELECT clientID FROM Clients WHERE clientName = 'Jessica Jackson') AND trackedDayDate = '2024-04-20'), 'Light Yoga', 'Stretching', 100, NULL);
 
+-- Fill in the energy estimates (Mifflin-St Jeor BMR and TDEE) for the sample clients inserted above
+UPDATE Clients
+SET
+  clientBMR = GREATEST(0, ROUND(10 * clientWeight + 6.25 * clientHeight - 5 * clientAge + IF(clientSex = 'Male', 5, -161))),
+  clientTDEE = GREATEST(0, ROUND(
+    (10 * clientWeight + 6.25 * clientHeight - 5 * clientAge + IF(clientSex = 'Male', 5, -161))
+    * CASE clientActivityLevel
+        WHEN 'Sedentary' THEN 1.2 WHEN 'Light' THEN 1.375 WHEN 'Moderate' THEN 1.55
+        WHEN 'High' THEN 1.725 WHEN 'Athlete' THEN 1.9
+      END
+  ));
+
+-- Fill in the Tracked Day totals for the sample entries inserted above
+UPDATE TrackedDays
+LEFT JOIN (
+  SELECT trackedDayID, SUM(foodEntryCalories) AS calories, COUNT(*) AS entries
+  FROM FoodEntries GROUP BY trackedDayID
+) AS food ON food.trackedDayID = TrackedDays.trackedDayID
+LEFT JOIN (
+  SELECT trackedDayID, SUM(exerciseEntryCalories) AS calories, COUNT(*) AS entries
+  FROM ExerciseEntries GROUP BY trackedDayID
+) AS exercise ON exercise.trackedDayID = TrackedDays.trackedDayID
+SET
+  TrackedDays.trackedDayFoodCalories = COALESCE(food.calories, 0),
+  TrackedDays.trackedDayFoodEntryCount = COALESCE(food.entries, 0),
+  TrackedDays.trackedDayExerciseCalories = COALESCE(exercise.calories, 0),
+  TrackedDays.trackedDayExerciseEntryCount = COALESCE(exercise.entries, 0);
+
 /*
 Citation for below code:
 Date: 06/06/2024
@@ -71,22 +71,13 @@ WHERE staffID = $staffIDInput AND clientID = $clientIDInput;
 
 /*____________ Queries for Tracked Days ____________*/
 
--- Query to get all tracked days with calorie totals by client (All Food Entry Calories - All Exercise Entry calories) and client names
+-- Query to get all tracked days with calorie totals by client (All Food Entry Calories - All Exercise Entry calories) and client names.
+-- The totals are stored on each tracked day and kept up to date by the entry queries below, so no per-row subqueries are needed
 SELECT 
 td.trackedDayID,
 td.clientID, 
 td.trackedDayDate,
-(
-SELECT COALESCE(SUM(fe.foodEntryCalories), 0)
-FROM FoodEntries fe
-WHERE fe.trackedDayID = td.trackedDayID  
-) -
-(
-SELECT COALESCE(SUM(ee.exerciseEntryCalories), 0)
-FROM ExerciseEntries ee
-WHERE ee.trackedDayID = td.trackedDayID
-) 
-AS trackedDayTotalCalories,
+td.trackedDayFoodCalories - td.trackedDayExerciseCalories AS trackedDayTotalCalories,
 td.trackedDayCalorieTarget,
 td.trackedDayNote,
 c.clientName
@@ -98,17 +89,7 @@ SELECT
 td.trackedDayID,
 td.clientID,
 td.trackedDayDate, 
-(
-SELECT COALESCE(SUM(fe.foodEntryCalories), 0)
-FROM FoodEntries fe
-WHERE fe.trackedDayID = td.trackedDayID
-) -  
-(
-SELECT COALESCE(SUM(ee.exerciseEntryCalories), 0) 
-FROM ExerciseEntries ee
-WHERE ee.trackedDayID = td.trackedDayID  
-) 
-AS trackedDayTotalCalories,
+td.trackedDayFoodCalories - td.trackedDayExerciseCalories AS trackedDayTotalCalories,
 td.trackedDayCalorieTarget, 
 td.trackedDayNote,
 c.clientName  
@@ -116,6 +97,34 @@ FROM TrackedDays td
 JOIN Clients c ON td.clientID = c.clientID
 WHERE c.clientName LIKE %s;
 
+-- Query to add a food entry's calories to its tracked day's totals (same pattern for exercise entries)
+UPDATE TrackedDays
+SET trackedDayFoodCalories = trackedDayFoodCalories + $foodEntryCaloriesInput,
+trackedDayFoodEntryCount = trackedDayFoodEntryCount + 1
+WHERE trackedDayID = $trackedDayIDInput;
+
+-- Query to swap an existing food entry's calories for new ones in its tracked day's totals, run before the entry is updated
+UPDATE TrackedDays
+JOIN FoodEntries ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
+SET TrackedDays.trackedDayFoodCalories = TrackedDays.trackedDayFoodCalories - FoodEntries.foodEntryCalories + $foodEntryCaloriesInput
+WHERE FoodEntries.foodEntryID = $foodEntryIDInput;
+
+-- Query to recompute every tracked day's totals from its entries, used to repair any drift
+UPDATE TrackedDays
+LEFT JOIN (
+SELECT trackedDayID, SUM(foodEntryCalories) AS calories, COUNT(*) AS entries
+FROM FoodEntries GROUP BY trackedDayID
+) AS food ON food.trackedDayID = TrackedDays.trackedDayID
+LEFT JOIN (
+SELECT trackedDayID, SUM(exerciseEntryCalories) AS calories, COUNT(*) AS entries
+FROM ExerciseEntries GROUP BY trackedDayID
+) AS exercise ON exercise.trackedDayID = TrackedDays.trackedDayID
+SET
+TrackedDays.trackedDayFoodCalories = COALESCE(food.calories, 0),
+TrackedDays.trackedDayFoodEntryCount = COALESCE(food.entries, 0),
+TrackedDays.trackedDayExerciseCalories = COALESCE(exercise.calories, 0),
+TrackedDays.trackedDayExerciseEntryCount = COALESCE(exercise.entries, 0);
+
 -- Query to add a new tracked day for a client using form inputs
 INSERT INTO TrackedDays (clientID, trackedDayDate, trackedDayTotalCalories, trackedDayCalorieTarget, trackedDayNote) 
 VALUES ($clientIDInput, $trackedDayDateInput, $trackedDayTotalCaloriesInput, $trackedDayCalorieTargetInput, $trackedDayNoteInput);
@@ -170,6 +179,27 @@ LEFT JOIN Foods ON FoodEntries.foodID = Foods.foodID
 JOIN TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
 JOIN Clients ON TrackedDays.clientID = Clients.clientID;
 
+-- Query to get one page of food entries after the last ID seen, with the optional filters from the listing page
+SELECT 
+FoodEntries.foodEntryID, 
+TrackedDays.trackedDayDate, 
+Clients.clientName, 
+Foods.foodName, 
+FoodEntries.foodEntryCalories, 
+FoodEntries.foodEntryGramWeight, 
+FoodEntries.foodEntryNote
+FROM FoodEntries
+LEFT JOIN Foods ON FoodEntries.foodID = Foods.foodID
+JOIN TrackedDays ON FoodEntries.trackedDayID = TrackedDays.trackedDayID
+JOIN Clients ON TrackedDays.clientID = Clients.clientID
+WHERE Clients.clientName = $clientNameInput
+AND TrackedDays.trackedDayDate >= $startDateInput
+AND TrackedDays.trackedDayDate <= $endDateInput
+AND Foods.foodName = $foodNameInput
+AND FoodEntries.foodEntryID > $lastFoodEntryIDInput
+ORDER BY FoodEntries.foodEntryID
+LIMIT $pageSizeInput;
+
 -- Query to add a new food entry for a tracked day using form inputs
 INSERT INTO FoodEntries (trackedDayID, foodID, foodEntryCalories, foodEntryGramWeight, foodEntryNote)
 VALUES ($trackedDayIDInput, $foodIDInput, $foodEntryCaloriesInput, $foodEntryGramWeightInput, $foodEntryNoteInput);
@@ -232,4 +262,30 @@ DELETE FROM ExerciseEntries
 WHERE exerciseEntryID = $exerciseEntryIDInput AND trackedDayID = $trackedDayIDInput;
 
 -- Query to fetch client names and IDs for exercise entries
-SELECT clientID, clientName FROM Clients;
\ No newline at end of file
+SELECT clientID, clientName FROM Clients;
+-- Query to get a client's progress report, one row per week (day and month reports group on the date or the 1st of the month)
+SELECT
+DATE_SUB(trackedDayDate, INTERVAL WEEKDAY(trackedDayDate) DAY) AS period,
+COUNT(*) AS trackedDays,
+SUM(trackedDayFoodCalories) AS caloriesIn,
+SUM(trackedDayExerciseCalories) AS caloriesOut,
+SUM(trackedDayCalorieTarget) AS calorieTarget,
+SUM(ABS(trackedDayFoodCalories - trackedDayExerciseCalories - trackedDayCalorieTarget) <= trackedDayCalorieTarget * 0.1) AS adherentDays
+FROM TrackedDays
+WHERE clientID = $clientIDInput AND trackedDayDate BETWEEN $startDateInput AND $endDateInput
+GROUP BY period
+ORDER BY period;
+
+-- Query to get the same report for every client assigned to a staff member
+SELECT
+TrackedDays.clientID,
+DATE_SUB(TrackedDays.trackedDayDate, INTERVAL WEEKDAY(TrackedDays.trackedDayDate) DAY) AS period,
+COUNT(*) AS trackedDays,
+SUM(TrackedDays.trackedDayFoodCalories) AS caloriesIn,
+SUM(TrackedDays.trackedDayExerciseCalories) AS caloriesOut,
+SUM(TrackedDays.trackedDayCalorieTarget) AS calorieTarget
+FROM StaffClients
+JOIN TrackedDays ON TrackedDays.clientID = StaffClients.clientID
+WHERE StaffClients.staffID = $staffIDInput AND TrackedDays.trackedDayDate BETWEEN $startDateInput AND $endDateInput
+GROUP BY TrackedDays.clientID, period
+ORDER BY TrackedDays.clientID, period;
@@ -0,0 +1,104 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from database.db_connector import PoolTimeoutError, db, host, passwd, pool_checkout_timeout, pool_idle_timeout, user
+
+# aiomysql is only needed for the async serving mode in asgi.py
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+# One async pool serves every concurrent request of a process, so it can be larger than the per-process
+# pool of a synchronous worker
+async_pool_min_size = int(os.environ.get("340DBASYNCPOOLMIN", 1))
+async_pool_max_size = int(os.environ.get("340DBASYNCPOOLMAX", 20))
+
+
+# A pool of non-blocking MySQL connections for an asyncio event loop. While one request waits on the
+# database, the loop serves the others, so a single process can keep many requests in flight at once.
+# Settings come from the same .env file as the synchronous pool in db_connector.py
+class AsyncConnectionPool:
+    def __init__(
+        self,
+        host=host,
+        user=user,
+        passwd=passwd,
+        db=db,
+        min_size=async_pool_min_size,
+        max_size=async_pool_max_size,
+        idle_timeout=pool_idle_timeout,
+        checkout_timeout=pool_checkout_timeout,
+    ):
+        self.connect_args = dict(host=host, user=user, password=passwd, db=db, charset="utf8")
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._pool = None
+        self._counters = {"checkouts": 0, "timeouts": 0}
+
+    # Open the pool. Call once the event loop is running, e.g. on ASGI lifespan startup
+    async def open(self):
+        if aiomysql is None:
+            raise RuntimeError("The async serving mode needs aiomysql. Run pip install aiomysql.")
+        if self._pool is None:
+            self._pool = await aiomysql.create_pool(
+                minsize=self.min_size,
+                maxsize=self.max_size,
+                # Connections idle for longer than this are reopened instead of reused
+                pool_recycle=int(self.idle_timeout),
+                # Rows come back as dictionaries, the same as in the Flask routes
+                cursorclass=aiomysql.DictCursor,
+                # Only reads go through this pool, so there is no transaction to hold open
+                autocommit=True,
+                **self.connect_args,
+            )
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    # Borrow a connection for the length of an "async with" block, waiting up to the checkout timeout
+    @asynccontextmanager
+    async def connection(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        try:
+            connection = await asyncio.wait_for(self._pool.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise PoolTimeoutError(f"No database connection became free within {timeout} seconds.") from None
+        self._counters["checkouts"] += 1
+        try:
+            yield connection
+        finally:
+            self._pool.release(connection)
+
+    # Run one query on a borrowed connection and return all of its rows
+    async def fetchall(self, query, params=()):
+        async with self.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+    def stats(self):
+        if self._pool is None:
+            return dict(self._counters, size=0, idle=0, inUse=0, minSize=self.min_size, maxSize=self.max_size)
+        return dict(
+            self._counters,
+            size=self._pool.size,
+            idle=self._pool.freesize,
+            inUse=self._pool.size - self._pool.freesize,
+            minSize=self.min_size,
+            maxSize=self.max_size,
+        )
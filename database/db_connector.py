@@ -7,17 +7,46 @@ https://github.com/osu-cs340-ecampus/flask-starter-app
 """
 
 import MySQLdb
+import MySQLdb.cursors
+import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv, find_dotenv
+from flask import g, request
 
 load_dotenv(find_dotenv())
 
+logger = logging.getLogger(__name__)
+
 # Retrieve credentials from .env file
 host = os.environ.get("340DBHOST")
 user = os.environ.get("340DBUSER")
 passwd = os.environ.get("340DBPW")
 db = os.environ.get("340DB")
 
+# Connection pool settings, also read from the .env file
+pool_min_size = int(os.environ.get("340DBPOOLMIN", 1))
+pool_max_size = int(os.environ.get("340DBPOOLMAX", 10))
+# Seconds an unused connection above the minimum is kept before it is closed
+pool_idle_timeout = float(os.environ.get("340DBPOOLIDLE", 300))
+# Seconds a request waits for a free connection before giving up
+pool_checkout_timeout = float(os.environ.get("340DBPOOLTIMEOUT", 10))
+# Connections used more recently than this many seconds are trusted without a ping
+pool_ping_after = float(os.environ.get("340DBPOOLPINGAFTER", 1))
+
+# Optional read replicas, as a comma separated list of host or host:port. They use the same user, password and database
+replica_hosts = [address.strip() for address in os.environ.get("340DBREPLICAS", "").split(",") if address.strip()]
+# Replicas further behind the primary than this many seconds (or not replicating) are not read from
+replica_max_lag = float(os.environ.get("340DBREPLICAMAXLAG", 5))
+# Seconds between health checks of each replica
+replica_check_interval = float(os.environ.get("340DBREPLICACHECK", 5))
+# Seconds a read waits for a free replica connection before using the primary instead
+replica_checkout_timeout = float(os.environ.get("340DBREPLICATIMEOUT", 1))
+# Seconds a browser's reads stay on the primary after it writes, so it sees its own changes
+replica_sticky_seconds = float(os.environ.get("340DBREPLICASTICKY", replica_max_lag + 1))
+
 
 # Connect to MySQL database using credentials from .env file
 def connect_to_database(host=host, user=user, passwd=passwd, db=db):
@@ -25,23 +54,411 @@ def connect_to_database(host=host, user=user, passwd=passwd, db=db):
     return db_connection
 
 
-# Function used to execute query on the database with the query as a parameter
-def execute_query(db_connection=None, query=None, query_params=()):
-    # Check if database connection was successfully established
-    if db_connection is None:
-        print(
-            "No connection to the database found! Have you called connect_to_database() first?"
-        )
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+
+# Raised when no pooled connection becomes free within the checkout timeout
+class PoolTimeoutError(Exception):
+    pass
+
+
+# A bounded pool of open MySQL connections shared by all threads of a process. Reusing connections
+# saves the TCP connect and login handshake that connect_to_database() pays on every call.
+class ConnectionPool:
+    def __init__(
+        self,
+        host=host,
+        user=user,
+        passwd=passwd,
+        db=db,
+        min_size=pool_min_size,
+        max_size=pool_max_size,
+        idle_timeout=pool_idle_timeout,
+        checkout_timeout=pool_checkout_timeout,
+        ping_after=pool_ping_after,
+        **connect_args,
+    ):
+        self.connect_args = dict(host=host, user=user, passwd=passwd, db=db)
+        # Rows come back as dictionaries, the same as the DictCursor the routes were written for
+        self.connect_args.setdefault("cursorclass", MySQLdb.cursors.DictCursor)
+        self.connect_args.setdefault("charset", "utf8")
+        self.connect_args.update(connect_args)
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self._lock = threading.Condition()
+        self._reset()
+
+    # Forget every connection. Also used after a fork, since the child must not share the parent's sockets
+    def _reset(self):
+        self._pid = os.getpid()
+        # Free connections as (connection, time it was returned), most recently used last
+        self._idle = []
+        # Connections that exist, either free or checked out
+        self._size = 0
+        self._counters = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "pingFailures": 0,
+            "waitSeconds": 0.0,
+        }
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _connect(self):
+        connection = MySQLdb.connect(**self.connect_args)
+        with self._lock:
+            self._counters["created"] += 1
+        return connection
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except MySQLdb.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._counters["closed"] += 1
+            self._lock.notify()
+
+    # Close free connections that have sat unused for too long, never going below the minimum size
+    def reap_idle(self):
+        expired = []
+        with self._lock:
+            self._check_fork()
+            cutoff = time.monotonic() - self.idle_timeout
+            while (
+                self._idle
+                and self._size - len(expired) > self.min_size
+                and self._idle[0][1] < cutoff
+            ):
+                expired.append(self._idle.pop(0)[0])
+        for connection in expired:
+            self._discard(connection)
+        return len(expired)
+
+    # Borrow a connection, waiting up to the checkout timeout if all of them are in use
+    def acquire(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self.reap_idle()
+        while True:
+            connection = None
+            lastUsed = None
+            with self._lock:
+                self._check_fork()
+                waited = False
+                waitStart = time.monotonic()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection became free within {timeout} seconds."
+                        )
+                    waited = True
+                    self._lock.wait(remaining)
+                if waited:
+                    self._counters["waits"] += 1
+                    self._counters["waitSeconds"] += time.monotonic() - waitStart
+                if self._idle:
+                    connection, lastUsed = self._idle.pop()
+                else:
+                    # Reserve a slot for the new connection we are about to open
+                    self._size += 1
+                self._counters["checkouts"] += 1
+            if connection is None:
+                try:
+                    return self._connect()
+                except MySQLdb.Error:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            # Make sure the server hasn't dropped a connection that sat unused for a while
+            if time.monotonic() - lastUsed < self.ping_after:
+                return connection
+            try:
+                connection.ping()
+                return connection
+            except MySQLdb.Error:
+                with self._lock:
+                    self._counters["pingFailures"] += 1
+                self._discard(connection)
+
+    # Give a borrowed connection back. Anything left uncommitted is rolled back first
+    def release(self, connection):
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+        try:
+            connection.rollback()
+        except MySQLdb.Error:
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    # Borrow a connection for the length of a "with" block
+    @contextmanager
+    def connection(self, timeout=None):
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    # Open connections until the pool holds at least its minimum size, e.g. before serving traffic
+    def fill(self):
+        connections = [self.acquire() for _ in range(self.min_size)]
+        for connection in connections:
+            self.release(connection)
+
+    # Close every free connection
+    def close_all(self):
+        with self._lock:
+            self._check_fork()
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            self._check_fork()
+            return dict(
+                self._counters,
+                size=self._size,
+                idle=len(self._idle),
+                inUse=self._size - len(self._idle),
+                minSize=self.min_size,
+                maxSize=self.max_size,
+            )
+
+
+# The pool shared by execute_query() and the Flask routes. Connections are only opened when first needed
+pool = ConnectionPool()
+
+
+# One read replica: its pool and what its last health check found
+class Replica:
+    def __init__(self, address, **pool_args):
+        self.address = address
+        replica_host, _, port = address.partition(":")
+        self.pool = ConnectionPool(host=replica_host, port=int(port or 3306), **pool_args)
+        # Unknown until the first health check
+        self.healthy = False
+        self.lag = None
+        self.error = None
+        self.checked_at = None
+
+
+# The read replicas, handed out in turn. One background thread per process checks each replica's lag behind
+# the primary every check_interval seconds, so no request ever waits on a check. Replicas that are too far
+# behind, not replicating or unreachable are skipped until a later check finds them healthy again. When none
+# can be used (including before the first check has finished), callers read from the primary.
+# The database user needs the REPLICATION CLIENT privilege on the replicas for the lag checks.
+class ReplicaSet:
+    def __init__(
+        self,
+        addresses=replica_hosts,
+        max_lag=replica_max_lag,
+        check_interval=replica_check_interval,
+        checkout_timeout=replica_checkout_timeout,
+        **pool_args,
+    ):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.replicas = [Replica(address, checkout_timeout=checkout_timeout, **pool_args) for address in addresses]
+        self._lock = threading.Lock()
+        self._next = 0
+        self._thread = None
+        self._pid = None
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    # The checker starts with the first read (or warmUp in app.py). Threads don't survive a fork, so each
+    # worker starts its own
+    def start(self):
+        with self._lock:
+            if self.replicas and (self._thread is None or self._pid != os.getpid()):
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._watch, name="replica-checks", daemon=True)
+                self._thread.start()
+
+    def _watch(self):
+        while True:
+            for replica in self.replicas:
+                try:
+                    self.check(replica)
+                except Exception:
+                    logger.exception("Could not check replica %s", replica.address)
+            time.sleep(self.check_interval)
+
+    # How many seconds a replica is behind, or None if it isn't replicating
+    @staticmethod
+    def _replication_lag(cursor):
+        # SHOW REPLICA STATUS is the newer name (MySQL 8.0.22+, MariaDB 10.5+); older servers only know the other
+        for statement in ("SHOW REPLICA STATUS;", "SHOW SLAVE STATUS;"):
+            try:
+                cursor.execute(statement)
+            except MySQLdb.ProgrammingError:
+                continue
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
         return None
 
+    def check(self, replica):
+        try:
+            with replica.pool.connection() as connection:
+                replica.lag = self._replication_lag(connection.cursor())
+            replica.error = None if replica.lag is not None else "Not replicating."
+        except (MySQLdb.Error, PoolTimeoutError) as e:
+            replica.lag = None
+            replica.error = str(e)
+        replica.checked_at = time.monotonic()
+        replica.healthy = replica.lag is not None and replica.lag <= self.max_lag
+        if not replica.healthy:
+            logger.warning("Not reading from replica %s: lag %s, %s", replica.address, replica.lag, replica.error)
+
+    # Borrow a connection from the next healthy replica. Returns (replica, connection), or None if no replica can be used
+    def acquire(self):
+        self.start()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+            if not replica.healthy:
+                continue
+            try:
+                return replica, replica.pool.acquire()
+            except (MySQLdb.Error, PoolTimeoutError) as e:
+                # A replica that can't hand out a connection is skipped until its next check
+                replica.healthy = False
+                replica.error = str(e)
+        return None
+
+    def stats(self):
+        return [
+            {
+                "address": replica.address,
+                "healthy": replica.healthy,
+                "lagSeconds": replica.lag,
+                "error": replica.error,
+                "pool": replica.pool.stats(),
+            }
+            for replica in self.replicas
+        ]
+
+
+# Cookie holding the time until which a browser that just wrote reads from the primary
+STICKY_COOKIE = "kilojulia_primary_until"
+
+
+# Gives each Flask request (or CLI command) one pooled connection through mysql.connection, the same way
+# Flask-MySQLdb did, and hands it back to the pool when the request ends.
+# If an Instrumentation is passed in, the connection's cursors are wrapped so their queries are timed.
+# If replicas are configured, mysql.read_connection gives GET requests a replica connection for their reads.
+# Requests that can write, and browsers that wrote within the last few seconds, read from the primary instead
+class PooledMySQL:
+    def __init__(self, app=None, pool=pool, instrumentation=None, replicas=None, sticky_seconds=replica_sticky_seconds):
+        self.pool = pool
+        self.instrumentation = instrumentation
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+        app.teardown_appcontext(self.teardown)
+
+    def _wrap(self, connection):
+        return self.instrumentation.wrap(connection) if self.instrumentation else connection
+
+    @property
+    def connection(self):
+        if "db_connection" not in g:
+            g.db_connection = self.pool.acquire()
+            g.db_connection_wrapper = self._wrap(g.db_connection)
+        return g.db_connection_wrapper
+
+    # Connection for reads that can be slightly behind the primary, like listings and reports
+    @property
+    def read_connection(self):
+        if "db_read_connection_wrapper" not in g:
+            chosen = self.replicas.acquire() if self.replicas and self._can_use_replica() else None
+            if chosen is None:
+                g.db_read_connection_wrapper = None
+            else:
+                g.db_read_replica, g.db_read_connection = chosen
+                g.db_read_connection_wrapper = self._wrap(g.db_read_connection)
+        return g.db_read_connection_wrapper or self.connection
+
+    def _can_use_replica(self):
+        if not request or request.method not in ("GET", "HEAD"):
+            return False
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) < time.time()
+        except ValueError:
+            return True
+
+    # Requests that used the primary for anything other than reading keep the browser on the primary for a while
+    def after_request(self, response):
+        if self.replicas and "db_connection" in g and request.method not in ("GET", "HEAD"):
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=int(self.sticky_seconds) + 1,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def teardown(self, exception):
+        g.pop("db_connection_wrapper", None)
+        connection = g.pop("db_connection", None)
+        if connection is not None:
+            self.pool.release(connection)
+        g.pop("db_read_connection_wrapper", None)
+        replica = g.pop("db_read_replica", None)
+        connection = g.pop("db_read_connection", None)
+        if connection is not None:
+            replica.pool.release(connection)
+
+
+# Function used to execute query on the database with the query as a parameter.
+# If no connection is passed in, one is borrowed from the pool for the query.
+def execute_query(db_connection=None, query=None, query_params=()):
     # Check if query is blank/missing
     if query is None or len(query.strip()) == 0:
-        print("query is empty! Please pass a SQL query in query")
+        logger.warning("query is empty! Please pass a SQL query in query")
         return None
 
+    if db_connection is None:
+        with pool.connection() as pooled_connection:
+            return execute_query(pooled_connection, query, query_params)
+
     # Execute the query and return the data
-    print("Executing %s with %s" % (query, query_params))
+    logger.debug("Executing %s with %s", query, query_params)
     cursor = db_connection.cursor(MySQLdb.cursors.DictCursor)
+    started = time.perf_counter()
     cursor.execute(query, query_params)
     db_connection.commit()
+    logger.debug("Query took %.2f ms and returned %s rows", (time.perf_counter() - started) * 1000, cursor.rowcount)
     return cursor
@@ -0,0 +1,273 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from flask import g, request
+
+# Statements slower than this many milliseconds are written to the slow query log
+slow_query_ms = float(os.environ.get("KILOJULIA_SLOW_QUERY_MS", 200))
+# Optional file for the slow query log. Without it, slow queries only go to the "kilojulia.slowqueries" logger
+slow_query_file = os.environ.get("KILOJULIA_SLOW_QUERY_LOG")
+
+# Upper bounds, in milliseconds, of the histogram buckets kept for every route
+histogram_bounds_ms = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+request_log = logging.getLogger("kilojulia.requests")
+slow_query_log = logging.getLogger("kilojulia.slowqueries")
+if slow_query_file:
+    slow_query_handler = logging.FileHandler(slow_query_file, encoding="utf-8")
+    slow_query_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_log.addHandler(slow_query_handler)
+    slow_query_log.setLevel(logging.WARNING)
+
+# Longest statement text kept in logs and stats
+statement_limit = 500
+
+
+def _shorten(statement):
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    statement = " ".join(str(statement).split())
+    return statement if len(statement) <= statement_limit else statement[:statement_limit] + "..."
+
+
+# What the database did during one request: number of statements, time spent, rows and the slowest statement
+class QueryStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, seconds, rows):
+        self.count += 1
+        self.seconds += seconds
+        self.rows += max(rows, 0)
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+# Counts of durations falling in each of the histogram buckets, plus totals
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(histogram_bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(histogram_bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    # Estimates a percentile as the upper bound of the bucket it falls in
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bound, bucket in zip(histogram_bounds_ms, self.buckets):
+            seen += bucket
+            if seen >= wanted:
+                return bound
+        return self.max_ms
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50Ms": self.percentile(0.5),
+            "p95Ms": self.percentile(0.95),
+            "p99Ms": self.percentile(0.99),
+            "maxMs": round(self.max_ms, 2),
+            "buckets": {
+                f"<={bound}": bucket
+                for bound, bucket in zip(histogram_bounds_ms + ("inf",), self.buckets)
+                if bucket
+            },
+        }
+
+
+# Everything recorded for one route across all its requests
+class RouteStats:
+    def __init__(self):
+        self.requests = Histogram()
+        self.database = Histogram()
+        self.queries = 0
+        self.max_queries = 0
+        self.rows = 0
+        self.slowest_ms = 0.0
+        self.slowest_statement = None
+
+    def add(self, request_ms, stats):
+        self.requests.add(request_ms)
+        self.database.add(stats.seconds * 1000)
+        self.queries += stats.count
+        self.max_queries = max(self.max_queries, stats.count)
+        self.rows += stats.rows
+        if stats.slowest_seconds * 1000 > self.slowest_ms:
+            self.slowest_ms = stats.slowest_seconds * 1000
+            self.slowest_statement = stats.slowest_statement
+
+    def stats(self):
+        count = self.requests.count
+        return {
+            "requests": self.requests.stats(),
+            "database": self.database.stats(),
+            "meanQueries": round(self.queries / count, 2) if count else None,
+            "maxQueries": self.max_queries,
+            "meanRows": round(self.rows / count, 2) if count else None,
+            "slowestQueryMs": round(self.slowest_ms, 2),
+            "slowestQuery": self.slowest_statement,
+        }
+
+
+# Wraps a cursor so every statement it runs is timed and counted
+class InstrumentedCursor:
+    def __init__(self, cursor, instrumentation):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+
+    def _timed(self, method, statement, *args):
+        started = time.perf_counter()
+        try:
+            return method(statement, *args)
+        finally:
+            self._instrumentation.record(
+                statement, time.perf_counter() - started, self._cursor.rowcount
+            )
+
+    def execute(self, query, args=None):
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(self._cursor.executemany, query, args)
+
+    def callproc(self, procname, args=()):
+        return self._timed(self._cursor.callproc, procname, args)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# Wraps a connection so the cursors it hands out are instrumented. Everything else goes to the real connection
+class InstrumentedConnection:
+    def __init__(self, connection, instrumentation):
+        self._connection = connection
+        self._instrumentation = instrumentation
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._instrumentation)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# Collects per-request query stats for a Flask app, adds them to each response as headers, logs them, keeps
+# per-route histograms for /stats and writes statements slower than slow_query_ms to the slow query log
+class Instrumentation:
+    def __init__(self, app=None, slow_ms=slow_query_ms):
+        self.slow_ms = slow_ms
+        self._routes = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def wrap(self, connection):
+        return InstrumentedConnection(connection, self)
+
+    # Records one statement against the current request, if there is one
+    def record(self, statement, seconds, rows):
+        stats = g.get("query_stats") if g else None
+        if stats is not None:
+            stats.record(statement, seconds, rows)
+        if seconds * 1000 >= self.slow_ms:
+            slow_query_log.warning(
+                json.dumps(
+                    {
+                        "ms": round(seconds * 1000, 2),
+                        "rows": rows,
+                        "route": self._route_name() if request else None,
+                        "statement": _shorten(statement),
+                    }
+                )
+            )
+
+    @staticmethod
+    def _route_name():
+        rule = request.url_rule
+        return f"{request.method} {rule.rule if rule else '<unmatched>'}"
+
+    def before_request(self):
+        g.query_stats = QueryStats()
+
+    def after_request(self, response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+        request_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.seconds * 1000
+        route = self._route_name()
+        with self._lock:
+            self._routes.setdefault(route, RouteStats()).add(request_ms, stats)
+        if stats.slowest_statement is not None:
+            stats.slowest_statement = _shorten(stats.slowest_statement)
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{db_ms:.2f}"
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={request_ms:.2f}'
+        )
+        request_log.info(
+            json.dumps(
+                {
+                    "route": route,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "ms": round(request_ms, 2),
+                    "queries": stats.count,
+                    "dbMs": round(db_ms, 2),
+                    "rows": stats.rows,
+                    "slowestMs": round(stats.slowest_seconds * 1000, 2),
+                    "slowest": stats.slowest_statement,
+                }
+            )
+        )
+        return response
+
+    # Per-route stats, slowest routes (by total database time) first
+    def stats(self):
+        with self._lock:
+            routes = sorted(
+                self._routes.items(), key=lambda item: item[1].database.total_ms, reverse=True
+            )
+            return {route: route_stats.stats() for route, route_stats in routes}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
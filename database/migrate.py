@@ -0,0 +1,121 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import os
+import re
+
+# Schema changes made after DDL.sql was first loaded live in database/migrations as numbered SQL files
+# (e.g. 0003_lookup_indexes.sql). Each one is applied once, in order, and recorded in SchemaMigrations.
+migrations_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Name of the MySQL lock held while migrating, so two app processes starting together don't both migrate
+lock_name = "kilojulia_migrations"
+lock_timeout = 60
+
+migration_file = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+# Raised when a migration can't be read or applied
+class MigrationError(Exception):
+    pass
+
+
+# Returns every migration file as (version, name, path), oldest first
+def find_migrations(directory=migrations_dir):
+    migrations = []
+    for filename in os.listdir(directory):
+        match = migration_file.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("Two migration files have the same version number.")
+    return migrations
+
+
+# Splits a migration file into statements. Comments are dropped and statements end with a ";" at the end
+# of a line, so semicolons inside string values are fine as long as they aren't at the end of a line
+def split_statements(sql):
+    sql = re.sub(r"/\*.*?\*/", "", sql, flags=re.DOTALL)
+    statements = []
+    current = []
+    for line in sql.splitlines():
+        if line.strip().startswith("--"):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip().rstrip(";").strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    leftover = "\n".join(current).strip()
+    if leftover:
+        statements.append(leftover)
+    return statements
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS `SchemaMigrations` (
+          `migrationVersion` INT NOT NULL,
+          `migrationName` VARCHAR(255) NOT NULL,
+          `migrationAppliedAt` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (`migrationVersion`));
+        """
+    )
+
+
+# Returns the set of migration versions already applied to the database
+def applied_versions(cursor):
+    ensure_migrations_table(cursor)
+    cursor.execute("SELECT migrationVersion FROM SchemaMigrations;")
+    return {row["migrationVersion"] for row in cursor.fetchall()}
+
+
+# Returns the migrations that haven't been applied yet, oldest first
+def pending_migrations(cursor, directory=migrations_dir):
+    applied = applied_versions(cursor)
+    return [migration for migration in find_migrations(directory) if migration[0] not in applied]
+
+
+# Applies every pending migration (or those up to target) and returns the ones applied.
+# MySQL commits schema changes as soon as they run, so a migration that fails halfway can't be rolled back;
+# it is left unrecorded and the error says which statement failed so it can be fixed by hand
+def migrate(connection, target=None, directory=migrations_dir, log=None):
+    cursor = connection.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, %s) AS locked;", (lock_name, lock_timeout))
+    if not cursor.fetchone()["locked"]:
+        raise MigrationError("Another process is already migrating the database.")
+    applied = []
+    try:
+        for version, name, path in pending_migrations(cursor, directory):
+            if target is not None and version > target:
+                break
+            if log:
+                log(f"Applying migration {version:04d} {name}")
+            with open(path, encoding="utf-8") as file:
+                statements = split_statements(file.read())
+            for number, statement in enumerate(statements, start=1):
+                try:
+                    cursor.execute(statement)
+                except Exception as e:
+                    connection.rollback()
+                    raise MigrationError(
+                        f"Migration {version:04d} {name} failed at statement {number}: {e}"
+                    ) from e
+            cursor.execute(
+                "INSERT INTO SchemaMigrations (migrationVersion, migrationName) VALUES (%s, %s);",
+                (version, name),
+            )
+            connection.commit()
+            applied.append((version, name))
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s);", (lock_name,))
+        cursor.fetchall()
+    return applied
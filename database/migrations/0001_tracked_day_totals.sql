@@ -0,0 +1,29 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- Running totals of each day's entries, kept up to date by the app on every entry insert/update/delete
+ALTER TABLE TrackedDays
+  ADD COLUMN `trackedDayFoodCalories` INT NOT NULL DEFAULT 0,
+  ADD COLUMN `trackedDayExerciseCalories` INT NOT NULL DEFAULT 0,
+  ADD COLUMN `trackedDayFoodEntryCount` INT NOT NULL DEFAULT 0,
+  ADD COLUMN `trackedDayExerciseEntryCount` INT NOT NULL DEFAULT 0;
+
+-- Fill in the totals for the entries that already exist
+UPDATE TrackedDays
+LEFT JOIN (
+  SELECT trackedDayID, SUM(foodEntryCalories) AS calories, COUNT(*) AS entries
+  FROM FoodEntries GROUP BY trackedDayID
+) AS food ON food.trackedDayID = TrackedDays.trackedDayID
+LEFT JOIN (
+  SELECT trackedDayID, SUM(exerciseEntryCalories) AS calories, COUNT(*) AS entries
+  FROM ExerciseEntries GROUP BY trackedDayID
+) AS exercise ON exercise.trackedDayID = TrackedDays.trackedDayID
+SET
+  TrackedDays.trackedDayFoodCalories = COALESCE(food.calories, 0),
+  TrackedDays.trackedDayFoodEntryCount = COALESCE(food.entries, 0),
+  TrackedDays.trackedDayExerciseCalories = COALESCE(exercise.calories, 0),
+  TrackedDays.trackedDayExerciseEntryCount = COALESCE(exercise.entries, 0);
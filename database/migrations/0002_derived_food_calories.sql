@@ -0,0 +1,11 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- 1 when the calories were worked out from the food's calories per gram and should follow changes to it.
+-- Existing entries were typed in by hand, so they keep their calories
+ALTER TABLE FoodEntries
+  ADD COLUMN `foodEntryCaloriesDerived` TINYINT(1) NOT NULL DEFAULT 0;
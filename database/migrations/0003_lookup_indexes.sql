@@ -0,0 +1,41 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- A client can only have one tracked day per date, and this is also how the app looks tracked days up.
+-- If this fails, find the duplicates with:
+--   SELECT clientID, trackedDayDate, COUNT(*) FROM TrackedDays GROUP BY clientID, trackedDayDate HAVING COUNT(*) > 1;
+-- The new index starts with clientID, so it also serves the foreign key and replaces the old clientID index
+ALTER TABLE TrackedDays
+  ADD UNIQUE INDEX `uc_day_client_date` (`clientID` ASC, `trackedDayDate` ASC),
+  ADD INDEX `idx_day_date` (`trackedDayDate` ASC),
+  DROP INDEX `fk_TrackedDays_Clients1_idx`,
+  DROP INDEX `dayID_UNIQUE`;
+
+-- Name lookups from the forms, the search box and the imports
+ALTER TABLE Clients
+  ADD INDEX `idx_client_name` (`clientName` ASC),
+  DROP INDEX `personID_UNIQUE`;
+
+ALTER TABLE Staff
+  ADD INDEX `idx_staff_name` (`staffName` ASC),
+  DROP INDEX `staffID_UNIQUE`;
+
+-- Entries of one food, used when a food's calories per gram change. The derived flag is included so the
+-- recalculation only reads the entries it will update
+ALTER TABLE FoodEntries
+  ADD INDEX `idx_entry_food` (`foodID` ASC, `foodEntryCaloriesDerived` ASC),
+  DROP INDEX `entryID_UNIQUE`;
+
+ALTER TABLE Foods
+  DROP INDEX `foodID_UNIQUE`;
+
+ALTER TABLE ExerciseEntries
+  DROP INDEX `exerciseID_UNIQUE`;
+
+-- The primary key (staffID, clientID) already covers lookups by staffID
+ALTER TABLE StaffClients
+  DROP INDEX `fk_Staff_has_Clients_Staff1_idx`;
@@ -0,0 +1,18 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- A change counter and last-changed time (UTC) per table, bumped by the app in the same transaction as each write
+CREATE TABLE IF NOT EXISTS `TableVersions` (
+  `tableName` VARCHAR(64) NOT NULL,
+  `tableVersion` BIGINT UNSIGNED NOT NULL DEFAULT 1,
+  `tableModifiedAt` DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (`tableName`));
+
+INSERT IGNORE INTO TableVersions (tableName, tableModifiedAt) VALUES
+('Staff', UTC_TIMESTAMP(6)), ('Clients', UTC_TIMESTAMP(6)), ('StaffClients', UTC_TIMESTAMP(6)),
+('TrackedDays', UTC_TIMESTAMP(6)), ('Foods', UTC_TIMESTAMP(6)), ('FoodEntries', UTC_TIMESTAMP(6)),
+('ExerciseEntries', UTC_TIMESTAMP(6));
@@ -0,0 +1,57 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- Archive tables for food and exercise entries of closed periods, filled by "flask archive-entries".
+-- They have the same columns and keys as the live tables, so the app reads them with the same queries, and
+-- are stored compressed since they are rarely read. MySQL can't partition tables that have foreign keys,
+-- so moving old rows here is what keeps the live tables (and their indexes) from growing without bound
+CREATE TABLE IF NOT EXISTS `FoodEntriesArchive` (
+  `foodEntryID` INT NOT NULL,
+  `trackedDayID` INT NOT NULL,
+  `foodID` INT,
+  `foodEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
+  `foodEntryGramWeight` INT UNSIGNED NOT NULL DEFAULT 0,
+  `foodEntryNote` VARCHAR(255) NULL DEFAULT NULL,
+  `foodEntryCaloriesDerived` TINYINT(1) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`foodEntryID`),
+  INDEX `idx_archive_entry_day` (`trackedDayID` ASC) VISIBLE,
+  INDEX `idx_archive_entry_food` (`foodID` ASC) VISIBLE,
+  CONSTRAINT `fk_archive_entry_day`
+    FOREIGN KEY (`trackedDayID`)
+    REFERENCES `TrackedDays` (`trackedDayID`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE,
+  CONSTRAINT `fk_archive_entry_food`
+    FOREIGN KEY (`foodID`)
+    REFERENCES `Foods` (`foodID`)
+    ON DELETE SET NULL
+    ON UPDATE CASCADE)
+  ROW_FORMAT = COMPRESSED;
+
+CREATE TABLE IF NOT EXISTS `ExerciseEntriesArchive` (
+  `exerciseEntryID` INT NOT NULL,
+  `trackedDayID` INT NOT NULL,
+  `exerciseEntryName` VARCHAR(255) NOT NULL,
+  `exerciseEntryType` ENUM('Cardio', 'Strength', 'Stretching', 'Balance', 'Other') NOT NULL,
+  `exerciseEntryCalories` INT UNSIGNED NOT NULL DEFAULT 0,
+  `exerciseEntryNote` VARCHAR(255) NULL DEFAULT NULL,
+  PRIMARY KEY (`exerciseEntryID`),
+  INDEX `idx_archive_exercise_day` (`trackedDayID` ASC) VISIBLE,
+  CONSTRAINT `fk_archive_exercise_day`
+    FOREIGN KEY (`trackedDayID`)
+    REFERENCES `TrackedDays` (`trackedDayID`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE)
+  ROW_FORMAT = COMPRESSED;
+
+-- One row per archive run: entries on tracked days up to and including archivedThrough are in the archive tables
+CREATE TABLE IF NOT EXISTS `ArchivedPeriods` (
+  `archivedThrough` DATE NOT NULL,
+  `archivedAt` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `archivedFoodEntries` INT UNSIGNED NOT NULL DEFAULT 0,
+  `archivedExerciseEntries` INT UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`archivedThrough`));
@@ -0,0 +1,22 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- An append-only log of changes to entries, tracked days and staff-client assignments, written by the app in the
+-- same transaction as each change. Live pages read it after the last change they saw instead of reloading listings.
+-- No foreign keys, so the log still describes rows that have since been deleted. Times are in UTC
+CREATE TABLE IF NOT EXISTS `ChangeLog` (
+  `changeID` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `changeTable` VARCHAR(64) NOT NULL,
+  `changeOperation` ENUM('insert', 'update', 'delete') NOT NULL,
+  `changeRowID` INT NULL DEFAULT NULL,
+  `trackedDayID` INT NULL DEFAULT NULL,
+  `clientID` INT NULL DEFAULT NULL,
+  `staffID` INT NULL DEFAULT NULL,
+  `changedAt` DATETIME(6) NOT NULL,
+  PRIMARY KEY (`changeID`),
+  INDEX `idx_change_client` (`clientID` ASC, `changeID` ASC) VISIBLE,
+  INDEX `idx_change_time` (`changedAt` ASC) VISIBLE);
@@ -0,0 +1,27 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- Background jobs (see jobs.py): queued by the web app, claimed and run by the "flask run-jobs" workers.
+-- jobInput holds an uploaded file until the job finishes; jobResult is the job's JSON result. Times are in UTC
+CREATE TABLE IF NOT EXISTS `Jobs` (
+  `jobID` INT NOT NULL AUTO_INCREMENT,
+  `jobKind` VARCHAR(64) NOT NULL,
+  `jobStatus` ENUM('queued', 'running', 'succeeded', 'failed', 'cancelled') NOT NULL DEFAULT 'queued',
+  `jobParams` JSON NOT NULL,
+  `jobInput` LONGBLOB NULL DEFAULT NULL,
+  `jobProgressDone` INT UNSIGNED NOT NULL DEFAULT 0,
+  `jobProgressTotal` INT UNSIGNED NULL DEFAULT NULL,
+  `jobCancelRequested` TINYINT(1) NOT NULL DEFAULT 0,
+  `jobResult` LONGTEXT NULL DEFAULT NULL,
+  `jobError` TEXT NULL DEFAULT NULL,
+  `jobWorker` VARCHAR(255) NULL DEFAULT NULL,
+  `jobCreatedAt` DATETIME NOT NULL,
+  `jobStartedAt` DATETIME NULL DEFAULT NULL,
+  `jobHeartbeatAt` DATETIME NULL DEFAULT NULL,
+  `jobFinishedAt` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`jobID`),
+  INDEX `idx_job_status` (`jobStatus` ASC, `jobID` ASC) VISIBLE);
@@ -0,0 +1,24 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- Each client's estimated basal metabolic rate (Mifflin-St Jeor) and total daily energy expenditure (BMR times
+-- the activity factor), in kcal. Kept up to date by the app when a client's biometrics change
+ALTER TABLE Clients
+  ADD COLUMN `clientBMR` INT UNSIGNED NOT NULL DEFAULT 0 AFTER `clientCalorieTarget`,
+  ADD COLUMN `clientTDEE` INT UNSIGNED NOT NULL DEFAULT 0 AFTER `clientBMR`;
+
+-- Fill in the estimates for the clients that already exist
+UPDATE Clients
+SET
+  clientBMR = GREATEST(0, ROUND(10 * clientWeight + 6.25 * clientHeight - 5 * clientAge + IF(clientSex = 'Male', 5, -161))),
+  clientTDEE = GREATEST(0, ROUND(
+    (10 * clientWeight + 6.25 * clientHeight - 5 * clientAge + IF(clientSex = 'Male', 5, -161))
+    * CASE clientActivityLevel
+        WHEN 'Sedentary' THEN 1.2 WHEN 'Light' THEN 1.375 WHEN 'Moderate' THEN 1.55
+        WHEN 'High' THEN 1.725 WHEN 'Athlete' THEN 1.9
+      END
+  ));
@@ -0,0 +1,24 @@
+/*
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+*/
+
+-- Changes logged by transactions that haven't committed yet, one set per database connection. Just before it
+-- commits, a transaction moves its rows into ChangeLog while holding the ChangeLog row of TableVersions, so
+-- changeIDs are handed out in commit order and a live page can't read past a change that commits late
+CREATE TABLE IF NOT EXISTS `PendingChanges` (
+  `pendingID` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `connectionID` BIGINT UNSIGNED NOT NULL,
+  `changeTable` VARCHAR(64) NOT NULL,
+  `changeOperation` ENUM('insert', 'update', 'delete') NOT NULL,
+  `changeRowID` INT NULL DEFAULT NULL,
+  `trackedDayID` INT NULL DEFAULT NULL,
+  `clientID` INT NULL DEFAULT NULL,
+  `staffID` INT NULL DEFAULT NULL,
+  `changedAt` DATETIME(6) NOT NULL,
+  PRIMARY KEY (`pendingID`),
+  INDEX `idx_pending_connection` (`connectionID` ASC, `pendingID` ASC) VISIBLE);
+
+INSERT IGNORE INTO TableVersions (tableName, tableModifiedAt) VALUES ('ChangeLog', UTC_TIMESTAMP(6));
@@ -0,0 +1,97 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Production settings for gunicorn. gunicorn reads this file by itself when started from this folder:
+#
+#   gunicorn
+#   KILOJULIA_WORKERS=8 KILOJULIA_THREADS=16 KILOJULIA_BIND=0.0.0.0:8000 gunicorn
+#
+# The app is imported once in the master process and forked into the workers, which share its memory and
+# start quickly. Each worker then opens its database connections and builds its caches before it is given
+# any requests (see warmUp in app.py), and is replaced after a while so slow memory growth can't build up.
+#
+# kill -HUP <master> replaces the workers one set at a time without dropping requests, but the new workers
+# are forked from the code the master already loaded. To deploy new code, start a new master next to the
+# old one with kill -USR2 <master>, then stop the old one's workers with kill -WINCH and the old master
+# with kill -QUIT once the new one is serving.
+
+import multiprocessing
+import os
+
+from dotenv import find_dotenv, load_dotenv
+
+# The settings below can come from the same .env file as the database settings
+load_dotenv(find_dotenv())
+
+wsgi_app = "wsgi:app"
+bind = os.environ.get("KILOJULIA_BIND", "127.0.0.1:8000").split(",")
+proc_name = "kilojulia"
+pidfile = os.environ.get("KILOJULIA_PIDFILE")
+preload_app = True
+
+# Requests spend most of their time waiting on MySQL, so a couple of processes per core keep every core busy.
+# Each worker has its own connection pool (up to 340DBPOOLMAX connections), so workers x 340DBPOOLMAX
+# should stay under the server's max_connections
+workers = int(os.environ.get("KILOJULIA_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers keep serving while some threads wait on the database or hold a change feed stream open.
+# Change feed requests may hold at most half of the threads (KILOJULIA_MAX_CHANGE_WAITERS), so the rest keep
+# serving pages. More threads than 340DBPOOLMAX only queue for connections, but waiting feed requests don't
+# hold one
+worker_class = "gthread"
+threads = int(os.environ.get("KILOJULIA_THREADS", 8))
+# Most open connections a worker keeps, including idle keep-alive ones
+worker_connections = int(os.environ.get("KILOJULIA_WORKER_CONNECTIONS", 1000))
+
+# Seconds an idle keep-alive connection stays open. A little longer than the default 2 seconds lets a
+# browser (or a proxy in front) reuse one connection for a page and its follow-up requests
+keepalive = int(os.environ.get("KILOJULIA_KEEPALIVE", 5))
+# A worker that stops responding for this many seconds is restarted
+timeout = int(os.environ.get("KILOJULIA_TIMEOUT", 60))
+# Seconds a stopping worker gets to finish the requests it is serving
+graceful_timeout = int(os.environ.get("KILOJULIA_GRACEFUL_TIMEOUT", 30))
+
+# Each worker is replaced after about this many requests. The jitter spreads the restarts out so the
+# workers don't all restart at once
+max_requests = int(os.environ.get("KILOJULIA_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("KILOJULIA_MAX_REQUESTS_JITTER", 500))
+
+# Workers check in through a temporary file; keeping it in memory avoids stalls on slow or full disks
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("KILOJULIA_ACCESS_LOG")
+errorlog = "-"
+
+
+# Runs in the master once it is listening, before the first workers are forked. Connections the master
+# opened while importing the app (e.g. to apply migrations) are closed so no worker inherits them
+def when_ready(server):
+    import database.db_connector as db
+
+    db.pool.close_all()
+    server.log.info("KiloJulia ready with %s workers x %s threads", server.cfg.workers, server.cfg.threads)
+
+
+# Runs in each new worker before it accepts requests
+def post_worker_init(worker):
+    from app import warmUp
+
+    try:
+        warmUp()
+    except Exception:
+        # A worker that couldn't warm up still serves requests; they just open connections themselves
+        worker.log.exception("Worker %s could not warm up", worker.pid)
+
+
+def worker_exit(server, worker):
+    import database.db_connector as db
+
+    db.pool.close_all()
+
+
+def on_reload(server):
+    server.log.info("Reloading: replacing the workers")
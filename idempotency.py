@@ -0,0 +1,80 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import json
+import time
+import uuid
+
+
+# Raised when a key is reused for a different request, or its first request is still running after the wait
+class IdempotencyConflict(Exception):
+    pass
+
+
+# Remembers the outcome of write requests by their idempotency key, so a retried or double-clicked
+# submission gets the first one's response back instead of running again.
+# Works on any cache from cache.py that has add() and deleteIf(): with "memory://" duplicates are caught within
+# one process, with "file://" or "redis://" across every process sharing the store.
+class IdempotencyStore:
+    def __init__(self, cache, ttl=600, waitTimeout=10, lockTimeout=300, pollInterval=0.025):
+        self.cache = cache
+        # Seconds a finished request's response is kept
+        self.ttl = ttl
+        # Seconds a duplicate waits for the first request to finish before giving up with a conflict
+        self.waitTimeout = waitTimeout
+        # Seconds a running request holds its key. Must be longer than the longest request, since a key whose
+        # lock has lapsed can be run again; it only matters on its own if the process dies mid-request
+        self.lockTimeout = lockTimeout
+        self.pollInterval = pollInterval
+
+    @staticmethod
+    def _keys(scope, key):
+        return ("idempotency", scope, key, "result"), ("idempotency", scope, key, "lock")
+
+    # Call before running a request. Returns (stored, token): the stored (status, headers, body) if this key
+    # already finished, or (None, token) if the caller now holds the key and should run the request, then call
+    # finish() or abandon() with the token. A duplicate arriving while the first is still running waits for its
+    # result, and raises IdempotencyConflict if it doesn't come in time. It never takes over the key itself,
+    # even once the lock lapses, so the request can't run twice
+    def begin(self, scope, key, fingerprint):
+        resultKey, lockKey = self._keys(scope, key)
+        stored = self.cache.get(resultKey)
+        if stored is None:
+            token = uuid.uuid4().hex.encode()
+            if self.cache.add(lockKey, token, ttl=self.lockTimeout):
+                # The first request may have finished between the two calls above
+                stored = self.cache.get(resultKey)
+                if stored is None:
+                    return None, token
+                self.cache.deleteIf(lockKey, token)
+        deadline = time.monotonic() + self.waitTimeout
+        while stored is None:
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict("A request with this idempotency key is still being processed.")
+            time.sleep(self.pollInterval)
+            stored = self.cache.get(resultKey)
+        return self._decode(stored, fingerprint), None
+
+    # Stores the response of a request started with begin() and lets any waiting duplicates have it
+    def finish(self, scope, key, token, fingerprint, status, headers, body):
+        resultKey, lockKey = self._keys(scope, key)
+        header = json.dumps({"fingerprint": fingerprint, "status": status, "headers": headers})
+        self.cache.set(resultKey, header.encode() + b"\n" + body, ttl=self.ttl)
+        self.cache.deleteIf(lockKey, token)
+
+    # Gives up a key without storing a response (e.g. the request failed), so a retry runs again. Only the
+    # request holding the lock can release it
+    def abandon(self, scope, key, token):
+        self.cache.deleteIf(self._keys(scope, key)[1], token)
+
+    @staticmethod
+    def _decode(stored, fingerprint):
+        header, _, body = stored.partition(b"\n")
+        header = json.loads(header)
+        if header["fingerprint"] != fingerprint:
+            raise IdempotencyConflict("This idempotency key was already used for a different request.")
+        return header["status"], header["headers"], body
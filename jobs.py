@@ -0,0 +1,250 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# Raised by Job.progress() when someone asked for the job to be cancelled, so the handler stops between steps
+class JobCancelled(Exception):
+    pass
+
+
+# What a job handler gets: its parameters, any uploaded input, and progress() to report how far it has got
+class Job:
+    def __init__(self, queue, row):
+        self.queue = queue
+        self.jobID = row["jobID"]
+        self.kind = row["jobKind"]
+        self.params = json.loads(row["jobParams"] or "{}")
+        self.input = row["jobInput"]
+
+    # Records that done out of total steps are finished. Raises JobCancelled if the job should stop.
+    # Work the handler committed before this stays committed
+    def progress(self, done, total=None):
+        if self.queue.updateProgress(self.jobID, done, total):
+            raise JobCancelled()
+
+
+# A queue of long-running jobs kept in the Jobs table, so reports, recomputations and bulk loads run in
+# worker processes (flask run-jobs) instead of inside a web request. Web processes submit jobs and read
+# their status; workers claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED, so each job runs once
+# however many workers there are. Job bookkeeping uses its own short transactions on pooled connections,
+# separate from the handler's own writes
+class JobQueue:
+    def __init__(self, pool, pollInterval=1.0, heartbeatInterval=30, staleAfter=300, keepDays=7):
+        self.pool = pool
+        # Seconds an idle worker waits before looking for a job again
+        self.pollInterval = pollInterval
+        # A running job's heartbeat is refreshed this often; one not refreshed within staleAfter seconds
+        # belonged to a worker that died, and is marked failed
+        self.heartbeatInterval = heartbeatInterval
+        self.staleAfter = staleAfter
+        # Days finished jobs and their results are kept
+        self.keepDays = keepDays
+        # kind -> function(job) returning a JSON-serializable result
+        self.handlers = {}
+
+    # Decorator registering the function that runs jobs of a kind
+    def handler(self, kind):
+        def register(function):
+            self.handlers[kind] = function
+            return function
+
+        return register
+
+    def _execute(self, query, params=()):
+        with self.pool.connection() as connection:
+            cur = connection.cursor()
+            cur.execute(query, params)
+            connection.commit()
+            return cur
+
+    def submit(self, kind, params=None, input=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        cur = self._execute(
+            "INSERT INTO Jobs (jobKind, jobParams, jobInput, jobCreatedAt) VALUES (%s, %s, %s, UTC_TIMESTAMP());",
+            (kind, json.dumps(params or {}), input),
+        )
+        return cur.lastrowid
+
+    # Number of jobs waiting for a worker, so callers can turn new work away when the queue is full
+    def queued(self):
+        cur = self._execute("SELECT COUNT(*) AS queued FROM Jobs WHERE jobStatus = 'queued';")
+        return cur.fetchone()["queued"]
+
+    # A job's status, progress and (once it finished) result or error, or None if there is no such job
+    def get(self, jobID):
+        cur = self._execute(
+            """
+            SELECT jobID, jobKind, jobStatus, jobParams, jobProgressDone, jobProgressTotal, jobCancelRequested,
+                jobResult, jobError, jobCreatedAt, jobStartedAt, jobFinishedAt
+            FROM Jobs WHERE jobID = %s;
+            """,
+            (jobID,),
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        row["jobParams"] = json.loads(row["jobParams"] or "{}")
+        row["jobResult"] = json.loads(row["jobResult"]) if row["jobResult"] is not None else None
+        row["jobCancelRequested"] = bool(row["jobCancelRequested"])
+        return row
+
+    # A queued job is cancelled at once; a running one is asked to stop at its next progress report.
+    # Returns False if the job has already finished (or doesn't exist)
+    def cancel(self, jobID):
+        cur = self._execute(
+            """
+            UPDATE Jobs SET jobStatus = 'cancelled', jobCancelRequested = 1, jobFinishedAt = UTC_TIMESTAMP(), jobInput = NULL
+            WHERE jobID = %s AND jobStatus = 'queued';
+            """,
+            (jobID,),
+        )
+        if cur.rowcount:
+            return True
+        self._execute("UPDATE Jobs SET jobCancelRequested = 1 WHERE jobID = %s AND jobStatus = 'running';", (jobID,))
+        job = self.get(jobID)
+        return job is not None and job["jobStatus"] == "running"
+
+    # Takes the oldest queued job for this worker, or returns None if there isn't one
+    def claim(self, worker):
+        with self.pool.connection() as connection:
+            cur = connection.cursor()
+            # Jobs other workers are claiming at the same moment are skipped rather than waited for
+            cur.execute(
+                """
+                SELECT jobID, jobKind, jobParams, jobInput FROM Jobs
+                WHERE jobStatus = 'queued' ORDER BY jobID LIMIT 1
+                FOR UPDATE SKIP LOCKED;
+                """
+            )
+            row = cur.fetchone()
+            if row is not None:
+                cur.execute(
+                    """
+                    UPDATE Jobs SET jobStatus = 'running', jobWorker = %s, jobStartedAt = UTC_TIMESTAMP(),
+                        jobHeartbeatAt = UTC_TIMESTAMP()
+                    WHERE jobID = %s;
+                    """,
+                    (worker, row["jobID"]),
+                )
+            connection.commit()
+        return Job(self, row) if row is not None else None
+
+    # Saves a running job's progress. Returns True if the job has been asked to stop
+    def updateProgress(self, jobID, done, total=None):
+        with self.pool.connection() as connection:
+            cur = connection.cursor()
+            cur.execute(
+                """
+                UPDATE Jobs SET jobProgressDone = %s, jobProgressTotal = %s, jobHeartbeatAt = UTC_TIMESTAMP()
+                WHERE jobID = %s;
+                """,
+                (done, total, jobID),
+            )
+            cur.execute("SELECT jobCancelRequested FROM Jobs WHERE jobID = %s;", (jobID,))
+            cancelRequested = cur.fetchone()["jobCancelRequested"]
+            connection.commit()
+        return bool(cancelRequested)
+
+    # Records how a job ended. Uploaded input is dropped then, since only the result is needed from there on
+    def finish(self, jobID, status, result=None, error=None):
+        self._execute(
+            """
+            UPDATE Jobs SET jobStatus = %s, jobResult = %s, jobError = %s, jobFinishedAt = UTC_TIMESTAMP(), jobInput = NULL
+            WHERE jobID = %s;
+            """,
+            (status, json.dumps(result) if result is not None else None, error, jobID),
+        )
+
+    # Fails the running jobs whose worker stopped sending heartbeats, and deletes old finished jobs
+    def cleanUp(self):
+        self._execute(
+            """
+            UPDATE Jobs SET jobStatus = 'failed', jobError = 'The worker running this job stopped.',
+                jobFinishedAt = UTC_TIMESTAMP(), jobInput = NULL
+            WHERE jobStatus = 'running' AND jobHeartbeatAt < UTC_TIMESTAMP() - INTERVAL %s SECOND;
+            """,
+            (self.staleAfter,),
+        )
+        self._execute(
+            """
+            DELETE FROM Jobs
+            WHERE jobStatus IN ('succeeded', 'failed', 'cancelled') AND jobFinishedAt < UTC_TIMESTAMP() - INTERVAL %s DAY;
+            """,
+            (self.keepDays,),
+        )
+
+    # Keeps a job's heartbeat fresh while its handler runs, including through long single queries
+    def _beat(self, jobID, stop):
+        while not stop.wait(self.heartbeatInterval):
+            try:
+                self._execute("UPDATE Jobs SET jobHeartbeatAt = UTC_TIMESTAMP() WHERE jobID = %s;", (jobID,))
+            except Exception:
+                logger.exception("Could not update the heartbeat of job %s", jobID)
+
+    # Claims and runs one job inside context() (e.g. a Flask app context). Returns False if none was queued
+    def runNext(self, worker, context):
+        job = self.claim(worker)
+        if job is None:
+            return False
+        stop = threading.Event()
+        threading.Thread(target=self._beat, args=(job.jobID, stop), name="job-heartbeat", daemon=True).start()
+        try:
+            with context():
+                result = self.handlers[job.kind](job)
+        except JobCancelled:
+            self.finish(job.jobID, "cancelled")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.jobID, job.kind)
+            self.finish(job.jobID, "failed", error=str(e) or type(e).__name__)
+        else:
+            self.finish(job.jobID, "succeeded", result=result)
+        finally:
+            stop.set()
+        return True
+
+    # A worker process's loop: run jobs until stop is set, cleaning up whenever the queue is empty
+    def work(self, context, stop):
+        # Ctrl+C reaches the whole process group; the parent handles it and lets running jobs finish
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        logger.info("Job worker %s started", worker)
+        while not stop.is_set():
+            try:
+                if self.runNext(worker, context):
+                    continue
+                self.cleanUp()
+            except Exception:
+                logger.exception("Job worker %s could not reach the database", worker)
+            stop.wait(self.pollInterval)
+
+    # Runs count worker processes until SIGINT or SIGTERM, then waits for their current jobs to finish.
+    # The number of workers is the number of jobs that can run at once
+    def runWorkers(self, count, context):
+        # Forked children share the app already imported here; each opens its own database connections
+        processes = multiprocessing.get_context("fork")
+        stop = processes.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda signum, frame: stop.set())
+        workers = [
+            processes.Process(target=self.work, args=(context, stop), name=f"job-worker-{number}")
+            for number in range(max(1, count))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,65 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+from bisect import bisect_left
+
+
+# An in-memory index of names (foods, clients, staff) for search-as-you-type.
+# Names are kept in sorted lists so that every name starting with what the user typed sits in one
+# block that binary search finds straight away, no matter how many names there are.
+class NameIndex:
+    def __init__(self, names):
+        names = {name for name in names if name}
+        # Whole names, lowercased, for "starts with" matches
+        self._names = sorted((name.lower(), name) for name in names)
+        self._nameKeys = [key for key, _ in self._names]
+        # Every later word of every name, for matches on the start of a word ("milk" -> "Whole Milk")
+        self._words = sorted(
+            (word, name)
+            for name in names
+            for word in name.lower().replace(",", " ").split()[1:]
+        )
+        self._wordKeys = [key for key, _ in self._words]
+
+    def __len__(self):
+        return len(self._names)
+
+    # Helper to collect the names in a sorted list whose key starts with the prefix
+    @staticmethod
+    def _prefixMatches(keys, entries, prefix, limit):
+        matches = []
+        for position in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[position].startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(entries[position][1])
+        return matches
+
+    # Returns up to limit names matching the query, best matches first:
+    # exact name, then names starting with the query, then names with a word starting with it,
+    # then (for queries of 3+ characters) names containing it anywhere
+    def search(self, query, limit=10):
+        query = " ".join(query.lower().split())
+        if not query or limit < 1:
+            return []
+        results = []
+        seen = set()
+
+        def add(names):
+            for name in names:
+                if len(results) >= limit:
+                    return
+                if name not in seen:
+                    seen.add(name)
+                    results.append(name)
+
+        # Prefix matches come out alphabetically; shorter names first puts the exact match on top
+        add(sorted(self._prefixMatches(self._nameKeys, self._names, query, limit), key=len))
+        if len(results) < limit:
+            add(sorted(self._prefixMatches(self._wordKeys, self._words, query, limit * 2), key=len))
+        if len(results) < limit and len(query) >= 3:
+            add(name for key, name in self._names if query in key)
+        return results
@@ -0,0 +1,96 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Checks the in-memory and file caches: expiry, eviction, invalidation and add(). Needs no database:
+#
+#   python -m pytest tests
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cache import FileCache, LRUCache
+
+
+def test_lru_entries_expire():
+    cache = LRUCache(ttl=0.05)
+    cache.set(("client", "Alice"), 1)
+    cache.set(("client", "Bob"), 2, ttl=60)
+    assert cache.get(("client", "Alice")) == 1
+    time.sleep(0.1)
+    assert cache.get(("client", "Alice"), "gone") == "gone"
+    assert cache.get(("client", "Bob")) == 2
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set(("food", "Apple"), 1)
+    cache.set(("food", "Bread"), 2)
+    # Reading Apple makes Bread the least recently used
+    cache.get(("food", "Apple"))
+    cache.set(("food", "Cheese"), 3)
+    assert cache.get(("food", "Bread")) is None
+    assert cache.get(("food", "Apple")) == 1
+    assert cache.get(("food", "Cheese")) == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_add_only_stores_missing_or_expired_keys():
+    cache = LRUCache()
+    assert cache.add(("lock", "a"), 1, ttl=0.05)
+    assert not cache.add(("lock", "a"), 2)
+    assert cache.get(("lock", "a")) == 1
+    time.sleep(0.1)
+    assert cache.add(("lock", "a"), 3)
+    assert cache.get(("lock", "a")) == 3
+
+
+def test_lru_invalidates_by_namespace():
+    cache = LRUCache()
+    cache.set(("client", "Alice"), 1)
+    cache.set(("food", "Apple"), 2)
+    cache.invalidate("client")
+    assert cache.get(("client", "Alice")) is None
+    assert cache.get(("food", "Apple")) == 2
+    cache.invalidate()
+    assert cache.get(("food", "Apple")) is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_file_add_only_stores_missing_or_expired_keys(tmp_path):
+    cache = FileCache(str(tmp_path))
+    assert cache.add(("lock", "a"), b"first", ttl=1)
+    assert not cache.add(("lock", "a"), b"second")
+    assert cache.get(("lock", "a")) == b"first"
+    # File times are only kept to the second on some filesystems
+    time.sleep(1.1)
+    assert cache.add(("lock", "a"), b"third")
+    assert cache.get(("lock", "a")) == b"third"
+
+
+# Of many threads adding the same key at once, exactly one stores it
+def test_file_add_has_one_winner(tmp_path):
+    cache = FileCache(str(tmp_path))
+    results = []
+    start = threading.Barrier(8)
+
+    def add(value):
+        start.wait()
+        results.append(cache.add(("lock", "a"), value))
+
+    threads = [threading.Thread(target=add, args=(str(number).encode(),)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    # No temporary files are left behind next to the entry
+    assert len(os.listdir(tmp_path / "lock")) == 1
@@ -0,0 +1,111 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Checks that an idempotency key only ever runs its request once, including when the first request takes
+# longer than a duplicate is willing to wait. Needs no database:
+#
+#   python -m pytest tests
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cache import FileCache, LRUCache
+from idempotency import IdempotencyConflict, IdempotencyStore
+
+
+@pytest.fixture(params=["memory", "file"])
+def cache(request, tmp_path):
+    return LRUCache() if request.param == "memory" else FileCache(str(tmp_path))
+
+
+def test_repeat_gets_first_response(cache):
+    store = IdempotencyStore(cache)
+    stored, token = store.begin("/addfoodentry", "key", "fingerprint")
+    assert stored is None
+    store.finish("/addfoodentry", "key", token, "fingerprint", 302, {"Location": "/foodentries"}, b"")
+    stored, token = store.begin("/addfoodentry", "key", "fingerprint")
+    assert stored == (302, {"Location": "/foodentries"}, b"")
+    assert token is None
+
+
+def test_key_reused_for_different_request_conflicts(cache):
+    store = IdempotencyStore(cache)
+    _, token = store.begin("/addfoodentry", "key", "fingerprint")
+    store.finish("/addfoodentry", "key", token, "fingerprint", 200, {}, b"OK")
+    with pytest.raises(IdempotencyConflict):
+        store.begin("/addfoodentry", "key", "other fingerprint")
+
+
+# A first request slower than the duplicate's wait must not let the duplicate run too
+def test_duplicate_of_slow_request_conflicts_instead_of_running(cache):
+    store = IdempotencyStore(cache, waitTimeout=0.5, pollInterval=0.01)
+    ran = []
+    outcomes = []
+
+    def submit():
+        try:
+            stored, token = store.begin("/importentries", "key", "fingerprint")
+        except IdempotencyConflict:
+            outcomes.append("conflict")
+            return
+        if stored is not None:
+            outcomes.append("replayed")
+            return
+        ran.append(token)
+        time.sleep(1)
+        store.finish("/importentries", "key", token, "fingerprint", 200, {}, b"OK")
+        outcomes.append("ran")
+
+    first = threading.Thread(target=submit)
+    first.start()
+    time.sleep(0.05)
+    duplicate = threading.Thread(target=submit)
+    duplicate.start()
+    first.join()
+    duplicate.join()
+    assert len(ran) == 1
+    assert sorted(outcomes) == ["conflict", "ran"]
+    # Once the first has finished, a later repeat gets its response
+    assert store.begin("/importentries", "key", "fingerprint")[0] == (200, {}, b"OK")
+
+
+# A request whose lock lapsed can't release the lock someone else now holds
+def test_only_the_lock_holder_releases_it(cache):
+    store = IdempotencyStore(cache, waitTimeout=0.1, lockTimeout=0.2, pollInterval=0.01)
+    _, firstToken = store.begin("/batch", "key", "fingerprint")
+    time.sleep(1.1 if isinstance(cache, FileCache) else 0.3)
+    stored, secondToken = store.begin("/batch", "key", "fingerprint")
+    assert stored is None and secondToken != firstToken
+    store.abandon("/batch", "key", firstToken)
+    with pytest.raises(IdempotencyConflict):
+        store.begin("/batch", "key", "fingerprint")
+    store.abandon("/batch", "key", secondToken)
+    assert store.begin("/batch", "key", "fingerprint")[0] is None
+
+
+# A failed request gives its key up so a retry runs, and a duplicate that arrives while the first is still
+# running gets its response once it finishes
+def test_abandoned_key_runs_again_and_waiters_get_the_response(cache):
+    store = IdempotencyStore(cache, waitTimeout=2, pollInterval=0.01)
+    _, token = store.begin("/addfood", "key", "fingerprint")
+    store.abandon("/addfood", "key", token)
+    stored, token = store.begin("/addfood", "key", "fingerprint")
+    assert stored is None and token is not None
+    replayed = []
+    waiter = threading.Thread(target=lambda: replayed.append(store.begin("/addfood", "key", "fingerprint")))
+    waiter.start()
+    time.sleep(0.1)
+    store.finish("/addfood", "key", token, "fingerprint", 201, {}, b"Created")
+    waiter.join()
+    assert replayed == [((201, {}, b"Created"), None)]
@@ -0,0 +1,68 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Checks how migration files are found and split into statements. Needs no database:
+#
+#   python -m pytest tests
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database.migrate import MigrationError, find_migrations, split_statements
+
+
+def test_statements_split_on_semicolons_at_line_ends():
+    sql = """
+    -- Adds a column
+    ALTER TABLE Foods ADD COLUMN foodNote VARCHAR(255);
+    /* Two statements,
+       one on several lines */
+    UPDATE Foods
+    SET foodNote = 'a; b'
+    WHERE foodID = 1;
+    INSERT INTO SchemaMigrations (version, name) VALUES (1, 'note')
+    """
+    assert split_statements(sql) == [
+        "ALTER TABLE Foods ADD COLUMN foodNote VARCHAR(255)",
+        "UPDATE Foods\n    SET foodNote = 'a; b'\n    WHERE foodID = 1",
+        "INSERT INTO SchemaMigrations (version, name) VALUES (1, 'note')",
+    ]
+
+
+def test_comments_and_empty_statements_are_dropped():
+    assert split_statements("-- nothing here;\n/* or; here */\n;\n") == []
+
+
+def test_migrations_are_found_in_version_order(tmp_path):
+    for filename in ["0010_later.sql", "0002_second.sql", "0001_first.sql", "notes.txt", "3_bad-name.sql"]:
+        (tmp_path / filename).write_text("SELECT 1;")
+    assert [(version, name) for version, name, _ in find_migrations(str(tmp_path))] == [
+        (1, "first"),
+        (2, "second"),
+        (10, "later"),
+    ]
+
+
+def test_duplicate_versions_are_refused(tmp_path):
+    (tmp_path / "0001_first.sql").write_text("SELECT 1;")
+    (tmp_path / "01_again.sql").write_text("SELECT 1;")
+    with pytest.raises(MigrationError):
+        find_migrations(str(tmp_path))
+
+
+# Every shipped migration has a unique version and splits into at least one statement
+def test_shipped_migrations_parse():
+    migrations = find_migrations()
+    assert [version for version, _, _ in migrations] == list(range(1, len(migrations) + 1))
+    for _, _, path in migrations:
+        with open(path) as file:
+            assert split_statements(file.read())
@@ -0,0 +1,188 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Checks that the queries the pages, search, imports, reports, API and change feed run most use the indexes
+# meant for them, by running EXPLAIN on the query constants and builders in app.py themselves. Needs the
+# database from the .env file filled with realistic data, since on a nearly empty table MySQL may choose to
+# scan anyway. Skipped when the database can't be reached.
+#
+#   python -m benchmarks.seed --scale small --truncate
+#   python -m pytest tests
+
+import datetime
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+pytest.importorskip("flask")
+MySQLdb = pytest.importorskip("MySQLdb")
+
+import app as kilojulia
+import database.db_connector as db
+
+PAGE_SIZE = kilojulia.DEFAULT_PAGE_SIZE
+
+
+# Helper function to build a listing page query the way fetchPage does, filtered by the sample client
+def listing(query, idColumn, sample):
+    conditions, params = kilojulia.buildListingConditions(clientName=sample["clientName"])
+    suffix, params = kilojulia.buildPageSuffix(conditions, params, idColumn, None, PAGE_SIZE)
+    return query + suffix, params
+
+
+# Helper function to build an API list query the way the apiList route does, filtered by the sample client
+def apiListing(resource, sample):
+    definition = kilojulia.API_RESOURCES[resource]
+    fields, _ = kilojulia.getApiFields(definition, None)
+    filters = dict(clientName=sample["clientName"], startDate=None, endDate=None, foodName=None, staffID=None)
+    return kilojulia.buildApiListQuery(definition, fields, filters, None, PAGE_SIZE)
+
+
+# name -> (function building (query, params) from the sample rows, {table: keys any of which may be used})
+HOT_QUERIES = {
+    "staff by name": (
+        lambda sample: (kilojulia.STAFF_BY_NAME_QUERY, (sample["staffName"],)),
+        {"Staff": {"idx_staff_name"}},
+    ),
+    "client by name": (
+        lambda sample: (kilojulia.CLIENT_BY_NAME_QUERY, (sample["clientName"],)),
+        {"Clients": {"idx_client_name"}},
+    ),
+    "food by name": (
+        lambda sample: (kilojulia.FOOD_BY_NAME_QUERY, (sample["foodName"],)),
+        {"Foods": {"uc_food_name"}},
+    ),
+    "tracked day by client name and date": (
+        lambda sample: (kilojulia.TRACKED_DAY_BY_CLIENT_NAME_QUERY, (sample["trackedDayDate"], sample["clientName"])),
+        {"Clients": {"idx_client_name"}, "TrackedDays": {"uc_day_client_date"}},
+    ),
+    "tracked days for imported entries": (
+        lambda sample: (
+            kilojulia.buildTrackedDayIDsQuery(1),
+            (sample["clientID"], sample["trackedDayDate"], sample["trackedDayDate"]),
+        ),
+        {"TrackedDays": {"uc_day_client_date"}},
+    ),
+    "derived entries of a food": (
+        lambda sample: (kilojulia.DERIVED_BATCH_END_QUERY, (sample["foodID"], 0, kilojulia.RECOMPUTE_BATCH_SIZE)),
+        {"FoodEntries": {"idx_entry_food"}},
+    ),
+    "client report": (
+        lambda sample: (
+            kilojulia.buildClientReportQuery("week"),
+            (sample["clientID"], sample["yearStart"], sample["trackedDayDate"]),
+        ),
+        {"TrackedDays": {"uc_day_client_date"}},
+    ),
+    "staff caseload report": (
+        lambda sample: (
+            kilojulia.buildStaffReportQuery("week"),
+            (sample["staffID"], sample["yearStart"], sample["trackedDayDate"]),
+        ),
+        {"StaffClients": {"PRIMARY"}, "TrackedDays": {"uc_day_client_date"}},
+    ),
+    "clinic report chunk": (
+        lambda sample: (
+            kilojulia.buildClinicReportQuery("week", 1),
+            (sample["clientID"], sample["yearStart"], sample["trackedDayDate"]),
+        ),
+        {"TrackedDays": {"uc_day_client_date"}},
+    ),
+    "tracked days listing by client": (
+        lambda sample: listing(kilojulia.TRACKED_DAYS_QUERY, "TrackedDays.trackedDayID", sample),
+        {"Clients": {"idx_client_name"}, "TrackedDays": {"uc_day_client_date"}},
+    ),
+    "food entries listing by client": (
+        lambda sample: listing(kilojulia.FOOD_ENTRIES_QUERY, "FoodEntries.foodEntryID", sample),
+        {"Clients": {"idx_client_name"}, "TrackedDays": {"uc_day_client_date"}, "FoodEntries": {"idx_entry_day"}},
+    ),
+    "exercise entries listing by client": (
+        lambda sample: listing(kilojulia.EXERCISE_ENTRIES_QUERY, "ExerciseEntries.exerciseEntryID", sample),
+        {
+            "Clients": {"idx_client_name"},
+            "TrackedDays": {"uc_day_client_date"},
+            "ExerciseEntries": {"fk_Exercises_Days1_idx"},
+        },
+    ),
+    "API food entries by client": (
+        lambda sample: apiListing("foodentries", sample),
+        {"Clients": {"idx_client_name"}, "TrackedDays": {"uc_day_client_date"}, "FoodEntries": {"idx_entry_day"}},
+    ),
+    "API table versions": (
+        lambda sample: kilojulia.buildTableVersionsQuery(("FoodEntries", "Foods", "TrackedDays", "Clients")),
+        {"TableVersions": {"PRIMARY"}},
+    ),
+    "change feed": (
+        lambda sample: (kilojulia.CHANGES_QUERY, (0, sample["staffID"], sample["staffID"], kilojulia.MAX_CHANGES)),
+        {"ChangeLog": {"PRIMARY", "idx_change_client"}},
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def cursor():
+    try:
+        connection = db.pool.acquire()
+    except (MySQLdb.Error, db.PoolTimeoutError) as e:
+        pytest.skip(f"Can't reach the database: {e}")
+    try:
+        yield connection.cursor()
+    finally:
+        connection.rollback()
+        db.pool.release(connection)
+
+
+# Real names and IDs to EXPLAIN with. Lookups of values that don't exist can be answered without an index,
+# so the plans are only meaningful for rows that are there
+@pytest.fixture(scope="module")
+def sample(cursor):
+    cursor.execute(
+        """
+        SELECT Clients.clientID, Clients.clientName, TrackedDays.trackedDayDate
+        FROM TrackedDays JOIN Clients ON TrackedDays.clientID = Clients.clientID
+        ORDER BY TrackedDays.trackedDayID DESC LIMIT 1;
+        """
+    )
+    day = cursor.fetchone()
+    cursor.execute("SELECT foodID, foodName FROM Foods ORDER BY foodID LIMIT 1;")
+    food = cursor.fetchone()
+    cursor.execute(
+        """
+        SELECT Staff.staffID, Staff.staffName FROM Staff
+        LEFT JOIN StaffClients ON StaffClients.staffID = Staff.staffID AND StaffClients.clientID = %s
+        ORDER BY StaffClients.clientID IS NULL, Staff.staffID LIMIT 1;
+        """,
+        (day["clientID"] if day else 0,),
+    )
+    staff = cursor.fetchone()
+    if not (day and food and staff):
+        pytest.skip("The database has no tracked days, foods or staff. Run python -m benchmarks.seed first.")
+    return dict(
+        day,
+        **food,
+        **staff,
+        yearStart=day["trackedDayDate"] - datetime.timedelta(days=364),
+    )
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(cursor, sample, name):
+    build, expected = HOT_QUERIES[name]
+    query, params = build(sample)
+    cursor.execute("EXPLAIN " + query.strip(), params)
+    plan = {row["table"]: row for row in cursor.fetchall()}
+    for table, keys in expected.items():
+        assert table in plan, f"{name}: {table} isn't in the plan ({', '.join(map(str, plan))})"
+        step = plan[table]
+        assert step["key"] in keys, (
+            f"{name}: {table} uses {step['key']} (type {step['type']}, ~{step['rows']} rows), "
+            f"expected {' or '.join(sorted(keys))}"
+        )
@@ -0,0 +1,50 @@
+"""
+Citation for the following code:
+Date: 10/18/2026
+Authors: Rami Albaroudi and Mohamed Saud, Group 13
+Original work
+"""
+
+# Checks the order search-as-you-type results come back in. Needs no database:
+#
+#   python -m pytest tests
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from search_index import NameIndex
+
+NAMES = ["Milkshake", "Whole Milk", "Milk", "Buttermilk", "Milk Chocolate", "Apple", "Chocolate Milk, Low Fat"]
+
+
+def test_exact_then_prefix_then_word_then_substring():
+    assert NameIndex(NAMES).search("milk") == [
+        "Milk",
+        "Milkshake",
+        "Milk Chocolate",
+        "Whole Milk",
+        "Chocolate Milk, Low Fat",
+        "Buttermilk",
+    ]
+
+
+def test_search_ignores_case_and_extra_spaces():
+    assert NameIndex(NAMES).search("  MILK   choc ") == ["Milk Chocolate"]
+
+
+def test_short_queries_skip_substring_matches():
+    assert NameIndex(NAMES).search("le") == []
+    assert NameIndex(NAMES).search("ple") == ["Apple"]
+
+
+def test_limit_and_empty_queries():
+    index = NameIndex(NAMES + ["", None])
+    assert len(index) == len(NAMES)
+    # The exact match always makes the cut
+    assert index.search("milk", limit=2)[0] == "Milk"
+    assert len(index.search("milk", limit=2)) == 2
+    assert index.search("   ") == []
+    assert index.search("milk", limit=0) == []